@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 import salt.client
 import salt.exceptions
 import salt.output
+import salt.utils.minions
 import salt.utils.stringutils
 
 log = logging.getLogger(__name__)
@@ -42,11 +43,12 @@ class Batch:
         # Passing listen True to local client will prevent it from purging
         # cahced events while iterating over the batches.
         self.local = salt.client.get_local_client(opts["conf_file"], listen=True)
+        # The minions targeted by a streaming batch run, and whether the
+        # returns of its discovery ping are still coming in
+        self.targeted = None
+        self.discovering = False
 
-    def gather_minions(self):
-        """
-        Return a list of minions to use for the batch run
-        """
+    def _ping_args(self):
         args = [
             self.opts["tgt"],
             "test.ping",
@@ -59,7 +61,16 @@ class Batch:
             args.append(selected_target_option)
         else:
             args.append(self.opts.get("tgt_type", "glob"))
+        return args
+
+    def gather_minions(self):
+        """
+        Return a list of minions to use for the batch run
+        """
+        if self.opts.get("batch_stream", False):
+            return self.stream_minions()
 
+        args = self._ping_args()
         self.pub_kwargs["yield_pub_data"] = True
         ping_gen = self.local.cmd_iter(
             *args, gather_job_timeout=self.opts["gather_job_timeout"], **self.pub_kwargs
@@ -86,11 +97,55 @@ class Batch:
                     fret.add(m)
         return (list(fret), ping_gen, nret.difference(fret))
 
+    def stream_minions(self):
+        """
+        Return the minions to start the batch run with, and a generator of
+        the returns of the discovery ping, without waiting for the ping
+
+        The targeted minions which the master knows to be connected are
+        started right away. When the target only depends on the minion ids
+        and all of the targeted minions are connected, no ping is sent.
+        """
+        args = self._ping_args()
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        self.targeted = set(ckminions.check_minions(args[0], args[4])["minions"])
+
+        present = set()
+        if self.opts.get("minion_data_cache", False) and args[4] in (
+            "glob",
+            "pcre",
+            "list",
+        ):
+            present = ckminions.connected_ids(subset=self.targeted)
+        log.debug(
+            "%s of %s targeted minions are connected",
+            len(present),
+            len(self.targeted),
+        )
+
+        if not self.targeted or self.targeted.difference(present):
+            self.discovering = True
+            ping_gen = self._discover(args)
+        else:
+            ping_gen = iter(())
+        return (list(present), ping_gen, set())
+
+    def _discover(self, args):
+        """
+        Yield the returns of the discovery ping as they come in, or None
+        """
+        for ret in self.local.cmd_iter_no_block(
+            *args, gather_job_timeout=self.opts["gather_job_timeout"], **self.eauth
+        ):
+            # an empty return means that no minion matched the target
+            if ret is None or ret:
+                yield ret
+
     def get_bnum(self):
         """
         Return the active number of minions to maintain
         """
-        partition = lambda x: float(x) / 100.0 * len(self.minions)
+        partition = lambda x: float(x) / 100.0 * len(self.targeted or self.minions)
         try:
             if isinstance(self.opts["batch"], str) and "%" in self.opts["batch"]:
                 res = partition(float(self.opts["batch"].strip("%")))
@@ -129,7 +184,7 @@ class Batch:
         ]
         bnum = self.get_bnum()
         # No targets to run
-        if not self.minions:
+        if not self.minions and not self.discovering:
             return
         to_run = copy.deepcopy(self.minions)
         active = []
@@ -164,8 +219,12 @@ class Batch:
                     )
                 )
 
+        # the returns of each iterator are polled again a few times before
+        # moving on to the next one, a streaming run does not wait for them
+        idle_polls = 0 if self.opts.get("batch_stream", False) else 6
+
         # Iterate while we still have things to execute
-        while len(ret) < len(self.minions):
+        while len(ret) < len(self.minions) or self.discovering:
             next_ = []
             if bwait and wait:
                 self.__update_wait(wait)
@@ -220,6 +279,24 @@ class Batch:
                 if m not in self.minions:
                     self.minions.append(m)
                     to_run.append(m)
+            else:
+                if self.discovering:
+                    # the discovery ping is done, the targeted minions which
+                    # did not return it are down
+                    self.discovering = False
+                    if not self.quiet and not self.minions:
+                        salt.utils.stringutils.print_cli(
+                            "No minions matched the target."
+                        )
+                    elif not self.quiet:
+                        for down_minion in sorted(
+                            self.targeted.difference(self.minions)
+                        ):
+                            salt.utils.stringutils.print_cli(
+                                "Minion {} did not respond. No job will be sent.".format(
+                                    down_minion
+                                )
+                            )
 
             for queue in iters:
                 try:
@@ -228,10 +305,10 @@ class Batch:
                     while True:
                         part = next(queue)
                         if part is None:
+                            if ncnt >= idle_polls:
+                                break
                             time.sleep(0.01)
                             ncnt += 1
-                            if ncnt > 5:
-                                break
                             continue
                         if self.opts.get("raw"):
                             parts.update({part["data"]["id"]: part})
@@ -615,6 +615,8 @@ class LocalClient:
             opts["gather_job_timeout"] = kwargs["gather_job_timeout"]
         if "batch_wait" in kwargs:
             opts["batch_wait"] = int(kwargs["batch_wait"])
+        if "batch_stream" in kwargs:
+            opts["batch_stream"] = kwargs["batch_stream"]
 
         eauth = {}
         if "eauth" in kwargs:
@@ -1149,6 +1151,9 @@ class LocalClient:
 
         # timeouts per minion, id_ -> timeout time
         minion_timeouts = {}
+        # minions which sent heartbeats for the job, id_ -> heartbeat interval
+        heartbeats = {}
+        heartbeat_tag = "salt/job/{}/heartbeat/".format(jid)
 
         found = set()
         missing = set()
@@ -1194,6 +1199,15 @@ class LocalClient:
                 # if we got None, then there were no events
                 if raw is None:
                     break
+                if raw.get("tag", "").startswith(heartbeat_tag):
+                    # the minion is still running the job
+                    id_ = raw["tag"][len(heartbeat_tag) :]
+                    heartbeats[id_] = raw["data"].get("interval", 0)
+                    if id_ not in found:
+                        minions.add(id_)
+                        minion_timeouts[id_] = time.time() + timeout
+                        minions_running = True
+                    continue
                 if "minions" in raw.get("data", {}):
                     minions.update(raw["data"]["minions"])
                     if "missing" in raw.get("data", {}):
@@ -1254,10 +1268,14 @@ class LocalClient:
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
-                # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(
-                    jid, list(minions - found), "list", **kwargs
-                )
+                # since this is a new ping, no one has responded yet. The
+                # minions sending heartbeats for the job tell on their own
+                # whether they are still running it, so they are not asked.
+                unknown = minions - found - set(heartbeats)
+                if unknown:
+                    jinfo = self.gather_job_info(jid, list(unknown), "list", **kwargs)
+                else:
+                    jinfo = {}
                 minions_running = False
                 # if we weren't assigned any jid that means the master thinks
                 # we have nothing to send
@@ -1267,7 +1285,11 @@ class LocalClient:
                     jinfo_iter = self.get_returns_no_block(
                         "salt/job/{}".format(jinfo["jid"])
                     )
-                timeout_at = time.time() + gather_job_timeout
+                # wait for at least one more heartbeat from each minion
+                timeout_at = time.time() + max(
+                    [gather_job_timeout]
+                    + [2 * heartbeats[id_] for id_ in minions - found - unknown]
+                )
                 # if you are a syndic, wait a little longer
                 if self.opts["order_masters"]:
                     timeout_at += self.opts.get("syndic_wait", 1)
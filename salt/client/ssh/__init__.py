@@ -4,6 +4,7 @@ Create ssh executor system
 
 import base64
 import binascii
+import concurrent.futures
 import copy
 import datetime
 import getpass
@@ -11,11 +12,13 @@ import hashlib
 import logging
 import multiprocessing
 import os
+import queue
 import re
 import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import uuid
 
@@ -313,6 +316,10 @@ class SSH:
             python3_bin=self.opts["python3_bin"],
             extended_cfg=self.opts.get("ssh_ext_alternatives"),
         )
+        if self.opts.get("ssh_thin_delta"):
+            # Keep the manifest of the thin, to deploy only the files which
+            # change once it is replaced
+            salt.utils.thin.gen_manifest(self.thin, self.opts["cachedir"])
         self.mods = mod_data(self.fsclient)
 
     @property
@@ -516,7 +523,7 @@ class SSH:
             return {host: stderr}
         return {host: stdout}
 
-    def handle_routine(self, que, opts, host, target, mine=False):
+    def handle_routine(self, que, opts, host, target, mine=False, fsclient=None):
         """
         Run the routine in a "Thread", put a dict on the queue
         """
@@ -526,7 +533,7 @@ class SSH:
             opts["argv"],
             host,
             mods=self.mods,
-            fsclient=self.fsclient,
+            fsclient=fsclient or self.fsclient,
             thin=self.thin,
             mine=mine,
             **target
@@ -552,11 +559,37 @@ class SSH:
             }
         que.put(ret)
 
+    def _prepare_target(self, host):
+        """
+        Fill in the defaults of a target, return the return to use for it if
+        it cannot be run
+        """
+        for default in self.defaults:
+            if default not in self.targets[host]:
+                self.targets[host][default] = self.defaults[default]
+        if "host" not in self.targets[host]:
+            self.targets[host]["host"] = host
+        if self.targets[host].get("winrm") and not HAS_WINSHELL:
+            log_msg = "Please contact sales@saltstack.com for access to the enterprise saltwinshell module."
+            log.debug(log_msg)
+            return {
+                "fun_args": [],
+                "jid": None,
+                "return": log_msg,
+                "retcode": 1,
+                "fun": "",
+                "id": host,
+            }
+        return None
+
     def handle_ssh(self, mine=False):
         """
         Spin up the needed threads or processes and execute the subsequent
         routines
         """
+        if self.opts.get("ssh_use_threads", False):
+            yield from self._handle_ssh_threads(mine=mine)
+            return
         que = multiprocessing.Queue()
         running = {}
         target_iter = self.targets.__iter__()
@@ -573,24 +606,10 @@ class SSH:
                 except StopIteration:
                     init = True
                     continue
-                for default in self.defaults:
-                    if default not in self.targets[host]:
-                        self.targets[host][default] = self.defaults[default]
-                if "host" not in self.targets[host]:
-                    self.targets[host]["host"] = host
-                if self.targets[host].get("winrm") and not HAS_WINSHELL:
+                no_ret = self._prepare_target(host)
+                if no_ret is not None:
                     returned.add(host)
                     rets.add(host)
-                    log_msg = "Please contact sales@saltstack.com for access to the enterprise saltwinshell module."
-                    log.debug(log_msg)
-                    no_ret = {
-                        "fun_args": [],
-                        "jid": None,
-                        "return": log_msg,
-                        "retcode": 1,
-                        "fun": "",
-                        "id": host,
-                    }
                     yield {host: no_ret}
                     continue
                 args = (
@@ -651,6 +670,55 @@ class SSH:
             ) >= len(running):
                 time.sleep(0.1)
 
+    def _handle_ssh_threads(self, mine=False):
+        """
+        Execute the routines in a pool of ssh_max_procs threads, rather than
+        in a process per target
+        """
+        if not self.targets:
+            log.error("No matching targets found in roster.")
+            return
+        que = queue.Queue()
+        # The wrapper functions point the file client at the cachedir of the
+        # target they run for, so each thread gets a file client of its own
+        local = threading.local()
+
+        def routine(host):
+            if not hasattr(local, "fsclient"):
+                local.fsclient = salt.fileclient.FSClient(self.opts)
+            self.handle_routine(
+                que, self.opts, host, self.targets[host], mine, local.fsclient
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.opts.get("ssh_max_procs", 25)
+        ) as pool:
+            running = {}
+            for host in self.targets:
+                no_ret = self._prepare_target(host)
+                if no_ret is not None:
+                    yield {host: no_ret}
+                    continue
+                running[pool.submit(routine, host)] = host
+            returns = {}
+            for future in concurrent.futures.as_completed(running):
+                host = running[future]
+                # the routine puts its return on the queue before it is done
+                while True:
+                    try:
+                        ret = que.get(False)
+                    except queue.Empty:
+                        break
+                    returns[ret["id"]] = ret["ret"]
+                if host in returns:
+                    yield {host: returns.pop(host)}
+                    continue
+                error = (
+                    "Target '{}' did not return any data, probably due to an error."
+                ).format(host)
+                log.error(error, exc_info=future.exception())
+                yield {host: error}
+
     def run_iter(self, mine=False, jid=None):
         """
         Execute and yield returns as they come in, do not print to the display
@@ -1011,21 +1079,53 @@ class Single:
             return False
         return True
 
-    def deploy(self):
+    def deploy(self, checksum=None):
         """
         Deploy salt-thin
+
+        If the checksum of the thin deployed on the target is given, only the
+        files which changed since then are sent, when ssh_thin_delta is set.
         """
+        if checksum and self.opts.get("ssh_thin_delta"):
+            delta = salt.utils.thin.gen_delta(
+                self.thin, self.opts["cachedir"], checksum
+            )
+            if delta:
+                self.shell.send(
+                    delta,
+                    os.path.join(self.thin_dir, "salt-thin-delta.tgz"),
+                )
+                # The ext_mods are left in place, the shim asks for them if
+                # they changed
+                return True
         self.shell.send(
             self.thin, os.path.join(self.thin_dir, "salt-thin.tgz"),
         )
         self.deploy_ext()
         return True
 
-    def deploy_ext(self):
+    def deploy_ext(self, version=None):
         """
         Deploy the ext_mods tarball
+
+        If the version of the ext_mods deployed on the target is given, only
+        the modules which changed since then are sent, when ssh_thin_delta is
+        set.
         """
         if self.mods.get("file"):
+            if version and self.opts.get("ssh_thin_delta"):
+                delta = salt.utils.thin.gen_delta(
+                    self.mods["file"],
+                    self.opts["cachedir"],
+                    version,
+                    self.mods["version"],
+                )
+                if delta:
+                    self.shell.send(
+                        delta,
+                        os.path.join(self.thin_dir, "salt-ext_mods-delta.tgz"),
+                    )
+                    return True
             self.shell.send(
                 self.mods["file"], os.path.join(self.thin_dir, "salt-ext_mods.tgz"),
             )
@@ -1289,6 +1389,7 @@ OPTIONS.checksum = '{checksum}'
 OPTIONS.hashfunc = '{hashfunc}'
 OPTIONS.version = '{version}'
 OPTIONS.ext_mods = '{ext_mods}'
+OPTIONS.delta = {delta}
 OPTIONS.wipe = {wipe}
 OPTIONS.tty = {tty}
 OPTIONS.cmd_umask = {cmd_umask}
@@ -1301,6 +1402,7 @@ ARGS = {arguments}\n'''.format(
             hashfunc="sha1",
             version=salt.version.__version__,
             ext_mods=self.mods.get("version", ""),
+            delta=bool(self.opts.get("ssh_thin_delta")),
             wipe=self.wipe,
             tty=self.tty,
             cmd_umask=self.cmd_umask,
@@ -1445,11 +1547,13 @@ ARGS = {arguments}\n'''.format(
             # is a SHIM command for the master.
             shim_command = re.split(r"\r?\n", stdout, 1)[0].strip()
             log.debug("SHIM retcode(%s) and command: %s", retcode, shim_command)
-            if (
-                "deploy" == shim_command
-                and retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY
+            # The delta commands come with the checksum or version of what is
+            # deployed on the target
+            shim_command, _, deployed = shim_command.partition(" ")
+            if shim_command in ("deploy", "deploy_delta") and (
+                retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY
             ):
-                self.deploy()
+                self.deploy(checksum=deployed or None)
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
                 if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
                     if not self.tty:
@@ -1481,7 +1585,7 @@ ARGS = {arguments}\n'''.format(
                     while re.search(RSTR_RE, stderr):
                         stderr = re.split(RSTR_RE, stderr, 1)[1].strip()
             elif "ext_mods" == shim_command:
-                self.deploy_ext()
+                self.deploy_ext(version=deployed or None)
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
                 if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
                     # If RSTR is not seen in both stdout and stderr then there
@@ -1681,6 +1785,8 @@ def mod_data(fsclient):
     )
     mods = {"version": ver, "file": ext_tar_path}
     if os.path.isfile(ext_tar_path):
+        if fsclient.opts.get("ssh_thin_delta"):
+            salt.utils.thin.gen_manifest(ext_tar_path, fsclient.opts["cachedir"], ver)
         return mods
     tfp = tarfile.open(ext_tar_path, "w:gz")
     verfile = os.path.join(fsclient.opts["cachedir"], "ext_mods.ver")
@@ -1691,6 +1797,10 @@ def mod_data(fsclient):
         for fn_ in ret[ref]:
             tfp.add(ret[ref][fn_], os.path.join(ref, fn_))
     tfp.close()
+    if fsclient.opts.get("ssh_thin_delta"):
+        # Keep the manifest of the modules, to deploy only the ones which
+        # change once they are replaced
+        salt.utils.thin.gen_manifest(ext_tar_path, fsclient.opts["cachedir"], ver)
     return mods
 
 
@@ -147,9 +147,8 @@ class Shell:
         """
         Return options to pass to ssh
         """
-        # TODO ControlMaster does not work without ControlPath
-        # user could take advantage of it if they set ControlPath in their
-        # ssh config.  Also, ControlPersist not widely available.
+        # ControlMaster does not work without ControlPath, which is set when
+        # ssh_control_persist is enabled, or can be set in the ssh config.
         options = [
             "ControlMaster=auto",
             "StrictHostKeyChecking=no",
@@ -189,6 +188,24 @@ class Shell:
     def _ssh_opts(self):
         return " ".join(["-o {}".format(opt) for opt in self.ssh_options])
 
+    def _control_opts(self):
+        """
+        Return the options which make the ssh and scp commands to the host
+        share one connection, kept open for ssh_control_persist seconds
+        """
+        persist = self.opts.get("ssh_control_persist", 0)
+        if not persist:
+            return ""
+        control_dir = os.path.join(self.opts["cachedir"], "ssh_mux")
+        if not os.path.isdir(control_dir):
+            os.makedirs(control_dir, mode=0o700, exist_ok=True)
+        options = [
+            "ControlMaster=auto",
+            "ControlPath={}".format(os.path.join(control_dir, "%C")),
+            "ControlPersist={}".format(persist),
+        ]
+        return " ".join(["-o {}".format(opt) for opt in options])
+
     def _copy_id_str_old(self):
         """
         Return the string to execute ssh-copy-id
@@ -261,6 +278,9 @@ class Shell:
             )
         if self.ssh_options:
             command.append(self._ssh_opts())
+        control_opts = self._control_opts()
+        if control_opts:
+            command.append(control_opts)
 
         command.append(cmd)
 
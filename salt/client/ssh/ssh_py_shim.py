@@ -10,6 +10,7 @@ separate file, for convenience of development.
 from __future__ import absolute_import, print_function
 
 import hashlib
+import json
 import os
 import shutil
 import stat
@@ -20,6 +21,12 @@ import time
 
 THIN_ARCHIVE = "salt-thin.tgz"
 EXT_ARCHIVE = "salt-ext_mods.tgz"
+THIN_DELTA_ARCHIVE = "salt-thin-delta.tgz"
+EXT_DELTA_ARCHIVE = "salt-ext_mods-delta.tgz"
+# The checksum of the thin archive the thin dir was last brought up to date with
+THIN_CHECKSUM = "thin-checksum"
+# Keep this in sync with salt/utils/thin.py
+DELTA_MANIFEST = "salt-delta.json"
 
 # Keep these in sync with salt/defaults/exitcodes.py
 EX_THIN_PYTHON_INVALID = 10
@@ -101,11 +108,20 @@ def is_windows():
     return sys.platform.startswith("win")
 
 
-def need_deployment():
+def need_deployment(delta=False):
     """
     Salt thin needs to be deployed - prep the target directory and emit the
     delimiter and exit code that signals a required deployment.
+
+    If delta is True and the checksum of the deployed thin is known, only ask
+    for the files which changed since then.
     """
+    checksum_path = os.path.join(OPTIONS.saltdir, THIN_CHECKSUM)
+    if delta and OPTIONS.delta and os.path.isfile(checksum_path):
+        with open(checksum_path, "r") as cfp:
+            checksum = cfp.readline().strip()
+        sys.stdout.write("{0}\ndeploy_delta {1}\n".format(OPTIONS.delimiter, checksum))
+        sys.exit(EX_THIN_DEPLOY)
     if os.path.exists(OPTIONS.saltdir):
         shutil.rmtree(OPTIONS.saltdir)
     old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
@@ -163,9 +179,29 @@ def get_hash(path, form="sha1", chunk_size=4096):
         return hash_obj.hexdigest()
 
 
+def apply_delta(path):
+    """
+    Remove the files listed by the delta archive unpacked in path, and return
+    the checksum it brought path up to date with, or None if the archive
+    unpacked was not a delta.
+    """
+    delta_path = os.path.join(path, DELTA_MANIFEST)
+    if not os.path.isfile(delta_path):
+        return None
+    with open(delta_path, "r") as dfp:
+        delta = json.load(dfp)
+    os.unlink(delta_path)
+    root = os.path.normpath(path)
+    for name in delta["remove"]:
+        target = os.path.normpath(os.path.join(root, name))
+        if target.startswith(root + os.sep) and os.path.lexists(target):
+            os.unlink(target)
+    return delta["checksum"]
+
+
 def unpack_thin(thin_path):
     """
-    Unpack the Salt thin archive.
+    Unpack the Salt thin archive, or a delta of it.
     """
     tfile = tarfile.TarFile.gzopen(thin_path)
     old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
@@ -176,14 +212,24 @@ def unpack_thin(thin_path):
         os.unlink(thin_path)
     except OSError:
         pass
+    checksum = apply_delta(OPTIONS.saltdir) or OPTIONS.checksum
+    if OPTIONS.delta:
+        with open(os.path.join(OPTIONS.saltdir, THIN_CHECKSUM), "w") as cfp:
+            cfp.write(checksum + "\n")
     reset_time(OPTIONS.saltdir)
 
 
-def need_ext():
+def need_ext(version=None):
     """
     Signal that external modules need to be deployed.
+
+    If the version of the deployed modules is given, only ask for the modules
+    which changed since then.
     """
-    sys.stdout.write("{0}\next_mods\n".format(OPTIONS.delimiter))
+    if OPTIONS.delta and version:
+        sys.stdout.write("{0}\next_mods {1}\n".format(OPTIONS.delimiter, version))
+    else:
+        sys.stdout.write("{0}\next_mods\n".format(OPTIONS.delimiter))
     sys.exit(EX_MOD_DEPLOY)
 
 
@@ -200,6 +246,7 @@ def unpack_ext(ext_path):
     tfile.close()
     os.umask(old_umask)  # pylint: disable=blacklisted-function
     os.unlink(ext_path)
+    apply_delta(modcache)
     ver_path = os.path.join(modcache, "ext_version")
     ver_dst = os.path.join(OPTIONS.saltdir, "ext_version")
     shutil.move(ver_path, ver_dst)
@@ -294,6 +341,11 @@ def main(argv):  # pylint: disable=W0613
         if not os.path.exists(OPTIONS.saltdir):
             need_deployment()
 
+        delta_path = os.path.join(OPTIONS.saltdir, THIN_DELTA_ARCHIVE)
+        delta_applied = os.path.isfile(delta_path)
+        if delta_applied:
+            unpack_thin(delta_path)
+
         code_checksum_path = os.path.normpath(
             os.path.join(OPTIONS.saltdir, "code-checksum")
         )
@@ -314,7 +366,9 @@ def main(argv):  # pylint: disable=W0613
                     cur_code_cs, OPTIONS.code_checksum
                 )
             )
-            need_deployment()
+            # A delta which did not bring the thin up to date calls for a
+            # whole new one
+            need_deployment(delta=not delta_applied)
         # Salt thin exists and is up-to-date - fall through and use it
 
     salt_call_path = os.path.join(OPTIONS.saltdir, "salt-call")
@@ -326,8 +380,11 @@ def main(argv):  # pylint: disable=W0613
         config.write(OPTIONS.config + "\n")
     if OPTIONS.ext_mods:
         ext_path = os.path.join(OPTIONS.saltdir, EXT_ARCHIVE)
+        ext_delta_path = os.path.join(OPTIONS.saltdir, EXT_DELTA_ARCHIVE)
         if os.path.exists(ext_path):
             unpack_ext(ext_path)
+        elif os.path.exists(ext_delta_path):
+            unpack_ext(ext_delta_path)
         else:
             version_path = os.path.join(OPTIONS.saltdir, "ext_version")
             if not os.path.exists(version_path) or not os.path.isfile(version_path):
@@ -335,7 +392,7 @@ def main(argv):  # pylint: disable=W0613
             with open(version_path, "r") as vpo:
                 cur_version = vpo.readline().strip()
             if cur_version != OPTIONS.ext_mods:
-                need_ext()
+                need_ext(cur_version)
     # Fix parameter passing issue
     if len(ARGS) == 1:
         argv_prepared = ARGS[0].split()
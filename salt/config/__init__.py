@@ -158,6 +158,8 @@ VALID_OPTS = immutabletypes.freeze(
         # what commands the master is processing and what the rates are of the executions
         "master_stats": bool,
         "master_stats_event_iter": int,
+        # Fire events with the timings of every publish
+        "publish_stats": bool,
         # The key fingerprint of the higher-level master for the syndic to verify it is talking to the
         # intended master
         "syndic_finger": str,
@@ -238,6 +240,9 @@ VALID_OPTS = immutabletypes.freeze(
         # When using a local file_client, this parameter is used to allow the client to connect to
         # a master for remote execution.
         "use_master_when_local": bool,
+        # The number of requests a remote file client keeps in flight to the master
+        # when caching a batch of files
+        "fileclient_pipeline_depth": int,
         # A map of saltenvs and fileserver backend locations
         "file_roots": dict,
         # A map of saltenvs and fileserver backend locations
@@ -352,6 +357,11 @@ VALID_OPTS = immutabletypes.freeze(
         "enable_gpu_grains": bool,
         # Tell the loader to attempt to import *.zip archives
         "enable_zip_modules": bool,
+        # Cache the modules the loader finds on disk, and their virtual names
+        "loader_discovery_cache": bool,
+        # Cache which modules are unavailable, for the modules whose __virtual__
+        # function is decorated with salt.utils.decorators.cached_virtual
+        "loader_virtual_cache": bool,
         # Tell the client to show minions that have timed out
         "show_timeout": bool,
         # Tell the client to display the jid when a job is published
@@ -373,6 +383,8 @@ VALID_OPTS = immutabletypes.freeze(
         "state_auto_order": bool,
         # Fire events as state chunks are processed by the state compiler
         "state_events": bool,
+        # The number of state chunks which may run at once in child processes
+        "state_concurrency": int,
         # The number of seconds a minion should wait before retry when attempting authentication
         "acceptance_wait_time": float,
         # The number of seconds a minion should wait before giving up during authentication
@@ -436,6 +448,11 @@ VALID_OPTS = immutabletypes.freeze(
         "event_return_blacklist": list,
         # default match type for filtering events tags: startswith, endswith, find, regex, fnmatch
         "event_match_type": str,
+        # The number of bytes of recent events the master event publisher keeps to send
+        # them again to the listeners which ask for them, 0 disables it
+        "event_journal_size": int,
+        # The number of seconds the master event publisher keeps events for
+        "event_journal_ttl": int,
         # This pidfile to write out to when a daemon starts
         "pidfile": str,
         # Used with the SECO range master tops system
@@ -477,6 +494,17 @@ VALID_OPTS = immutabletypes.freeze(
         # The number of MWorker processes for a master to startup. This number needs to scale up as
         # the number of connected minions increases.
         "worker_threads": int,
+        # The maximum number of MWorker processes the adaptive worker pool starts when
+        # requests are waiting for a worker, 0 keeps the number fixed at worker_threads
+        "worker_threads_max": int,
+        # The number of seconds an extra MWorker process stays idle before it is stopped
+        "worker_threads_idle_timeout": int,
+        # How often, in seconds, the adaptive worker pool is scaled
+        "worker_threads_scale_interval": int,
+        # The number of MWorker processes which only serve worker_threads_priority_cmds
+        "worker_threads_priority": int,
+        # The commands which are served by the priority MWorker processes
+        "worker_threads_priority_cmds": list,
         # The port for the master to listen to returns on. The minion needs to connect to this port
         # to send returns.
         "ret_port": int,
@@ -540,6 +568,11 @@ VALID_OPTS = immutabletypes.freeze(
         "git_pillar_refspecs": list,
         "git_pillar_includes": bool,
         "git_pillar_verify_config": bool,
+        # The number of git_pillar remotes fetched at once, and the number of seconds
+        # before giving up on a fetch and before retrying a failed one
+        "git_pillar_fetch_workers": int,
+        "git_pillar_fetch_timeout": int,
+        "git_pillar_fetch_backoff": int,
         # NOTE: gitfs_base, gitfs_fallback, gitfs_mountpoint, and gitfs_root omitted
         # here because their values could conceivably be loaded as non-string types,
         # which is OK because gitfs will normalize them to strings. But rather than
@@ -557,6 +590,11 @@ VALID_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": list,
         "gitfs_refspecs": list,
         "gitfs_disable_saltenv_mapping": bool,
+        # The number of gitfs remotes fetched at once, and the number of seconds
+        # before giving up on a fetch and before retrying a failed one
+        "gitfs_fetch_workers": int,
+        "gitfs_fetch_timeout": int,
+        "gitfs_fetch_backoff": int,
         "hgfs_remotes": list,
         "hgfs_mountpoint": str,
         "hgfs_root": str,
@@ -578,6 +616,16 @@ VALID_OPTS = immutabletypes.freeze(
         "minionfs_blacklist": list,
         # Specify a list of external pillar systems to use
         "ext_pillar": list,
+        # The number of ext_pillar sources called at once on a pool of threads
+        "ext_pillar_concurrency": int,
+        # The seconds each ext_pillar source may take when they are called at once,
+        # either for all sources or as a dict keyed by ext_pillar interface
+        "ext_pillar_timeout": (int, float, dict),
+        # The ext_pillar interfaces which read the data merged from the sources
+        # before them, and so are not called at the same time as those
+        "ext_pillar_stacked": list,
+        # Add the time each ext_pillar source took to the pillar data
+        "ext_pillar_timing": bool,
         # Reserved for future use to version the pillar structure
         "pillar_version": int,
         # Whether or not a copy of the master opts dict should be rendered into minion pillars
@@ -588,6 +636,18 @@ VALID_OPTS = immutabletypes.freeze(
         "pillar_cache_ttl": int,
         # Pillar cache backend. Defaults to `disk` which stores caches in the master cache
         "pillar_cache_backend": str,
+        # The number of processes compiling pillar data for the MWorkers, 0 compiles it in
+        # the MWorkers
+        "pillar_workers": int,
+        # The number of seconds a MWorker waits for the pillar data from the pillar workers
+        "pillar_workers_timeout": int,
+        # Let minions with identical grains and top file matches share pillar compilations
+        "pillar_coalesce_by_grains": bool,
+        # Reuse the render of a pillar SLS file for the minions whose grains, pillar, opts
+        # and salt function results read by its templates are the same
+        "pillar_render_cache": bool,
+        # The number of renders kept per pillar SLS file for `pillar_render_cache`
+        "pillar_render_cache_size": int,
         # Cache the GPG data to avoid having to pass through the gpg renderer
         "gpg_cache": bool,
         # GPG data cache TTL, in seconds. Has no effect unless `gpg_cache` is True
@@ -673,11 +733,19 @@ VALID_OPTS = immutabletypes.freeze(
         "master_job_cache": str,
         # Specify whether the master should store end times for jobs as returns come in
         "job_cache_store_endtime": bool,
+        # The number of minion returns a master worker coalesces before writing them to
+        # the master job cache, 0 writes every return as it comes in
+        "job_cache_batch_size": int,
+        # The maximum number of seconds a return waits in a batch for the job cache
+        "job_cache_batch_interval": float,
         # The minion data cache is a cache of information about the minions stored on the master.
         # This information is primarily the pillar and grains data. The data is cached in the master
         # cachedir under the name of the minion and used to predetermine what minions are expected to
         # reply from executions.
         "minion_data_cache": bool,
+        # Index the grains and pillar found in the minion data cache in memory to
+        # speed up grain and pillar targeting
+        "minion_data_index": bool,
         # The number of seconds between AES key rotations on the master
         "publish_session": int,
         # Defines a salt reactor. See http://docs.saltstack.com/en/latest/topics/reactor/
@@ -804,12 +872,23 @@ VALID_OPTS = immutabletypes.freeze(
         "ssh_config_file": str,
         "ssh_merge_pillar": bool,
         "ssh_run_pre_flight": bool,
+        # The number of seconds salt-ssh keeps a shared connection to each host
+        # open after its last command, 0 opens a connection per command
+        "ssh_control_persist": int,
+        # Run salt-ssh targets in a pool of threads instead of a process each
+        "ssh_use_threads": bool,
+        # Send only the files of the thin and ext_mods which changed since the
+        # last deployment to a salt-ssh target
+        "ssh_thin_delta": bool,
         "cluster_mode": bool,
         "sqlite_queue_dir": str,
         "queue_dirs": list,
         # Instructs the minion to ping its master(s) every n number of minutes. Used
         # primarily as a mitigation technique against minion disconnects.
         "ping_interval": int,
+        # Instructs the minion to tell the master which jobs it is still running
+        # every n number of seconds
+        "job_heartbeat_interval": int,
         # Instructs the salt CLI to print a summary of a minion responses before returning
         "cli_summary": bool,
         # The maximum number of minion connections allowed by the master. Can have performance
@@ -933,6 +1012,8 @@ VALID_OPTS = immutabletypes.freeze(
         "schedule": dict,
         # Whether to fire auth events
         "auth_events": bool,
+        # The number of parsed minion public keys each master worker keeps in memory
+        "minion_pub_key_cache_size": int,
         # Whether to fire Minion data cache refresh events
         "minion_data_cache_events": bool,
         # Enable calling ssh minions from the salt master
@@ -1026,6 +1107,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "file_client": "remote",
         "local": False,
         "use_master_when_local": False,
+        "fileclient_pipeline_depth": 8,
         "file_roots": {
             "base": [salt.syspaths.BASE_FILE_ROOTS_DIR, salt.syspaths.SPM_FORMULA_PATH]
         },
@@ -1072,6 +1154,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "git_pillar_passphrase": "",
         "git_pillar_refspecs": _DFLT_REFSPECS,
         "git_pillar_includes": True,
+        "git_pillar_fetch_workers": 1,
+        "git_pillar_fetch_timeout": 0,
+        "git_pillar_fetch_backoff": 0,
         "gitfs_remotes": [],
         "gitfs_mountpoint": "",
         "gitfs_root": "",
@@ -1091,6 +1176,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": ["branch", "tag", "sha"],
         "gitfs_refspecs": _DFLT_REFSPECS,
         "gitfs_disable_saltenv_mapping": False,
+        "gitfs_fetch_workers": 1,
+        "gitfs_fetch_timeout": 0,
+        "gitfs_fetch_backoff": 0,
         "unique_jid": False,
         "hash_type": "sha256",
         "optimization_order": [0, 1, 2],
@@ -1143,6 +1231,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "enable_fqdns_grains": _DFLT_FQDNS_GRAINS,
         "enable_gpu_grains": True,
         "enable_zip_modules": False,
+        "loader_discovery_cache": False,
+        "loader_virtual_cache": False,
         "state_verbose": True,
         "state_output": "full",
         "state_output_diff": False,
@@ -1150,6 +1240,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_concurrency": 1,
         "snapper_states": False,
         "snapper_states_config": "root",
         "acceptance_wait_time": 10,
@@ -1218,6 +1309,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "cluster_mode": False,
         "restart_on_error": False,
         "ping_interval": 0,
+        "job_heartbeat_interval": 0,
         "username": None,
         "password": None,
         "zmq_filtering": False,
@@ -1263,6 +1355,11 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "auth_mode": 1,
         "user": _MASTER_USER,
         "worker_threads": 5,
+        "worker_threads_max": 0,
+        "worker_threads_idle_timeout": 300,
+        "worker_threads_scale_interval": 5,
+        "worker_threads_priority": 0,
+        "worker_threads_priority_cmds": ["_auth", "_return"],
         "sock_dir": os.path.join(salt.syspaths.SOCK_DIR, "master"),
         "sock_pool_size": 1,
         "ret_port": 4506,
@@ -1321,6 +1418,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "git_pillar_passphrase": "",
         "git_pillar_refspecs": _DFLT_REFSPECS,
         "git_pillar_includes": True,
+        "git_pillar_fetch_workers": 1,
+        "git_pillar_fetch_timeout": 0,
+        "git_pillar_fetch_backoff": 0,
         "git_pillar_verify_config": True,
         "gitfs_remotes": [],
         "gitfs_mountpoint": "",
@@ -1341,6 +1441,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": ["branch", "tag", "sha"],
         "gitfs_refspecs": _DFLT_REFSPECS,
         "gitfs_disable_saltenv_mapping": False,
+        "gitfs_fetch_workers": 1,
+        "gitfs_fetch_timeout": 0,
+        "gitfs_fetch_backoff": 0,
         "hgfs_remotes": [],
         "hgfs_mountpoint": "",
         "hgfs_root": "",
@@ -1362,11 +1465,16 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "max_event_size": 1048576,
         "master_stats": False,
         "master_stats_event_iter": 60,
+        "publish_stats": False,
         "minionfs_env": "base",
         "minionfs_mountpoint": "",
         "minionfs_whitelist": [],
         "minionfs_blacklist": [],
         "ext_pillar": [],
+        "ext_pillar_concurrency": 1,
+        "ext_pillar_timeout": 0,
+        "ext_pillar_stacked": ["stack"],
+        "ext_pillar_timing": False,
         "pillar_version": 2,
         "pillar_opts": False,
         "pillar_safe_render_error": True,
@@ -1376,6 +1484,11 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "pillar_cache": False,
         "pillar_cache_ttl": 3600,
         "pillar_cache_backend": "disk",
+        "pillar_workers": 0,
+        "pillar_workers_timeout": 60,
+        "pillar_coalesce_by_grains": False,
+        "pillar_render_cache": False,
+        "pillar_render_cache_size": 64,
         "gpg_cache": False,
         "gpg_cache_ttl": 86400,
         "gpg_cache_backend": "disk",
@@ -1432,7 +1545,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ext_job_cache": "",
         "master_job_cache": "local_cache",
         "job_cache_store_endtime": False,
+        "job_cache_batch_size": 0,
+        "job_cache_batch_interval": 1.0,
         "minion_data_cache": True,
+        "minion_data_index": False,
         "enforce_mine_cache": False,
         "ipc_mode": _DFLT_IPC_MODE,
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
@@ -1475,6 +1591,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "event_return_whitelist": [],
         "event_return_blacklist": [],
         "event_match_type": "startswith",
+        "event_journal_size": 0,
+        "event_journal_ttl": 60,
         "runner_returns": True,
         "serial": "msgpack",
         "test": False,
@@ -1485,12 +1603,15 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_concurrency": 1,
         "search": "",
         "loop_interval": 60,
         "nodegroups": {},
         "ssh_list_nodegroups": {},
         "ssh_use_home_key": False,
         "cython_enable": False,
+        "loader_discovery_cache": False,
+        "loader_virtual_cache": False,
         "enable_gpu_grains": False,
         # XXX: Remove 'key_logfile' support in 2014.1.0
         "key_logfile": os.path.join(salt.syspaths.LOGS_DIR, "key"),
@@ -1544,6 +1665,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ssh_identities_only": False,
         "ssh_log_file": os.path.join(salt.syspaths.LOGS_DIR, "ssh"),
         "ssh_config_file": os.path.join(salt.syspaths.HOME_DIR, ".ssh", "config"),
+        "ssh_control_persist": 0,
+        "ssh_use_threads": False,
+        "ssh_thin_delta": False,
         "cluster_mode": False,
         "sqlite_queue_dir": os.path.join(salt.syspaths.CACHE_DIR, "master", "queues"),
         "queue_dirs": [],
@@ -1581,6 +1705,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "salt_cp_chunk_size": 98304,
         "require_minion_sign_messages": False,
         "drop_messages_signature_fail": False,
+        "minion_pub_key_cache_size": 1024,
         "discovery": False,
         "schedule": {},
         "auth_events": True,
@@ -3955,6 +4080,14 @@ def apply_master_config(overrides=None, defaults=None):
         )
         opts["worker_threads"] = 3
 
+    if opts.get("pillar_workers") and opts.get("ipc_mode") == "tcp":
+        log.warning(
+            "The 'pillar_workers' setting in '%s' is not supported with "
+            "'ipc_mode: tcp'. Compiling the pillar data in the worker threads.",
+            opts["conf_file"],
+        )
+        opts["pillar_workers"] = 0
+
     opts.setdefault("pillar_source_merging_strategy", "smart")
 
     # Make sure hash_type is lowercase
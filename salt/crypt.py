@@ -6,15 +6,18 @@ authenticating peers
 
 import base64
 import binascii
+import collections
 import copy
 import getpass
 import hashlib
 import hmac
+import inspect
 import logging
 import os
 import random
 import stat
 import sys
+import threading
 import time
 import traceback
 import weakref
@@ -78,6 +81,19 @@ if not HAS_M2 and not HAS_CRYPTO:
     except ImportError:
         HAS_CRYPTO = False
 
+# pycryptodome can encrypt and decrypt straight into a preallocated buffer
+HAS_CIPHER_OUTPUT = False
+if not HAS_M2 and HAS_CRYPTO:
+    try:
+        HAS_CIPHER_OUTPUT = (
+            "output"
+            in inspect.signature(
+                AES.new(bytes(16), AES.MODE_CBC, bytes(16)).encrypt
+            ).parameters
+        )
+    except (TypeError, ValueError):
+        pass
+
 
 log = logging.getLogger(__name__)
 
@@ -211,11 +227,10 @@ def get_rsa_key(path, passphrase):
     return _get_key_with_evict(path, str(os.path.getmtime(path)), passphrase)
 
 
-def get_rsa_pub_key(path):
+def _load_rsa_pub_key(path):
     """
-    Read a public key off the disk.
+    Read a public key off the disk and parse it.
     """
-    log.debug("salt.crypt.get_rsa_pub_key: Loading public key")
     if HAS_M2:
         with salt.utils.files.fopen(path, "rb") as f:
             data = f.read().replace(b"RSA ", b"")
@@ -227,6 +242,84 @@ def get_rsa_pub_key(path):
     return key
 
 
+class PublicKeyCache:
+    """
+    A bounded LRU cache of parsed public keys.
+
+    Every entry is validated against the inode, size and modification time of
+    the key file before it is returned, so a key which was replaced, moved or
+    removed, i.e. by ``salt-key`` running in another process, is loaded again
+    (or raises ``OSError``) instead of being served from the cache.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self._keys = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def resize(self, size):
+        """
+        Change the number of keys kept in the cache, ``0`` disables it
+        """
+        with self._lock:
+            self.size = size
+            while len(self._keys) > max(size, 0):
+                self._keys.popitem(last=False)
+
+    def evict(self, path=None):
+        """
+        Drop the key loaded from ``path``, or every key if ``path`` is None
+        """
+        with self._lock:
+            if path is None:
+                self._keys.clear()
+            else:
+                self._keys.pop(path, None)
+
+    def get(self, path):
+        """
+        Return the parsed public key stored at ``path``
+        """
+        if self.size <= 0:
+            return _load_rsa_pub_key(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Let the loader report the missing or unreadable key
+            self.evict(path)
+            return _load_rsa_pub_key(path)
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._keys.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._keys.move_to_end(path)
+                return cached[1]
+        log.debug("salt.crypt.get_rsa_pub_key: Loading public key")
+        key = _load_rsa_pub_key(path)
+        with self._lock:
+            self._keys[path] = (stamp, key)
+            self._keys.move_to_end(path)
+            while len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+        return key
+
+
+# The public keys of the minions (or of the master on a minion) used to verify
+# signatures and encrypt payloads
+PUB_KEY_CACHE = PublicKeyCache()
+
+
+def get_rsa_pub_key(path):
+    """
+    Read a public key off the disk. The parsed key is kept in
+    ``PUB_KEY_CACHE`` for as long as the file is not changed.
+    """
+    return PUB_KEY_CACHE.get(path)
+
+
 def sign_message(privkey_path, message, passphrase=None):
     """
     Use Crypto.Signature.PKCS1_v1_5 to sign a message. Returns the signature.
@@ -837,6 +930,8 @@ class AsyncAuth:
                 ):
                     self._finger_fail(self.opts["master_finger"], m_pub_fn)
         auth["publish_port"] = payload["publish_port"]
+        if "route_cmds" in payload:
+            auth["route_cmds"] = payload["route_cmds"]
         raise salt.ext.tornado.gen.Return(auth)
 
     def get_keys(self):
@@ -1442,6 +1537,8 @@ class SAuth(AsyncAuth):
                 ):
                     self._finger_fail(self.opts["master_finger"], m_pub_fn)
         auth["publish_port"] = payload["publish_port"]
+        if "route_cmds" in payload:
+            auth["route_cmds"] = payload["route_cmds"]
         return auth
 
 
@@ -1477,73 +1574,106 @@ class Crypticle:
         assert len(key) == key_size / 8 + cls.SIG_SIZE, "invalid key"
         return key[: -cls.SIG_SIZE], key[-cls.SIG_SIZE :]
 
-    def encrypt(self, data):
+    def _pad(self, *chunks):
         """
-        encrypt data with AES-CBC and sign it with HMAC-SHA256
+        Concatenate the chunks into a single buffer padded to the AES block
+        size
+        """
+        size = sum(len(chunk) for chunk in chunks)
+        pad = self.AES_BLOCK_SIZE - size % self.AES_BLOCK_SIZE
+        buf = bytearray(size + pad)
+        pos = 0
+        for chunk in chunks:
+            buf[pos : pos + len(chunk)] = chunk
+            pos += len(chunk)
+        buf[pos:] = bytes((pad,)) * pad
+        return buf
+
+    def _encrypt(self, data):
+        """
+        Encrypt the padded buffer with AES-CBC and sign it with HMAC-SHA256,
+        the IV, the ciphertext and the signature are written to one buffer
         """
         aes_key, hmac_key = self.keys
-        pad = self.AES_BLOCK_SIZE - len(data) % self.AES_BLOCK_SIZE
-        data = data + salt.utils.stringutils.to_bytes(pad * chr(pad))
         iv_bytes = os.urandom(self.AES_BLOCK_SIZE)
+        end = self.AES_BLOCK_SIZE + len(data)
+        buf = bytearray(end + self.SIG_SIZE)
+        view = memoryview(buf)
+        view[: self.AES_BLOCK_SIZE] = iv_bytes
         if HAS_M2:
             cypher = EVP.Cipher(
                 alg="aes_192_cbc", key=aes_key, iv=iv_bytes, op=1, padding=False
             )
-            encr = cypher.update(data)
-            encr += cypher.final()
+            encr = cypher.update(bytes(data))
+            view[self.AES_BLOCK_SIZE : end] = encr + cypher.final()
+        elif HAS_CIPHER_OUTPUT:
+            cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
+            cypher.encrypt(data, output=view[self.AES_BLOCK_SIZE : end])
         else:
             cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
-            encr = cypher.encrypt(data)
-        data = iv_bytes + encr
-        sig = hmac.new(hmac_key, data, hashlib.sha256).digest()
-        return data + sig
+            view[self.AES_BLOCK_SIZE : end] = cypher.encrypt(bytes(data))
+        view[end:] = hmac.new(hmac_key, view[:end], hashlib.sha256).digest()
+        return buf
 
-    def decrypt(self, data):
+    def _decrypt(self, data):
         """
-        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        Verify the HMAC-SHA256 signature and decrypt the data with AES-CBC,
+        return a memoryview of the plaintext without its padding
         """
         aes_key, hmac_key = self.keys
-        sig = data[-self.SIG_SIZE :]
-        data = data[: -self.SIG_SIZE]
-        if not isinstance(data, bytes):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
             data = salt.utils.stringutils.to_bytes(data)
-        mac_bytes = hmac.new(hmac_key, data, hashlib.sha256).digest()
-        if len(mac_bytes) != len(sig):
-            log.debug("Failed to authenticate message")
-            raise AuthenticationError("message authentication failed")
-        result = 0
-
-        for zipped_x, zipped_y in zip(mac_bytes, sig):
-            result |= zipped_x ^ zipped_y
-        if result != 0:
+        view = memoryview(data)
+        sig = view[-self.SIG_SIZE :]
+        view = view[: -self.SIG_SIZE]
+        mac_bytes = hmac.new(hmac_key, view, hashlib.sha256).digest()
+        if not hmac.compare_digest(mac_bytes, sig):
             log.debug("Failed to authenticate message")
             raise AuthenticationError("message authentication failed")
-        iv_bytes = data[: self.AES_BLOCK_SIZE]
-        data = data[self.AES_BLOCK_SIZE :]
+        iv_bytes = bytes(view[: self.AES_BLOCK_SIZE])
+        view = view[self.AES_BLOCK_SIZE :]
         if HAS_M2:
             cypher = EVP.Cipher(
                 alg="aes_192_cbc", key=aes_key, iv=iv_bytes, op=0, padding=False
             )
-            encr = cypher.update(data)
+            encr = cypher.update(bytes(view))
             data = encr + cypher.final()
+        elif HAS_CIPHER_OUTPUT:
+            cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
+            data = bytearray(len(view))
+            cypher.decrypt(view, output=data)
         else:
             cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
-            data = cypher.decrypt(data)
+            data = cypher.decrypt(bytes(view))
+        data = memoryview(data)
         return data[: -data[-1]]
 
+    def encrypt(self, data):
+        """
+        encrypt data with AES-CBC and sign it with HMAC-SHA256
+        """
+        return bytes(self._encrypt(self._pad(data)))
+
+    def decrypt(self, data):
+        """
+        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        """
+        return self._decrypt(data).tobytes()
+
     def dumps(self, obj):
         """
         Serialize and encrypt a python object
         """
-        return self.encrypt(self.PICKLE_PAD + self.serial.dumps(obj))
+        return bytes(self._encrypt(self._pad(self.PICKLE_PAD, self.serial.dumps(obj))))
 
     def loads(self, data, raw=False):
         """
         Decrypt and un-serialize a python object
         """
-        data = self.decrypt(data)
+        data = self._decrypt(data)
         # simple integrity check to verify that we got meaningful data
-        if not data.startswith(self.PICKLE_PAD):
+        if data[: len(self.PICKLE_PAD)] != self.PICKLE_PAD:
             return {}
+        # The load is unpacked straight from the decrypted buffer
         load = self.serial.loads(data[len(self.PICKLE_PAD) :], raw=raw)
         return load
@@ -751,10 +751,10 @@ class RemoteFuncs:
         )
         data = pillar.compile_pillar()
         if self.opts.get("minion_data_cache", False):
-            self.cache.store(
-                "minions/{}".format(load["id"]),
-                "data",
-                {"grains": load["grains"], "pillar": data},
+            mdata = {"grains": load["grains"], "pillar": data}
+            self.cache.store("minions/{}".format(load["id"]), "data", mdata)
+            salt.utils.minions.update_minion_data_index(
+                self.opts, self.cache, load["id"], mdata
             )
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
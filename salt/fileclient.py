@@ -14,6 +14,8 @@ import urllib.parse
 
 import salt.client
 import salt.crypt
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
 import salt.fileserver
 import salt.loader
 import salt.payload
@@ -234,17 +236,17 @@ class Client:
         log.info("Caching directory '%s' for environment '%s'", path, saltenv)
         # go through the list of all files finding ones that are in
         # the target directory and caching them
+        paths = []
         for fn_ in self.file_list(saltenv):
             fn_ = salt.utils.data.decode(fn_)
             if fn_.strip() and fn_.startswith(path):
                 if salt.utils.stringutils.check_include_exclude(
                     fn_, include_pat, exclude_pat
                 ):
-                    fn_ = self.cache_file(
-                        salt.utils.url.create(fn_), saltenv, cachedir=cachedir
-                    )
-                    if fn_:
-                        ret.append(fn_)
+                    paths.append(salt.utils.url.create(fn_))
+        ret.extend(
+            fn_ for fn_ in self.cache_files(paths, saltenv, cachedir=cachedir) if fn_
+        )
 
         if include_empty:
             # Break up the path into a list containing the bottom-level
@@ -1298,6 +1300,157 @@ class RemoteClient(Client):
 
         return dest
 
+    def cache_files(self, paths, saltenv="base", cachedir=None):
+        """
+        Download a list of files stored on the master and put them in the
+        minion file cache, fetching the salt:// files in one pipelined batch
+        """
+        if isinstance(paths, str):
+            paths = paths.split(",")
+        if self.opts.get("fileclient_pipeline_depth", 1) < 2 or isinstance(
+            self.channel, salt.fileserver.FSChan
+        ):
+            return super().cache_files(paths, saltenv, cachedir=cachedir)
+        ret = []
+        fetch = {}
+        for idx, path in enumerate(paths):
+            if path.startswith("salt://"):
+                fetch[idx] = path
+                ret.append(False)
+            else:
+                ret.append(self.cache_file(path, saltenv, cachedir=cachedir))
+        if fetch:
+            fetched = self.fetch_files(list(fetch.values()), saltenv, cachedir=cachedir)
+            for idx, dest in zip(fetch, fetched):
+                ret[idx] = dest
+        return ret
+
+    def fetch_files(self, paths, saltenv="base", cachedir=None):
+        """
+        Cache a list of salt:// files from the master, keeping up to
+        ``fileclient_pipeline_depth`` requests in flight at once. The hashes
+        of all of the files are requested first and the files whose cached
+        copy matches are not downloaded again. Returns the cache location of
+        each file, or False if the file is not found on the master.
+        """
+        depth = max(self.opts.get("fileclient_pipeline_depth", 1), 1)
+        # Every socket of the pool carries one outstanding request
+        opts = dict(self.opts)
+        opts["sock_pool_size"] = max(depth, opts.get("sock_pool_size", 1))
+        io_loop = salt.ext.tornado.ioloop.IOLoop()
+        channel = salt.transport.client.AsyncReqChannel.factory(opts, io_loop=io_loop)
+        try:
+            ret, failed = io_loop.run_sync(
+                lambda: self._fetch_files(channel, paths, saltenv, cachedir, depth)
+            )
+        finally:
+            channel.close()
+            io_loop.close(all_fds=True)
+        for idx in failed:
+            # Fall back to the sequential transfer, which retries and resets
+            # the channel
+            ret[idx] = self.get_file(paths[idx], "", True, saltenv, cachedir=cachedir)
+        return ret
+
+    @salt.ext.tornado.gen.coroutine
+    def _pipeline(self, depth, func, items):
+        """
+        Call the coroutine ``func`` on every item of ``items`` with at most
+        ``depth`` calls running at once, return the results in order
+        """
+        ret = [None] * len(items)
+        queue = iter(enumerate(items))
+
+        @salt.ext.tornado.gen.coroutine
+        def _worker():
+            for idx, item in queue:
+                ret[idx] = yield func(*item)
+
+        yield [_worker() for _ in range(min(depth, len(items)))]
+        raise salt.ext.tornado.gen.Return(ret)
+
+    @salt.ext.tornado.gen.coroutine
+    def _fetch_files(self, channel, paths, saltenv, cachedir, depth):
+        """
+        Hash all of the files on the master, then serve the ones that changed
+        """
+        files = []
+        for path in paths:
+            path, senv = salt.utils.url.split_env(path)
+            files.append((self._check_proto(path), senv or saltenv))
+
+        def _hash(path, saltenv):
+            load = {"path": path, "saltenv": saltenv, "cmd": "_file_hash"}
+            return channel.send(load)
+
+        hashes = yield self._pipeline(depth, _hash, files)
+
+        ret = []
+        serve = []
+        for idx, ((path, senv), hash_server) in enumerate(zip(files, hashes)):
+            if not hash_server:
+                log.debug("Could not find file '%s' in saltenv '%s'", path, senv)
+                ret.append(False)
+                continue
+            with self._cache_loc(path, senv, cachedir=cachedir) as dest:
+                ret.append(dest)
+            if os.path.isfile(dest):
+                hash_local = salt.utils.hashutils.get_hash(
+                    dest, form=hash_server.get("hash_type", "md5")
+                )
+                if hash_local == hash_server.get("hsum"):
+                    continue
+            serve.append((idx, channel, path, senv, dest, hash_server))
+
+        served = yield self._pipeline(depth, self._serve_file, serve)
+        failed = [item[0] for item, done in zip(serve, served) if not done]
+        raise salt.ext.tornado.gen.Return((ret, failed))
+
+    @salt.ext.tornado.gen.coroutine
+    def _serve_file(self, idx, channel, path, saltenv, dest, hash_server):
+        """
+        Download one file chunk by chunk and verify it against the hash the
+        master returned. Returns False if the transfer has to be retried.
+        """
+        log.debug(
+            "Fetching file from saltenv '%s', ** attempting ** '%s'", saltenv, path
+        )
+        load = {"path": path, "saltenv": saltenv, "cmd": "_serve_file", "loc": 0}
+        # If a directory was formerly cached at this path, then remove it to
+        # avoid a traceback trying to write the file
+        if os.path.isdir(dest):
+            salt.utils.files.rm_rf(dest)
+        with salt.utils.atomicfile.atomic_open(dest, "wb+") as fn_:
+            while True:
+                load["loc"] = fn_.tell()
+                data = yield channel.send(load, raw=True)
+                data = decode_dict_keys_to_str(data)
+                try:
+                    if not data["data"]:
+                        break
+                    if data.get("gzip", None):
+                        data = salt.utils.gzip_util.uncompress(data["data"])
+                    else:
+                        data = data["data"]
+                except (TypeError, KeyError) as exc:
+                    log.warning(
+                        "Data transport is broken, got: %s, exception: %s",
+                        data,
+                        exc,
+                    )
+                    raise salt.ext.tornado.gen.Return(False)
+                if isinstance(data, str):
+                    data = data.encode()
+                fn_.write(data)
+        hsum = salt.utils.hashutils.get_hash(
+            dest, form=hash_server.get("hash_type", "md5")
+        )
+        if hsum != hash_server.get("hsum"):
+            log.warning("Bad download of file %s", path)
+            raise salt.ext.tornado.gen.Return(False)
+        log.info("Fetching file from saltenv '%s', ** done ** '%s'", saltenv, path)
+        raise salt.ext.tornado.gen.Return(True)
+
     def file_list(self, saltenv="base", prefix=""):
         """
         List the files on the master
@@ -24,6 +24,7 @@ import salt.utils.files
 import salt.utils.json
 import salt.utils.kinds
 import salt.utils.master
+import salt.utils.minions
 import salt.utils.sdb
 import salt.utils.stringutils
 import salt.utils.user
@@ -469,6 +470,9 @@ class Key:
                 for minion in clist:
                     if minion not in minions and minion not in preserve_minions:
                         cache.flush("{}/{}".format(self.ACC, minion))
+                        salt.utils.minions.update_minion_data_index(
+                            self.opts, cache, minion
+                        )
 
     def check_master(self):
         """
@@ -650,6 +654,9 @@ class Key:
                         os.path.join(self.opts["pki_dir"], keydir, key),
                         os.path.join(self.opts["pki_dir"], self.ACC, key),
                     )
+                    salt.crypt.PUB_KEY_CACHE.evict(
+                        os.path.join(self.opts["pki_dir"], self.ACC, key)
+                    )
                     eload = {"result": True, "act": "accept", "id": key}
                     self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
                 except OSError:
@@ -667,6 +674,9 @@ class Key:
                     os.path.join(self.opts["pki_dir"], self.PEND, key),
                     os.path.join(self.opts["pki_dir"], self.ACC, key),
                 )
+                salt.crypt.PUB_KEY_CACHE.evict(
+                    os.path.join(self.opts["pki_dir"], self.ACC, key)
+                )
                 eload = {"result": True, "act": "accept", "id": key}
                 self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
             except OSError:
@@ -709,6 +719,9 @@ class Key:
                                         "with 'saltutil.revoke_auth'.".format(key)
                                     )
                         os.remove(os.path.join(self.opts["pki_dir"], status, key))
+                        salt.crypt.PUB_KEY_CACHE.evict(
+                            os.path.join(self.opts["pki_dir"], status, key)
+                        )
                         eload = {"result": True, "act": "delete", "id": key}
                         self.event.fire_event(
                             eload, salt.utils.event.tagify(prefix="key")
@@ -732,6 +745,9 @@ class Key:
             for key in keys[self.DEN]:
                 try:
                     os.remove(os.path.join(self.opts["pki_dir"], status, key))
+                    salt.crypt.PUB_KEY_CACHE.evict(
+                        os.path.join(self.opts["pki_dir"], status, key)
+                    )
                     eload = {"result": True, "act": "delete", "id": key}
                     self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
                 except OSError:
@@ -747,6 +763,9 @@ class Key:
             for key in keys:
                 try:
                     os.remove(os.path.join(self.opts["pki_dir"], status, key))
+                    salt.crypt.PUB_KEY_CACHE.evict(
+                        os.path.join(self.opts["pki_dir"], status, key)
+                    )
                     eload = {"result": True, "act": "delete", "id": key}
                     self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
                 except OSError:
@@ -781,6 +800,9 @@ class Key:
                         os.path.join(self.opts["pki_dir"], keydir, key),
                         os.path.join(self.opts["pki_dir"], self.REJ, key),
                     )
+                    salt.crypt.PUB_KEY_CACHE.evict(
+                        os.path.join(self.opts["pki_dir"], keydir, key)
+                    )
                     eload = {"result": True, "act": "reject", "id": key}
                     self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
                 except OSError:
@@ -801,6 +823,9 @@ class Key:
                     os.path.join(self.opts["pki_dir"], self.PEND, key),
                     os.path.join(self.opts["pki_dir"], self.REJ, key),
                 )
+                salt.crypt.PUB_KEY_CACHE.evict(
+                    os.path.join(self.opts["pki_dir"], self.PEND, key)
+                )
                 eload = {"result": True, "act": "reject", "id": key}
                 self.event.fire_event(eload, salt.utils.event.tagify(prefix="key"))
             except OSError:
@@ -6,6 +6,7 @@ plugin interfaces used by Salt.
 
 import copy
 import functools
+import hashlib
 import importlib
 import importlib.machinery  # pylint: disable=no-name-in-module,import-error
 import importlib.util  # pylint: disable=no-name-in-module,import-error
@@ -29,16 +30,20 @@ import salt.defaults.exitcodes
 import salt.loader_context
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.lazy
+import salt.utils.msgpack
 import salt.utils.odict
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.versions
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils import entrypoints
@@ -1177,6 +1182,16 @@ def _generate_module(name):
     sys.modules[name] = module
 
 
+def _dir_stamp(path):
+    """
+    Return the modification time of a directory, or None if it is missing
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
 def _mod_type(module_path):
     if module_path.startswith(SALT_BASE_PATH):
         return "int"
@@ -1359,6 +1374,15 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         self.loaded_modules = {}  # mapping of module_name -> dict_of_functions
         self.loaded_files = set()  # TODO: just remove them from file_mapping?
         self.static_modules = static_modules if static_modules else []
+        # mapping of file_mapping name -> the __virtualname__ of the module,
+        # which is kept in the discovery cache along with the file mapping
+        self.virtual_names = {}
+        self._virtual_names_changed = False
+        self._discovery_stamps = None
+        # mapping of file_mapping name -> the cached result of a __virtual__
+        # function decorated with salt.utils.decorators.cached_virtual
+        self._virtual_cache = None
+        self._virtual_cache_changed = False
 
         if virtual_funcs is None:
             virtual_funcs = []
@@ -1491,9 +1515,16 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # allow for module dirs
         self.suffix_map[""] = ("", "", MODULE_KIND_PKG_DIRECTORY)
 
+        cache_path = self._discovery_cache_path()
+        if cache_path is not None and self._read_discovery_cache(cache_path):
+            return
+
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
+        # The modification times of the directories listed, which tell when
+        # the discovery cache is out of date
+        stamps = {}
 
         opt_match = []
 
@@ -1508,16 +1539,19 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ""
 
         for mod_dir in self.module_dirs:
+            stamps[mod_dir] = _dir_stamp(mod_dir)
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
                 files = sorted(x for x in os.listdir(mod_dir) if x != "__pycache__")
             except OSError:
                 continue  # Next mod_dir
+            pycache_dir = os.path.join(mod_dir, "__pycache__")
+            stamps[pycache_dir] = _dir_stamp(pycache_dir)
             try:
                 pycache_files = [
                     os.path.join("__pycache__", x)
-                    for x in sorted(os.listdir(os.path.join(mod_dir, "__pycache__")))
+                    for x in sorted(os.listdir(pycache_dir))
                 ]
             except OSError:
                 pass
@@ -1565,6 +1599,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == "":
                         # is there something __init__?
+                        stamps[fpath] = _dir_stamp(fpath)
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if "" == suffix:
@@ -1616,6 +1651,225 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             f_noext = smod.split(".")[-1]
             self.file_mapping[f_noext] = (smod, ".o", 0)
 
+        if cache_path is not None:
+            self._write_discovery_cache(cache_path, stamps)
+
+    def _discovery_cache_path(self):
+        """
+        Return the path of the file which caches the file mapping of this
+        loader, or None if the discovery cache is disabled
+        """
+        if not self.opts.get("loader_discovery_cache") or not self.opts.get("cachedir"):
+            return None
+        # Everything the file mapping depends on, besides the contents of the
+        # module directories
+        key = repr(
+            (
+                self.module_dirs,
+                sorted(self.disabled),
+                self.opts.get("optimization_order"),
+                self.suffix_order,
+                self.static_modules,
+            )
+        )
+        return os.path.join(
+            self.opts["cachedir"],
+            "loader",
+            "{}-{}.p".format(self.tag, hashlib.sha256(key.encode()).hexdigest()[:16]),
+        )
+
+    def _read_discovery_cache(self, cache_path):
+        """
+        Load the file mapping and virtual names from the discovery cache.
+        Return False if the cache is missing or any of the module directories
+        changed since it was written.
+        """
+        try:
+            with salt.utils.files.fopen(cache_path, "rb") as fp_:
+                cache = salt.utils.msgpack.load(fp_, raw=False)
+            if cache["version"] != salt.version.__version__:
+                return False
+            for path, stamp in cache["stamps"].items():
+                if _dir_stamp(path) != stamp:
+                    return False
+            file_mapping = salt.utils.odict.OrderedDict(
+                (name, tuple(entry)) for name, entry in cache["file_mapping"]
+            )
+            virtual_names = cache["virtual_names"]
+        except FileNotFoundError:
+            return False
+        except Exception:  # pylint: disable=broad-except
+            log.debug(
+                "Ignoring unreadable loader discovery cache %s",
+                cache_path,
+                exc_info=True,
+            )
+            return False
+        self.file_mapping = file_mapping
+        virtual_names.update(self.virtual_names)
+        self.virtual_names = virtual_names
+        self._discovery_stamps = cache["stamps"]
+        return True
+
+    def _save_caches(self):
+        """
+        Update the discovery cache with any virtual names learnt, and the
+        virtual cache with any __virtual__ results, since they were last read
+        or written
+        """
+        if self._virtual_names_changed:
+            self._virtual_names_changed = False
+            cache_path = self._discovery_cache_path()
+            if cache_path is not None and self._discovery_stamps is not None:
+                self._write_discovery_cache(cache_path)
+        if self._virtual_cache_changed:
+            self._virtual_cache_changed = False
+            self._write_virtual_cache()
+
+    def _virtual_cache_path(self):
+        """
+        Return the path of the file which caches the __virtual__ results of
+        this loader's modules, or None if the virtual cache is disabled
+        """
+        if not self.opts.get("loader_virtual_cache") or not self.opts.get("cachedir"):
+            return None
+        return os.path.join(
+            self.opts["cachedir"], "loader", "virtual-{}.p".format(self.tag)
+        )
+
+    def _read_virtual_cache(self):
+        """
+        Return the cached __virtual__ results, reading them on first use
+        """
+        if self._virtual_cache is None:
+            self._virtual_cache = {}
+            cache_path = self._virtual_cache_path()
+            try:
+                with salt.utils.files.fopen(cache_path, "rb") as fp_:
+                    cache = salt.utils.msgpack.load(fp_, raw=False)
+                if cache["version"] == salt.version.__version__:
+                    self._virtual_cache = cache["modules"]
+            except FileNotFoundError:
+                pass
+            except Exception:  # pylint: disable=broad-except
+                log.debug(
+                    "Ignoring unreadable loader virtual cache %s",
+                    cache_path,
+                    exc_info=True,
+                )
+        return self._virtual_cache
+
+    def _write_virtual_cache(self):
+        """
+        Write the cached __virtual__ results
+        """
+        cache_path = self._virtual_cache_path()
+        cache = {"version": salt.version.__version__, "modules": self._virtual_cache}
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with salt.utils.atomicfile.atomic_open(cache_path, "wb") as fp_:
+                salt.utils.msgpack.dump(cache, fp_, use_bin_type=True)
+        except OSError as exc:
+            log.debug("Unable to write loader virtual cache %s: %s", cache_path, exc)
+
+    def _virtual_inputs_digest(self, grains, opts):
+        """
+        Return a digest of the values of the named grains and opts
+        """
+        grains_data = self.pack.get("__grains__") or {}
+        inputs = [
+            [[name, grains_data.get(name)] for name in grains],
+            [[name, self.opts.get(name)] for name in opts],
+        ]
+        return hashlib.sha256(
+            salt.utils.msgpack.packb(inputs, use_bin_type=True)
+        ).hexdigest()
+
+    def _cached_unavailable(self, name, fpath):
+        """
+        Return the cache entry of a module whose __virtual__ function found it
+        unavailable, if neither the module nor the grains and opts it depends
+        on changed since. Otherwise return None.
+        """
+        if self._virtual_cache_path() is None:
+            return None
+        entry = self._read_virtual_cache().get(name)
+        if entry is None or entry["path"] != fpath:
+            return None
+        try:
+            if entry["inputs"] != self._virtual_inputs_digest(
+                entry["grains"], entry["opts"]
+            ):
+                return None
+            if entry["hash"] != salt.utils.hashutils.get_hash(fpath, "sha256"):
+                return None
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return entry
+
+    def _cache_virtual(self, name, virtual_attr, virtual, error_reason):
+        """
+        Record the result of a __virtual__ function decorated with
+        salt.utils.decorators.cached_virtual
+        """
+        inputs = getattr(virtual_attr, "__virtual_inputs__", None)
+        if inputs is None or self._virtual_cache_path() is None:
+            return
+        cache = self._read_virtual_cache()
+        if virtual:
+            # Only the modules which are unavailable are skipped
+            if cache.pop(name, None) is not None:
+                self._virtual_cache_changed = True
+            return
+        try:
+            fpath = self.file_mapping[name][0]
+            entry = {
+                "path": fpath,
+                "hash": salt.utils.hashutils.get_hash(fpath, "sha256"),
+                "grains": inputs["grains"],
+                "opts": inputs["opts"],
+                "inputs": self._virtual_inputs_digest(inputs["grains"], inputs["opts"]),
+                "reason": None if error_reason is None else str(error_reason),
+            }
+        except Exception:  # pylint: disable=broad-except
+            log.debug(
+                "Unable to cache the __virtual__ result of %s", name, exc_info=True
+            )
+            return
+        if cache.get(name) != entry:
+            cache[name] = entry
+            self._virtual_cache_changed = True
+
+    def _write_discovery_cache(self, cache_path, stamps=None):
+        """
+        Write the file mapping and the virtual names learnt so far to the
+        discovery cache
+        """
+        if stamps is None:
+            stamps = self._discovery_stamps
+        # A directory changed within the last few seconds might change again
+        # without its modification time moving on, so wait for it to settle
+        # before trusting its modification time
+        settled = (time.time() - 2) * 1e9
+        if any(stamp is not None and stamp > settled for stamp in stamps.values()):
+            self._discovery_stamps = None
+            return
+        self._discovery_stamps = stamps
+        cache = {
+            "version": salt.version.__version__,
+            "stamps": stamps,
+            "file_mapping": [
+                (name, list(entry)) for name, entry in self.file_mapping.items()
+            ],
+            "virtual_names": self.virtual_names,
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with salt.utils.atomicfile.atomic_open(cache_path, "wb") as fp_:
+                salt.utils.msgpack.dump(cache, fp_, use_bin_type=True)
+        except OSError as exc:
+            log.debug("Unable to write loader discovery cache %s: %s", cache_path, exc)
+
     def clear(self):
         """
         Clear the dict
@@ -1668,6 +1922,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         if mod_name in self.file_mapping:
             yield mod_name
 
+        # was a module loaded under this __virtualname__ before?
+        for k, virtualname in list(self.virtual_names.items()):
+            if virtualname == mod_name and k in self.file_mapping:
+                yield k
+
         # do we have a partial match?
         for k in self.file_mapping:
             if mod_name in k:
@@ -1748,6 +2007,17 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             pass
 
         self.loaded_files.add(name)
+        if self.virtual_enable:
+            cached = self._cached_unavailable(name, fpath)
+            if cached is not None:
+                log.trace(
+                    "Skipping %s.%s, its __virtual__ function found it "
+                    "unavailable before",
+                    self.tag,
+                    name,
+                )
+                self.missing_modules[name] = cached["reason"]
+                return False
         fpath_dirname = os.path.dirname(fpath)
         try:
             self.__populate_sys_path()
@@ -1941,6 +2211,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 setattr(mod, self.pack_self, named_context)
 
         module_name = mod.__name__.rsplit(".", 1)[-1]
+        virtualname = getattr(mod, "__virtualname__", None)
+        if isinstance(virtualname, str) and self.virtual_names.get(name) != virtualname:
+            self.virtual_names[name] = virtualname
+            self._virtual_names_changed = True
 
         # Call a module's initialization method if it exists
         module_init = getattr(mod, "__init__", None)
@@ -2114,6 +2388,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            self._save_caches()
 
         return ret
 
@@ -2128,6 +2403,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self._load_module(name)
 
             self.loaded = True
+            self._save_caches()
 
     def reload_modules(self):
         with self._lock:
@@ -2180,6 +2456,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     if isinstance(virtual, tuple):
                         error_reason = virtual[1]
                         virtual = virtual[0]
+                    if virtual_func == "__virtual__":
+                        self._cache_virtual(
+                            module_name, virtual_attr, virtual, error_reason
+                        )
                     if self.opts.get("virtual_timer", False):
                         end = time.time() - start
                         msg = "Virtual function took {} seconds for {}".format(
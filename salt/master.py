@@ -7,6 +7,7 @@ import collections
 import copy
 import ctypes
 import functools
+import itertools
 import logging
 import multiprocessing
 import os
@@ -27,6 +28,7 @@ import salt.defaults.exitcodes
 import salt.engines
 import salt.exceptions
 import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
 import salt.key
 import salt.log.setup
 import salt.minion
@@ -766,6 +768,14 @@ class Master(SMaster):
                 log.debug("Sleeping for two seconds to let concache rest")
                 time.sleep(2)
 
+            if self.opts["pillar_workers"] > 0:
+                log.info("Creating master pillar server process")
+                self.process_manager.add_process(
+                    salt.utils.master.PillarServer,
+                    args=(self.opts,),
+                    name="PillarServer",
+                )
+
             log.info("Creating master request server process")
             kwargs = {}
             if salt.utils.platform.is_windows():
@@ -824,6 +834,155 @@ class Master(SMaster):
         sys.exit(0)
 
 
+class MWorkerPool:
+    """
+    The shared state of an adaptive pool of MWorker processes
+
+    The ZeroMQ request server device routes every request to an idle MWorker
+    and records which workers are busy and how many requests are waiting for
+    one, the ReqServer uses that to start more MWorkers, up to
+    ``worker_threads_max``, and to stop the ones that stayed idle for
+    ``worker_threads_idle_timeout`` seconds.
+
+    The first ``worker_threads_priority`` slots of the pool are a separate
+    lane which only serves the commands listed in
+    ``worker_threads_priority_cmds``, so these never wait behind long running
+    requests such as pillar compilations.
+    """
+
+    # The states of a worker slot
+    STOPPED = 0
+    RUNNING = 1
+    DRAINING = 2
+
+    # The request lanes
+    GENERAL = 0
+    PRIORITY = 1
+
+    def __init__(self, opts):
+        self.min_workers = int(opts["worker_threads"])
+        self.max_workers = max(int(opts["worker_threads_max"]), self.min_workers)
+        self.priority_workers = int(opts["worker_threads_priority"])
+        self.priority_cmds = frozenset(opts["worker_threads_priority_cmds"])
+        self.priority_routes = frozenset(
+            salt.utils.stringutils.to_bytes(cmd) for cmd in self.priority_cmds
+        )
+        self.idle_timeout = opts["worker_threads_idle_timeout"]
+        self.interval = opts["worker_threads_scale_interval"]
+        size = self.priority_workers + self.max_workers
+        # The memory is shared with the device and the workers which are
+        # forked after the pool is created. The device writes the busy, idle
+        # and backlog values and the ReqServer writes the slot states.
+        self.states = multiprocessing.Array(ctypes.c_byte, size, lock=False)
+        self.busy = multiprocessing.Array(ctypes.c_double, size, lock=False)
+        self.idle = multiprocessing.Array(ctypes.c_double, size, lock=False)
+        self.backlog = multiprocessing.Array(ctypes.c_long, 2, lock=False)
+
+    @staticmethod
+    def name(slot):
+        """
+        Return the name of the MWorker of a slot
+        """
+        return "MWorker-{}".format(slot)
+
+    def worker_started(self, name):
+        """
+        Clear the busy state that a dead MWorker left behind in its slot and
+        return the slot of the MWorker named ``name``
+        """
+        slot = int(name.rsplit("-", 1)[-1])
+        self.busy[slot] = 0
+        return slot
+
+    def general_slots(self):
+        return range(self.priority_workers, len(self.states))
+
+    def lane(self, frames):
+        """
+        Return the lane of a request from its ZeroMQ frames
+
+        The body of the request is not read, minions put the command of the
+        request in a routing frame before the payload when the master
+        advertised its priority commands.
+        """
+        if (
+            self.priority_workers
+            and len(frames) > 3
+            and not frames[-3]
+            and frames[-2] in self.priority_routes
+        ):
+            return self.PRIORITY
+        return self.GENERAL
+
+    def idle_slot(self, lane):
+        """
+        Return an idle running slot which serves ``lane``, or ``None``
+        """
+        slots = self.general_slots()
+        if lane == self.PRIORITY:
+            # The priority requests go to the general workers when the
+            # priority workers are busy
+            slots = itertools.chain(range(self.priority_workers), slots)
+        for slot in slots:
+            if self.states[slot] == self.RUNNING and not self.busy[slot]:
+                return slot
+        return None
+
+    def scale(self, now=None):
+        """
+        Decide which MWorkers to start and which ones to stop
+
+        Returns a tuple of the slots to start and the slots to stop. Idle
+        workers are first marked as draining, so the device does not route new
+        requests to them, and are stopped on the next call.
+        """
+        if now is None:
+            now = time.time()
+        start = []
+        stop = []
+        running = []
+        for slot in self.general_slots():
+            state = self.states[slot]
+            if state == self.RUNNING:
+                running.append(slot)
+            elif state == self.DRAINING:
+                if self.busy[slot]:
+                    # The device routed a request before it saw the new
+                    # state, put the worker back to work
+                    self.states[slot] = self.RUNNING
+                    running.append(slot)
+                else:
+                    self.states[slot] = self.STOPPED
+                    stop.append(slot)
+
+        backlog = self.backlog[self.GENERAL] + self.backlog[self.PRIORITY]
+        busy = [slot for slot in running if self.busy[slot]]
+        if len(busy) == len(running):
+            if not backlog and running:
+                # No request is waiting yet, but when all of the workers
+                # have been busy for a whole interval the next one will
+                if min(self.busy[slot] for slot in busy) < now - self.interval:
+                    backlog = 1
+            for slot in self.general_slots():
+                if not backlog:
+                    break
+                if self.states[slot] == self.STOPPED and slot not in stop:
+                    self.states[slot] = self.RUNNING
+                    self.idle[slot] = now
+                    start.append(slot)
+                    backlog -= 1
+        elif not backlog:
+            # Drain the idle workers above the minimum, the newest first
+            surplus = len(running) - self.min_workers
+            for slot in reversed(running):
+                if surplus <= 0:
+                    break
+                if not self.busy[slot] and self.idle[slot] < now - self.idle_timeout:
+                    self.states[slot] = self.DRAINING
+                    surplus -= 1
+        return start, stop
+
+
 class ReqServer(salt.utils.process.SignalHandlingProcess):
     """
     Starts up the master request server, minions send results to this
@@ -902,10 +1061,28 @@ class ReqServer(salt.utils.process.SignalHandlingProcess):
             name="ReqServer_ProcessManager", wait_for_kill=1
         )
 
+        self.worker_pool = None
+        if (
+            self.opts["worker_threads_max"] > self.opts["worker_threads"]
+            or self.opts["worker_threads_priority"]
+        ):
+            if all(
+                transport == "zeromq" for transport, _ in iter_transport_opts(self.opts)
+            ):
+                self.worker_pool = MWorkerPool(self.opts)
+            else:
+                log.warning(
+                    "The adaptive MWorker pool is only supported by the zeromq "
+                    "transport, starting %s MWorkers",
+                    self.opts["worker_threads"],
+                )
+
         req_channels = []
         tcp_only = True
         for transport, opts in iter_transport_opts(self.opts):
             chan = salt.transport.server.ReqServerChannel.factory(opts)
+            if self.worker_pool is not None:
+                chan.worker_pool = self.worker_pool
             chan.pre_fork(self.process_manager)
             req_channels.append(chan)
             if transport != "tcp":
@@ -926,16 +1103,55 @@ class ReqServer(salt.utils.process.SignalHandlingProcess):
         # Reset signals to default ones before adding processes to the process
         # manager. We don't want the processes being started to inherit those
         # signal handlers
+        self.req_channels = req_channels
+        self.worker_kwargs = kwargs
         with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
-            for ind in range(int(self.opts["worker_threads"])):
-                name = "MWorker-{}".format(ind)
-                self.process_manager.add_process(
-                    MWorker,
-                    args=(self.opts, self.master_key, self.key, req_channels, name),
-                    kwargs=kwargs,
-                    name=name,
-                )
-        self.process_manager.run()
+            if self.worker_pool is None:
+                for ind in range(int(self.opts["worker_threads"])):
+                    self._start_worker("MWorker-{}".format(ind))
+            else:
+                pool = self.worker_pool
+                now = time.time()
+                for slot in range(pool.priority_workers + pool.min_workers):
+                    pool.states[slot] = pool.RUNNING
+                    pool.idle[slot] = now
+                    self._start_worker(pool.name(slot))
+        if self.worker_pool is None:
+            self.process_manager.run()
+        else:
+            self.process_manager.run(
+                interval=self.worker_pool.interval, callback=self._scale_worker_pool
+            )
+
+    def _start_worker(self, name):
+        """
+        Start the MWorker named ``name``
+        """
+        self.process_manager.add_process(
+            MWorker,
+            args=(self.opts, self.master_key, self.key, self.req_channels, name),
+            kwargs=self.worker_kwargs,
+            name=name,
+        )
+
+    def _scale_worker_pool(self):
+        """
+        Start and stop MWorkers to scale the adaptive worker pool
+        """
+        pool = self.worker_pool
+        start, stop = pool.scale()
+        for slot in stop:
+            log.info("Stopping idle %s", pool.name(slot))
+            self.process_manager.terminate_process(pool.name(slot))
+        if start:
+            log.info(
+                "Starting %s more MWorkers, %s requests are waiting",
+                len(start),
+                pool.backlog[pool.GENERAL] + pool.backlog[pool.PRIORITY],
+            )
+            with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
+                for slot in start:
+                    self._start_worker(pool.name(slot))
 
     def run(self):
         """
@@ -1017,6 +1233,7 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         for channel in getattr(self, "req_channels", ()):
             channel.close()
         self.clear_funcs.destroy()
+        self.aes_funcs.flush_returns(force=True)
         super()._handle_signals(signum, sigframe)
 
     def __bind(self):
@@ -1031,6 +1248,13 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
             req_channel.post_fork(
                 self._handle_payload, io_loop=self.io_loop
             )  # TODO: cleaner? Maybe lazily?
+        if self.aes_funcs.return_batcher is not None:
+            # Make sure batched returns don't wait longer than the batch
+            # interval when no more returns come in
+            salt.ext.tornado.ioloop.PeriodicCallback(
+                self.aes_funcs.flush_returns,
+                self.opts["job_cache_batch_interval"] * 1000 / 4,
+            ).start()
         try:
             self.io_loop.start()
         except (KeyboardInterrupt, SystemExit):
@@ -1174,6 +1398,7 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         self.clear_funcs = ClearFuncs(self.opts, self.key,)
         self.aes_funcs = AESFuncs(self.opts)
         salt.utils.crypt.reinit_crypto()
+        salt.crypt.PUB_KEY_CACHE.resize(self.opts["minion_pub_key_cache_size"])
         self.__bind()
 
 
@@ -1258,6 +1483,18 @@ class AESFuncs(TransportMethods):
         )
         self.__setup_fileserver()
         self.masterapi = salt.daemons.masterapi.RemoteFuncs(opts)
+        # Coalesce the job cache writes of minion returns
+        if self.opts.get("job_cache_batch_size", 0) > 1:
+            self.return_batcher = salt.utils.job.ReturnBatcher(
+                self.opts, event=self.event, mminion=self.mminion
+            )
+        else:
+            self.return_batcher = None
+        # Compile the pillar data in the PillarServer
+        if self.opts.get("pillar_workers", 0) > 0:
+            self.pillar_client = salt.utils.master.PillarClient(self.opts)
+        else:
+            self.pillar_client = None
 
     def __setup_fileserver(self):
         """
@@ -1623,23 +1860,26 @@ class AESFuncs(TransportMethods):
             return False
         load["grains"]["id"] = load["id"]
 
-        pillar = salt.pillar.get_pillar(
-            self.opts,
-            load["grains"],
-            load["id"],
-            load.get("saltenv", load.get("env")),
-            ext=load.get("ext"),
-            pillar_override=load.get("pillar_override", {}),
-            pillarenv=load.get("pillarenv"),
-            extra_minion_data=load.get("extra_minion_data"),
-        )
-        data = pillar.compile_pillar()
+        if self.pillar_client is not None:
+            data = self.pillar_client.compile_pillar(load)
+        else:
+            pillar = salt.pillar.get_pillar(
+                self.opts,
+                load["grains"],
+                load["id"],
+                load.get("saltenv", load.get("env")),
+                ext=load.get("ext"),
+                pillar_override=load.get("pillar_override", {}),
+                pillarenv=load.get("pillarenv"),
+                extra_minion_data=load.get("extra_minion_data"),
+            )
+            data = pillar.compile_pillar()
         self.fs_.update_opts()
         if self.opts.get("minion_data_cache", False):
-            self.masterapi.cache.store(
-                "minions/{}".format(load["id"]),
-                "data",
-                {"grains": load["grains"], "pillar": data},
+            mdata = {"grains": load["grains"], "pillar": data}
+            self.masterapi.cache.store("minions/{}".format(load["id"]), "data", mdata)
+            salt.utils.minions.update_minion_data_index(
+                self.opts, self.masterapi.cache, load["id"], mdata
             )
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
@@ -1733,12 +1973,31 @@ class AESFuncs(TransportMethods):
             load["sig"] = sig
 
         try:
-            salt.utils.job.store_job(
-                self.opts, load, event=self.event, mminion=self.mminion
-            )
+            if self.return_batcher is not None:
+                self.return_batcher.add(load)
+            else:
+                salt.utils.job.store_job(
+                    self.opts, load, event=self.event, mminion=self.mminion
+                )
         except salt.exceptions.SaltCacheError:
             log.error("Could not store job information for load: %s", load)
 
+    def flush_returns(self, force=False):
+        """
+        Write the minion returns waiting in the return batcher to the job
+        cache
+
+        :param bool force: Flush the pending returns even if the batch is not
+                           due yet
+        """
+        if self.return_batcher is None:
+            return
+        if force or self.return_batcher.due:
+            try:
+                self.return_batcher.flush()
+            except salt.exceptions.SaltCacheError:
+                log.error("Could not store a batch of job returns")
+
     def _syndic_return(self, load):
         """
         Receive a syndic minion return and format it to look like returns from
@@ -1963,7 +2222,11 @@ class AESFuncs(TransportMethods):
         return ret, {"fun": "send"}
 
     def destroy(self):
+        self.flush_returns(force=True)
         self.masterapi.destroy()
+        if self.pillar_client is not None:
+            self.pillar_client.destroy()
+            self.pillar_client = None
         if self.local is not None:
             self.local.destroy()
             self.local = None
@@ -2194,10 +2457,12 @@ class ClearFuncs(TransportMethods):
             }
 
         # Retrieve the minions list
+        start = time.time()
         delimiter = clear_load.get("kwargs", {}).get("delimiter", DEFAULT_TARGET_DELIM)
         _res = self.ckminions.check_minions(
             clear_load["tgt"], clear_load.get("tgt_type", "glob"), delimiter
         )
+        match_time = time.time() - start
         minions = _res.get("minions", list())
         missing = _res.get("missing", list())
         ssh_minions = _res.get("ssh_minions", False)
@@ -2291,7 +2556,17 @@ class ClearFuncs(TransportMethods):
 
         # Send it!
         self._send_ssh_pub(payload, ssh_minions=ssh_minions)
-        self._send_pub(payload)
+        stats = self._send_pub(payload, minions=minions)
+        if self.opts["publish_stats"]:
+            self.event.fire_event(
+                {
+                    "jid": jid,
+                    "minions": len(minions),
+                    "match": match_time,
+                    "transports": stats,
+                },
+                tagify(["publish", jid], "stats"),
+            )
 
         return {
             "enc": "clear",
@@ -2340,13 +2615,18 @@ class ClearFuncs(TransportMethods):
             return {"error": msg}
         return jid
 
-    def _send_pub(self, load):
+    def _send_pub(self, load, minions=None):
         """
-        Take a load and send it across the network to connected minions
+        Take a load and send it across the network to connected minions,
+        return the publish timings of every transport
         """
+        stats = {}
         for transport, opts in iter_transport_opts(self.opts):
             chan = salt.transport.server.PubServerChannel.factory(opts)
-            chan.publish(load)
+            chan.publish(load, minions=minions)
+            if chan.publish_stats is not None:
+                stats[transport] = chan.publish_stats
+        return stats
 
     @property
     def ssh_client(self):
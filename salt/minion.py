@@ -2390,6 +2390,26 @@ class Minion(MinionBase):
             include_startup_grains=include_grains,
         )
 
+    def _fire_job_heartbeats(self):
+        """
+        Tell the master which jobs are still running on this minion, with a
+        single request carrying one event per job
+        """
+        interval = self.opts["job_heartbeat_interval"]
+        events = []
+        for data in salt.utils.minion.running(self.opts):
+            jid = data.get("jid")
+            if not jid:
+                continue
+            events.append(
+                {
+                    "tag": tagify([jid, "heartbeat", self.opts["id"]], "job"),
+                    "data": {"id": self.opts["id"], "jid": jid, "interval": interval},
+                }
+            )
+        if events:
+            self._fire_master(events=events, timeout=interval, sync=False)
+
     def module_refresh(self, force_refresh=False, notify=False):
         """
         Refresh the functions and returners.
@@ -3098,6 +3118,13 @@ class Minion(MinionBase):
             self.remove_periodic_callback("ping")
             self.add_periodic_callback("ping", ping_master, ping_interval)
 
+        job_heartbeat_interval = self.opts.get("job_heartbeat_interval", 0)
+        if job_heartbeat_interval > 0 and self.connected:
+            self.remove_periodic_callback("job_heartbeat")
+            self.add_periodic_callback(
+                "job_heartbeat", self._fire_job_heartbeats, job_heartbeat_interval
+            )
+
         # add handler to subscriber
         if hasattr(self, "pub_channel") and self.pub_channel is not None:
             self.pub_channel.on_recv(self._handle_payload)
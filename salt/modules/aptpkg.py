@@ -25,6 +25,7 @@ import salt.config
 import salt.syspaths
 import salt.utils.args
 import salt.utils.data
+import salt.utils.decorators
 import salt.utils.environment
 import salt.utils.files
 import salt.utils.functools
@@ -93,6 +94,7 @@ DPKG_ENV_VARS = {
 __virtualname__ = "pkg"
 
 
+@salt.utils.decorators.cached_virtual(grains=["os_family"])
 def __virtual__():
     """
     Confirm this module is on a Debian-based system
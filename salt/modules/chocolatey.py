@@ -11,6 +11,7 @@ import re
 import tempfile
 
 import salt.utils.data
+import salt.utils.decorators
 import salt.utils.platform
 from requests.structures import CaseInsensitiveDict
 from salt.exceptions import (
@@ -29,6 +30,7 @@ __func_alias__ = {"list_": "list"}
 __virtualname__ = "chocolatey"
 
 
+@salt.utils.decorators.cached_virtual(grains=["osrelease"])
 def __virtual__():
     """
     Confirm this module is on a Windows system running Vista or later.
@@ -10,6 +10,7 @@ import os
 import re
 import urllib.request
 
+import salt.utils.decorators
 import salt.utils.files
 import salt.utils.platform
 import salt.utils.stringutils
@@ -24,6 +25,7 @@ DEFAULT_MIRROR_KEY = ""
 __virtualname__ = "cyg"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
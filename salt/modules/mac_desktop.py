@@ -2,6 +2,7 @@
 macOS implementations of various commands in the "desktop" interface
 """
 
+import salt.utils.decorators
 import salt.utils.platform
 from salt.exceptions import CommandExecutionError
 
@@ -9,6 +10,7 @@ from salt.exceptions import CommandExecutionError
 __virtualname__ = "desktop"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only load on Mac systems
@@ -4,6 +4,7 @@ Module for editing power settings on macOS
  .. versionadded:: 2016.3.0
 """
 
+import salt.utils.decorators
 import salt.utils.mac_utils
 import salt.utils.platform
 from salt.exceptions import SaltInvocationError
@@ -11,6 +12,7 @@ from salt.exceptions import SaltInvocationError
 __virtualname__ = "power"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only for macOS
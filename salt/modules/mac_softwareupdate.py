@@ -6,6 +6,7 @@ import os
 import re
 
 import salt.utils.data
+import salt.utils.decorators
 import salt.utils.files
 import salt.utils.mac_utils
 import salt.utils.path
@@ -15,6 +16,7 @@ from salt.exceptions import CommandExecutionError, SaltInvocationError
 __virtualname__ = "softwareupdate"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only for MacOS
@@ -6,6 +6,7 @@ Module for editing date/time settings on macOS
 
 from datetime import datetime
 
+import salt.utils.decorators
 import salt.utils.mac_utils
 import salt.utils.platform
 from salt.exceptions import SaltInvocationError
@@ -13,6 +14,7 @@ from salt.exceptions import SaltInvocationError
 __virtualname__ = "timezone"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only for macOS
@@ -5,12 +5,14 @@ Set defaults on Mac OS
 
 import logging
 
+import salt.utils.decorators
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
 __virtualname__ = "macdefaults"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only work on Mac OS
@@ -15,6 +15,7 @@ import os.path
 
 import salt.utils.args
 import salt.utils.data
+import salt.utils.decorators
 import salt.utils.functools
 import salt.utils.itertools
 import salt.utils.pkg
@@ -28,6 +29,7 @@ log = logging.getLogger(__name__)
 __virtualname__ = "pkg"
 
 
+@salt.utils.decorators.cached_virtual(grains=["os_family"])
 def __virtual__():
     """
     Set the virtual pkg module if the os is Arch
@@ -5,6 +5,7 @@ Manage RDP Service on Windows servers
 import logging
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 from salt.utils.decorators import depends
 
@@ -19,6 +20,7 @@ except ImportError:
 _LOG = logging.getLogger(__name__)
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
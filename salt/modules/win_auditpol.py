@@ -54,12 +54,14 @@ CLI Example:
     salt * auditpol.set_setting name="Credential Validation" value="No Auditing"
 """
 
+import salt.utils.decorators
 import salt.utils.platform
 
 # Define the module's virtual name
 __virtualname__ = "auditpol"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
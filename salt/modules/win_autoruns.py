@@ -6,6 +6,7 @@ Module for listing programs that automatically run on startup
 
 import os
 
+import salt.utils.decorators
 import salt.utils.platform
 
 # Define a function alias in order not to shadow built-in's
@@ -15,6 +16,7 @@ __func_alias__ = {"list_": "list"}
 __virtualname__ = "autoruns"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
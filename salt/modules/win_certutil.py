@@ -11,12 +11,14 @@ manager.
 import logging
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
 __virtualname__ = "certutil"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only work on Windows
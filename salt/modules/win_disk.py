@@ -7,6 +7,7 @@ Module for gathering disk information on Windows
 import ctypes
 import string
 
+import salt.utils.decorators
 import salt.utils.platform
 
 try:
@@ -21,6 +22,7 @@ __virtualname__ = "disk"
 UPPERCASE = string.ascii_uppercase
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
@@ -9,6 +9,7 @@ import logging
 import os
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 import salt.utils.versions
 
@@ -37,6 +38,7 @@ except OSError:
     bin_dism = "dism.exe"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only work on Windows
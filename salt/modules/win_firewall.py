@@ -4,6 +4,7 @@ Module for configuring Windows Firewall using ``netsh``
 
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 import salt.utils.win_lgpo_netsh
 from salt.exceptions import CommandExecutionError
@@ -12,6 +13,7 @@ from salt.exceptions import CommandExecutionError
 __virtualname__ = "firewall"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
@@ -5,6 +5,7 @@ The networking module for Windows based systems
 import logging
 import time
 
+import salt.utils.decorators
 import salt.utils.network
 import salt.utils.platform
 import salt.utils.validate.net
@@ -17,6 +18,7 @@ log = logging.getLogger(__name__)
 __virtualname__ = "ip"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Confine this module to Windows systems
@@ -10,12 +10,14 @@ This module allows you to manage windows licensing via slmgr.vbs
 import logging
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
 __virtualname__ = "license"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only work on Windows
@@ -6,6 +6,7 @@ Management of NTP servers on Windows
 
 import logging
 
+import salt.utils.decorators
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
@@ -14,6 +15,7 @@ log = logging.getLogger(__name__)
 __virtualname__ = "ntp"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     This only supports Windows
@@ -52,6 +52,7 @@ import salt.payload
 import salt.syspaths
 import salt.utils.args
 import salt.utils.data
+import salt.utils.decorators
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.path
@@ -73,6 +74,7 @@ log = logging.getLogger(__name__)
 __virtualname__ = "pkg"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Set the virtual pkg module if the os is Windows
@@ -15,6 +15,7 @@ powercfg.
 import logging
 import re
 
+import salt.utils.decorators
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ log = logging.getLogger(__name__)
 __virtualname__ = "powercfg"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only work on Windows
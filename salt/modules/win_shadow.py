@@ -8,12 +8,14 @@ Manage the shadow file
     <module-provider-override>`.
 """
 
+import salt.utils.decorators
 import salt.utils.platform
 
 # Define the module's virtual name
 __virtualname__ = "shadow"
 
 
+@salt.utils.decorators.cached_virtual()
 def __virtual__():
     """
     Only works on Windows systems
@@ -292,6 +292,10 @@ class EventListener:
         # map of future -> timeout_callback
         self.timeout_map = {}
 
+        # jid -> {minion_id: (time of the last heartbeat, heartbeat interval)}
+        # for the jobs being watched
+        self.job_heartbeats = {}
+
         self.event.set_event_handler(self._handle_event_socket_recv)
 
     def clean_by_request(self, request):
@@ -363,6 +367,20 @@ class EventListener:
 
         return future
 
+    def watch_job(self, jid):
+        """
+        Start keeping track of the minions which send heartbeats for jid, and
+        return the map of minion_id -> (time of the last heartbeat, heartbeat
+        interval) which is kept up to date
+        """
+        return self.job_heartbeats.setdefault(jid, {})
+
+    def forget_job(self, jid):
+        """
+        Stop keeping track of the heartbeats for jid
+        """
+        self.job_heartbeats.pop(jid, None)
+
     def _timeout_future(self, tag, matcher, future):
         """
         Timeout a specific future
@@ -381,6 +399,14 @@ class EventListener:
         """
         mtag, data = self.event.unpack(raw, self.event.serial)
 
+        # salt/job/<jid>/heartbeat/<minion_id>
+        if self.job_heartbeats and mtag.startswith("salt/job/"):
+            parts = mtag.split("/", 4)
+            if len(parts) == 5 and parts[3] == "heartbeat":
+                heartbeats = self.job_heartbeats.get(parts[2])
+                if heartbeats is not None:
+                    heartbeats[parts[4]] = (time.time(), data.get("interval", 0))
+
         # see if we have any futures that need this info:
         for (tag, matcher), futures in self.tag_map.items():
             try:
@@ -1105,42 +1131,70 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
         """
         Return a future which will complete once jid (passed in) is no longer
         running on tgt
+
+        The minions which send heartbeats for the job are not asked with
+        saltutil.find_job whether they are still running it.
         """
         local_client = self.saltclients["local"]
-        ping_pub_data = yield local_client(
-            tgt, "saltutil.find_job", [jid], tgt_type=tgt_type
-        )
-        ping_tag = tagify([ping_pub_data["jid"], "ret"], "job")
-
-        minion_running = False
-        while True:
-            try:
-                event = self.application.event_listener.get_event(
-                    self,
-                    tag=ping_tag,
-                    timeout=self.application.opts["gather_job_timeout"],
-                )
-                event = yield event
-            except TimeoutException:
-                if not event.done():
-                    event.set_result(None)
-
-                if not minion_running:
-                    raise salt.ext.tornado.gen.Return(True)
+        event_listener = self.application.event_listener
+        gather_job_timeout = self.application.opts["gather_job_timeout"]
+        heartbeats = event_listener.watch_job(jid)
+        try:
+            while not is_finished.done():
+                if heartbeats:
+                    ping_tgt = [
+                        minion_id
+                        for minion_id, returned in minions.items()
+                        if not returned and minion_id not in heartbeats
+                    ]
+                    ping_tgt_type = "list"
                 else:
+                    ping_tgt, ping_tgt_type = tgt, tgt_type
+
+                minion_running = False
+                if ping_tgt:
                     ping_pub_data = yield local_client(
-                        tgt, "saltutil.find_job", [jid], tgt_type=tgt_type
+                        ping_tgt, "saltutil.find_job", [jid], tgt_type=ping_tgt_type
                     )
                     ping_tag = tagify([ping_pub_data["jid"], "ret"], "job")
-                    minion_running = False
-                    continue
+                    while True:
+                        try:
+                            event = event_listener.get_event(
+                                self, tag=ping_tag, timeout=gather_job_timeout
+                            )
+                            event = yield event
+                        except TimeoutException:
+                            if not event.done():
+                                event.set_result(None)
+                            break
+
+                        # Minions can return, we want to see if the job is running...
+                        if event["data"].get("return", {}) == {}:
+                            continue
+                        if event["data"]["id"] not in minions:
+                            minions[event["data"]["id"]] = False
+                        minion_running = True
+                else:
+                    yield salt.ext.tornado.gen.sleep(gather_job_timeout)
+
+                # the minions which sent a heartbeat recently are still running
+                # the job
+                now = time.time()
+                for minion_id, (last_seen, interval) in heartbeats.items():
+                    if minions.get(minion_id):
+                        continue
+                    if now - last_seen < max(gather_job_timeout, 2 * interval):
+                        minions.setdefault(minion_id, False)
+                        minion_running = True
 
-            # Minions can return, we want to see if the job is running...
-            if event["data"].get("return", {}) == {}:
-                continue
-            if event["data"]["id"] not in minions:
-                minions[event["data"]["id"]] = False
-            minion_running = True
+                if not minion_running:
+                    break
+        finally:
+            event_listener.forget_job(jid)
+
+        if not is_finished.done():
+            is_finished.set_result(True)
+        raise salt.ext.tornado.gen.Return(True)
 
     @salt.ext.tornado.gen.coroutine
     def _disbatch_local_async(self, chunk):
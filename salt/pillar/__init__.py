@@ -4,26 +4,32 @@ Render the pillar data
 
 
 import collections
+import concurrent.futures
 import copy
 import fnmatch
 import inspect
 import logging
 import os
 import sys
+import time
 import traceback
 
 import salt.ext.tornado.gen
 import salt.fileclient
 import salt.loader
 import salt.minion
+import salt.template
 import salt.transport.client
 import salt.utils.args
 import salt.utils.cache
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.renderinputs
 import salt.utils.url
-from salt.exceptions import SaltClientError
+from salt.exceptions import SaltClientError, SaltRenderError
 from salt.template import compile_template
 
 # Even though dictupdate is imported, invoking salt.utils.dictupdate.merge here
@@ -35,6 +41,27 @@ from salt.version import __version__
 
 log = logging.getLogger(__name__)
 
+# The renderers whose output only depends on their input data and on the
+# template context and included files, which salt.utils.renderinputs records
+RENDER_CACHE_RENDERERS = frozenset(
+    (
+        "gpg",
+        "hjson",
+        "jinja",
+        "json",
+        "json5",
+        "msgpack",
+        "nacl",
+        "toml",
+        "yaml",
+        "yamlex",
+    )
+)
+
+# Renders of pillar SLS files kept for pillar_render_cache, keyed by the path,
+# saltenv and name of the SLS
+_RENDER_CACHE = {}
+
 
 def get_pillar(
     opts,
@@ -539,6 +566,7 @@ class Pillar:
             self.merge_strategy = opts["pillar_source_merging_strategy"]
 
         self.ext_pillars = salt.loader.pillars(ext_pillar_opts, self.functions)
+        self.ext_pillar_timing = []
         self.ignored_pillars = {}
         self.pillar_override = pillar_override or {}
         if not isinstance(self.pillar_override, dict):
@@ -829,6 +857,77 @@ class Pillar:
                             env_matches.append(item)
         return matches
 
+    def _compile_sls(self, fn_, saltenv, sls, defaults):
+        """
+        Render a pillar SLS file. With pillar_render_cache enabled, an earlier
+        render of the same file is reused when the grains, pillar and opts
+        keys and the salt function results its templates read are the same.
+        """
+
+        def _compile():
+            return compile_template(
+                fn_,
+                self.rend,
+                self.opts["renderer"],
+                self.opts["renderer_blacklist"],
+                self.opts["renderer_whitelist"],
+                saltenv,
+                sls,
+                _pillar_rend=True,
+                **defaults
+            )
+
+        if not self.opts.get("pillar_render_cache", False):
+            return _compile()
+        try:
+            with salt.utils.files.fopen(fn_, "rb") as fp_:
+                digest = salt.utils.hashutils.sha256_digest(fp_.read())
+            render_pipe = salt.template.template_shebang(
+                fn_,
+                self.rend,
+                self.opts["renderer"],
+                self.opts["renderer_blacklist"],
+                self.opts["renderer_whitelist"],
+                "",
+            )
+        except (OSError, SaltRenderError):
+            return _compile()
+        renderers = tuple(render.__module__.split(".")[-1] for render, _ in render_pipe)
+        if not renderers or not set(renderers).issubset(RENDER_CACHE_RENDERERS):
+            return _compile()
+
+        key = (fn_, saltenv, sls)
+        entry = _RENDER_CACHE.get(key)
+        if entry is None or entry["digest"] != digest:
+            entry = _RENDER_CACHE[key] = {"digest": digest, "variants": []}
+        variants = entry["variants"]
+        sources = {
+            "grains": self.opts.get("grains", {}),
+            "pillar": self.opts.get("pillar", {}),
+            "opts": self.opts,
+            "salt": self.functions,
+        }
+
+        def _call(name, args, kwargs):
+            return self.functions[name](*args, **kwargs)
+
+        for idx, (variant_key, inputs, state) in enumerate(variants):
+            if variant_key != (renderers, defaults):
+                continue
+            if inputs.matches(sources, _call):
+                variants.insert(0, variants.pop(idx))
+                log.debug("Reusing the render of pillar SLS '%s'", sls)
+                return copy.deepcopy(state)
+
+        with salt.utils.renderinputs.record() as inputs:
+            state = _compile()
+        if inputs.cacheable:
+            variants.insert(
+                0, ((renderers, copy.deepcopy(defaults)), inputs, copy.deepcopy(state))
+            )
+            del variants[self.opts.get("pillar_render_cache_size", 64) :]
+        return state
+
     def render_pstate(self, sls, saltenv, mods, defaults=None):
         """
         Collect a single pillar sls file and render it
@@ -879,17 +978,7 @@ class Pillar:
                 return None, mods, errors
         state = None
         try:
-            state = compile_template(
-                fn_,
-                self.rend,
-                self.opts["renderer"],
-                self.opts["renderer_blacklist"],
-                self.opts["renderer_whitelist"],
-                saltenv,
-                sls,
-                _pillar_rend=True,
-                **defaults
-            )
+            state = self._compile_sls(fn_, saltenv, sls, defaults)
         except Exception as exc:  # pylint: disable=broad-except
             msg = "Rendering SLS '{}' failed, render error:\n{}".format(sls, exc)
             log.critical(msg, exc_info=True)
@@ -1133,6 +1222,7 @@ class Pillar:
                 self.opts.get("pillar_merge_lists", False),
             )
 
+        runs = []
         for run in self.opts["ext_pillar"]:
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
@@ -1146,27 +1236,158 @@ class Pillar:
                         "Specified ext_pillar interface %s is unavailable", key
                     )
                     continue
+                runs.append((key, val))
+
+        self.ext_pillar_timing = []
+        workers = self.opts.get("ext_pillar_concurrency", 1)
+        stacked = self.opts.get("ext_pillar_stacked", ["stack"])
+        groups = []
+        for key, val in runs:
+            # A stacked source reads the data merged from the sources before it
+            if workers > 1 and groups and key not in stacked:
+                if groups[-1][-1][0] not in stacked:
+                    groups[-1].append((key, val))
+                    continue
+            groups.append([(key, val)])
+        for group in groups:
+            if workers > 1:
+                exts = self._ext_pillar_concurrent(pillar, group, workers, errors)
+            else:
+                exts = [self._ext_pillar_source(pillar, group[0], errors)]
+            for ext in exts:
+                if ext:
+                    pillar = merge(
+                        pillar,
+                        ext,
+                        self.merge_strategy,
+                        self.opts.get("renderer", "yaml"),
+                        self.opts.get("pillar_merge_lists", False),
+                    )
+        return pillar, errors
+
+    def _ext_pillar_source(self, pillar, run, errors):
+        """
+        Call a single ext_pillar source and record how long it took
+        """
+        key, val = run
+        start = time.time()
+        ext = None
+        try:
+            ext = self._external_pillar_data(pillar, val, key)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(
+                "Failed to load ext_pillar {}: {}".format(key, exc.__str__(),)
+            )
+            log.error(
+                "Exception caught loading ext_pillar '%s':\n%s",
+                key,
+                "".join(traceback.format_tb(sys.exc_info()[2])),
+            )
+        duration = (time.time() - start) * 1000
+        log.debug("ext_pillar %s took %.1f ms", key, duration)
+        self.ext_pillar_timing.append({"name": key, "duration": duration})
+        return ext
+
+    def _ext_pillar_timeout(self, key):
+        """
+        Return the number of seconds the ext_pillar source may take, or None
+        """
+        timeout = self.opts.get("ext_pillar_timeout", 0)
+        if isinstance(timeout, dict):
+            timeout = timeout.get(key, 0)
+        return timeout or None
+
+    def _ext_pillar_concurrent(self, pillar, runs, workers, errors):
+        """
+        Call the ext_pillar sources on a pool of threads. They all get the same
+        pillar data and their results are returned in the configured order,
+        with None for the sources which failed or timed out.
+        """
+        exts = [None] * len(runs)
+        timing = [None] * len(runs)
+        starts = {}
+
+        def _call(idx):
+            key, val = runs[idx]
+            starts[idx] = time.time()
+            # Sources which change the pillar data they get must not race
+            ext = self._external_pillar_data(copy.deepcopy(pillar), val, key)
+            timing[idx] = {"name": key, "duration": (time.time() - starts[idx]) * 1000}
+            return ext
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(workers, len(runs))
+        )
+        futures = {executor.submit(_call, idx): idx for idx in range(len(runs))}
+        pending = set(futures)
+        stuck = set()
+        while pending:
+            now = time.time()
+            deadlines = []
+            for future in list(pending):
+                idx = futures[future]
+                timeout = self._ext_pillar_timeout(runs[idx][0])
+                if timeout is None:
+                    continue
+                if idx not in starts:
+                    # Check again soon whether the source started
+                    deadlines.append(now + 0.1)
+                    continue
+                if now - starts[idx] < timeout:
+                    deadlines.append(starts[idx] + timeout)
+                    continue
+                pending.discard(future)
+                stuck.add(future)
+                timing[idx] = {"name": runs[idx][0], "duration": timeout * 1000}
+                errors.append(
+                    "ext_pillar {} timed out after {} seconds".format(
+                        runs[idx][0], timeout
+                    )
+                )
+                log.error(errors[-1])
+            if len([future for future in stuck if not future.done()]) >= min(
+                workers, len(runs)
+            ):
+                # Every thread is held by a source which timed out
+                for future in pending:
+                    future.cancel()
+                    errors.append(
+                        "ext_pillar {} was not called, the sources before it "
+                        "timed out".format(runs[futures[future]][0])
+                    )
+                    log.error(errors[-1])
+                break
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(
+                pending,
+                timeout=min(deadlines) - now if deadlines else None,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.discard(future)
+                idx = futures[future]
+                key = runs[idx][0]
                 try:
-                    ext = self._external_pillar_data(pillar, val, key)
+                    exts[idx] = future.result()
                 except Exception as exc:  # pylint: disable=broad-except
                     errors.append(
-                        "Failed to load ext_pillar {}: {}".format(key, exc.__str__(),)
+                        "Failed to load ext_pillar {}: {}".format(key, exc.__str__())
                     )
                     log.error(
                         "Exception caught loading ext_pillar '%s':\n%s",
                         key,
-                        "".join(traceback.format_tb(sys.exc_info()[2])),
+                        "".join(traceback.format_tb(exc.__traceback__)),
                     )
-            if ext:
-                pillar = merge(
-                    pillar,
-                    ext,
-                    self.merge_strategy,
-                    self.opts.get("renderer", "yaml"),
-                    self.opts.get("pillar_merge_lists", False),
+        # Do not wait for the sources which timed out
+        executor.shutdown(wait=False)
+        for entry in timing:
+            if entry is not None:
+                log.debug(
+                    "ext_pillar %s took %.1f ms", entry["name"], entry["duration"]
                 )
-                ext = None
-        return pillar, errors
+                self.ext_pillar_timing.append(entry)
+        return exts
 
     def compile_pillar(self, ext=True):
         """
@@ -1212,6 +1433,8 @@ class Pillar:
             for error in errors:
                 log.critical("Pillar render error: %s", error)
             pillar["_errors"] = errors
+        if self.opts.get("ext_pillar_timing", False) and self.ext_pillar_timing:
+            pillar["_ext_pillar_timing"] = self.ext_pillar_timing
 
         if self.pillar_override:
             pillar = merge(
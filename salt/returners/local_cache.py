@@ -139,6 +139,49 @@ def returner(load):
     if os.path.exists(os.path.join(jid_dir, "nocache")):
         return
 
+    return _write_return(serial, jid_dir, load)
+
+
+def returner_batch(loads):
+    """
+    Return a batch of minion returns to the local job cache
+    """
+    serial = salt.payload.Serial(__opts__)
+    job_dir = _job_dir()
+
+    # Returns for the same job share the jid dir lookup
+    jid_dirs = {}
+    for load in loads:
+        # if a minion is returning a standalone job, get a jobid
+        if load["jid"] == "req":
+            load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+        if load["jid"] not in jid_dirs:
+            jid_dir = salt.utils.jid.jid_dir(
+                load["jid"], job_dir, __opts__["hash_type"]
+            )
+            if os.path.exists(os.path.join(jid_dir, "nocache")):
+                jid_dir = None
+            jid_dirs[load["jid"]] = jid_dir
+
+        if jid_dirs[load["jid"]] is None:
+            continue
+        try:
+            _write_return(serial, jid_dirs[load["jid"]], load)
+        except OSError as exc:
+            # Don't let a single failed write drop the rest of the batch
+            log.error(
+                "Could not store the return of %s for job %s: %s",
+                load["id"],
+                load["jid"],
+                exc,
+            )
+
+
+def _write_return(serial, jid_dir, load):
+    """
+    Write a single minion return to its jid dir
+    """
     hn_dir = os.path.join(jid_dir, load["id"])
 
     try:
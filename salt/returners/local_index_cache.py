@@ -0,0 +1,680 @@
+"""
+Return data to an indexed local job cache
+
+.. versionadded:: 3005
+
+This returner is a drop-in replacement for the default :mod:`local_cache
+<salt.returners.local_cache>` master job cache. Instead of a directory per
+job, the published loads and the minion returns are appended to segment files
+and located through an SQLite index sorted by job id. Looking up a job does
+not need to walk the job cache, listing the jobs of a time range is a range
+scan of the index and expired jobs are removed by dropping whole segments.
+
+Every segment holds the jobs started within one hour, the jobs are therefore
+kept up to one hour longer than :conf_master:`keep_jobs`.
+
+To use it as the master job cache, set the following in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: local_index_cache
+
+The jobs stored by ``local_cache`` can be imported with:
+
+.. code-block:: bash
+
+    salt-run jobs.migrate_local_cache
+"""
+
+import datetime
+import errno
+import glob
+import logging
+import os
+import threading
+import time
+
+import salt.exceptions
+import salt.payload
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.minions
+import salt.utils.stringutils
+from salt.returners.local_cache import (
+    ENDTIME,
+    LOAD_P,
+    MINIONS_P,
+    OUT_P,
+    RETURN_P,
+    SYNDIC_MINIONS_P,
+)
+
+try:
+    import sqlite3
+
+    HAS_SQLITE3 = True
+except ImportError:
+    HAS_SQLITE3 = False
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "local_index_cache"
+
+INDEX_DB = "index.db"
+SEGMENT_EXT = ".seg"
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jids (
+        jid TEXT PRIMARY KEY,
+        segment TEXT NOT NULL,
+        nocache INTEGER NOT NULL DEFAULT 0,
+        fun TEXT,
+        load_offset INTEGER,
+        load_size INTEGER,
+        endtime TEXT
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS jids_segment ON jids (segment)",
+    """CREATE TABLE IF NOT EXISTS minions (
+        jid TEXT NOT NULL,
+        syndic_id TEXT NOT NULL,
+        minion TEXT NOT NULL,
+        segment TEXT NOT NULL,
+        PRIMARY KEY (jid, syndic_id, minion)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS minions_segment ON minions (segment)",
+    """CREATE TABLE IF NOT EXISTS returns (
+        jid TEXT NOT NULL,
+        minion TEXT NOT NULL,
+        segment TEXT NOT NULL,
+        ret_offset INTEGER NOT NULL,
+        ret_size INTEGER NOT NULL,
+        PRIMARY KEY (jid, minion)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS returns_segment ON returns (segment)",
+)
+
+# The index connections are not shared between processes or threads
+_LOCAL = threading.local()
+
+
+def __virtual__():
+    if not HAS_SQLITE3:
+        return False, "Could not import local_index_cache returner; sqlite3 is missing"
+    return __virtualname__
+
+
+def _index_dir():
+    """
+    Return the directory holding the index and the segments
+    """
+    return os.path.join(__opts__["cachedir"], "job_index")
+
+
+def _segment_path(segment):
+    return os.path.join(_index_dir(), segment + SEGMENT_EXT)
+
+
+def _get_conn():
+    """
+    Return the index connection of this process and thread
+    """
+    index_path = os.path.join(_index_dir(), INDEX_DB)
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None and _LOCAL.key == (os.getpid(), index_path):
+        return conn
+
+    try:
+        os.makedirs(_index_dir())
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+    # Transactions are opened explicitly, see _Writer
+    conn = sqlite3.connect(index_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    _LOCAL.conn = conn
+    _LOCAL.key = (os.getpid(), index_path)
+    return conn
+
+
+class _Writer:
+    """
+    Context manager holding the index write lock while records are appended to
+    the segments, this serializes the writers of every master process
+    """
+
+    def __init__(self):
+        self.conn = _get_conn()
+        self.serial = salt.payload.Serial(__opts__)
+        self.segments = {}
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            for fh_ in self.segments.values():
+                fh_.close()
+        finally:
+            if exc_type is None:
+                self.conn.execute("COMMIT")
+            else:
+                self.conn.execute("ROLLBACK")
+
+    def append(self, segment, data):
+        """
+        Append a record to a segment and return its offset and size
+        """
+        if segment not in self.segments:
+            self.segments[segment] = salt.utils.files.fopen(
+                _segment_path(segment), "ab"
+            )
+        fh_ = self.segments[segment]
+        fh_.seek(0, os.SEEK_END)
+        offset = fh_.tell()
+        record = self.serial.dumps(data)
+        fh_.write(record)
+        fh_.flush()
+        return offset, len(record)
+
+    def job(self, jid):
+        """
+        Return the segment and the nocache flag of a job
+        """
+        return self.conn.execute(
+            "SELECT segment, nocache FROM jids WHERE jid = ?", (jid,)
+        ).fetchone()
+
+    def add_job(self, jid, nocache=False):
+        """
+        Add a job to the index, return whether it was not indexed yet
+        """
+        # Jobs are stored in the segment of the hour they were started in
+        if salt.utils.jid.is_jid(jid):
+            segment = jid[:10]
+        else:
+            segment = salt.utils.jid.gen_jid(__opts__)[:10]
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO jids (jid, segment, nocache) VALUES (?, ?, ?)",
+            (jid, segment, int(nocache)),
+        )
+        if nocache and not cur.rowcount:
+            self.conn.execute("UPDATE jids SET nocache = 1 WHERE jid = ?", (jid,))
+        return bool(cur.rowcount)
+
+    def add_return(self, load):
+        """
+        Append a minion return, the job has to be indexed already
+        """
+        job = self.job(load["jid"])
+        if job is None:
+            log.error(
+                "An inconsistency occurred, a job was received with a job id "
+                "(%s) that is not present in the local cache",
+                load["jid"],
+            )
+            return False
+        segment, nocache = job
+        if nocache:
+            return None
+        if self.conn.execute(
+            "SELECT 1 FROM returns WHERE jid = ? AND minion = ?",
+            (load["jid"], load["id"]),
+        ).fetchone():
+            # Minion has already returned this jid and it should be dropped
+            log.error(
+                "An extra return was detected from minion %s, please verify "
+                "the minion, this could be a replay attack",
+                load["id"],
+            )
+            return False
+        offset, size = self.append(
+            segment,
+            {
+                key: load[key]
+                for key in ("return", "retcode", "success", "out")
+                if key in load
+            },
+        )
+        self.conn.execute(
+            "INSERT INTO returns (jid, minion, segment, ret_offset, ret_size) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (load["jid"], load["id"], segment, offset, size),
+        )
+        return None
+
+    def add_load(self, jid, load):
+        """
+        Append the load of a job
+        """
+        self.add_job(jid)
+        segment = self.job(jid)[0]
+        offset, size = self.append(segment, load)
+        self.conn.execute(
+            "UPDATE jids SET fun = ?, load_offset = ?, load_size = ? WHERE jid = ?",
+            (load.get("fun"), offset, size, jid),
+        )
+
+    def set_minions(self, jid, minions, syndic_id=None):
+        """
+        Replace the minions targeted by a job
+        """
+        self.add_job(jid)
+        segment = self.job(jid)[0]
+        syndic_id = syndic_id or ""
+        self.conn.execute(
+            "DELETE FROM minions WHERE jid = ? AND syndic_id = ?", (jid, syndic_id)
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO minions (jid, syndic_id, minion, segment) "
+            "VALUES (?, ?, ?, ?)",
+            [(jid, syndic_id, minion, segment) for minion in minions],
+        )
+
+    def set_endtime(self, jid, endtime):
+        self.add_job(jid)
+        self.conn.execute(
+            "UPDATE jids SET endtime = ? WHERE jid = ?",
+            (salt.utils.stringutils.to_str(endtime), jid),
+        )
+
+
+def _read_records(rows):
+    """
+    Read the records at the ``(key, segment, offset, size)`` rows, the rows
+    should be sorted by segment
+    """
+    serial = salt.payload.Serial(__opts__)
+    fh_ = None
+    current = None
+    try:
+        for key, segment, offset, size in rows:
+            if segment != current:
+                if fh_ is not None:
+                    fh_.close()
+                    fh_ = None
+                current = segment
+                try:
+                    fh_ = salt.utils.files.fopen(_segment_path(segment), "rb")
+                except OSError as exc:
+                    # The segment expired after the index was read
+                    log.debug("Could not open job cache segment %s: %s", segment, exc)
+            if fh_ is None:
+                continue
+            fh_.seek(offset)
+            try:
+                yield key, serial.loads(fh_.read(size))
+            except Exception:  # pylint: disable=broad-except
+                log.exception(
+                    "Failed to deserialize the record of %s in segment %s",
+                    key,
+                    segment,
+                )
+    finally:
+        if fh_ is not None:
+            fh_.close()
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    """
+    Return a job id and add it to the index.
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    """
+    if recurse_count >= 5:
+        err = "prep_jid could not store a jid after {} tries.".format(recurse_count)
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    with _Writer() as writer:
+        added = writer.add_job(jid, nocache=nocache)
+    if not added and passed_jid is None:
+        # Someone else is using the jid, get a new one
+        time.sleep(0.1)
+        return prep_jid(nocache=nocache, recurse_count=recurse_count + 1)
+    return jid
+
+
+def returner(load):
+    """
+    Return data to the indexed local job cache
+    """
+    # if a minion is returning a standalone job, get a jobid
+    if load["jid"] == "req":
+        load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+    with _Writer() as writer:
+        return writer.add_return(load)
+
+
+def returner_batch(loads):
+    """
+    Return a batch of minion returns to the indexed local job cache
+    """
+    for load in loads:
+        if load["jid"] == "req":
+            load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+    with _Writer() as writer:
+        for load in loads:
+            writer.add_return(load)
+
+
+def save_load(jid, clear_load, minions=None):
+    """
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+
+    The load of a job is only saved once, the returns of the minions are
+    passed to ``save_load`` as well when the master job cache is not
+    ``local_cache``.
+    """
+    query = "SELECT 1 FROM jids WHERE jid = ? AND load_offset IS NOT NULL"
+    # Check before taking the write lock, the returns are passed for every minion
+    if _get_conn().execute(query, (jid,)).fetchone():
+        return
+    with _Writer() as writer:
+        if writer.conn.execute(query, (jid,)).fetchone():
+            return
+        writer.add_load(jid, clear_load)
+
+    # if you have a tgt, save that for the UI etc
+    if "tgt" in clear_load and clear_load["tgt"] != "":
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                clear_load["tgt"], clear_load.get("tgt_type", "glob")
+            )
+            minions = _res["minions"]
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    """
+    Save/update the list of minions for a given job
+    """
+    minions = list(minions)
+
+    log.debug(
+        "Adding minions for job %s%s: %s",
+        jid,
+        " from syndic master '{}'".format(syndic_id) if syndic_id else "",
+        minions,
+    )
+    with _Writer() as writer:
+        writer.set_minions(jid, minions, syndic_id=syndic_id)
+
+
+def get_load(jid):
+    """
+    Return the load data that marks a specified jid
+    """
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT jid, segment, load_offset, load_size FROM jids "
+        "WHERE jid = ? AND load_offset IS NOT NULL",
+        (jid,),
+    ).fetchone()
+    if row is None:
+        return {}
+    ret = {}
+    for _, load in _read_records([row]):
+        ret = load or {}
+    minions = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT minion FROM minions WHERE jid = ? ORDER BY minion",
+            (jid,),
+        )
+    ]
+    if minions:
+        ret["Minions"] = minions
+    return ret
+
+
+def get_jid(jid):
+    """
+    Return the information returned when the specified job id was executed
+    """
+    rows = _get_conn().execute(
+        "SELECT minion, segment, ret_offset, ret_size FROM returns "
+        "WHERE jid = ? ORDER BY segment, ret_offset",
+        (jid,),
+    )
+    return dict(_read_records(rows.fetchall()))
+
+
+def _get_jobs(where="", params=()):
+    """
+    Return the jid and load of the jobs in the index matching the where clause
+    """
+    rows = _get_conn().execute(
+        "SELECT jid, segment, load_offset, load_size FROM jids "
+        "WHERE load_offset IS NOT NULL {} ORDER BY segment, load_offset".format(where),
+        params,
+    )
+    return _read_records(rows.fetchall())
+
+
+def _format_jids(jobs):
+    ret = {}
+    endtimes = {}
+    if __opts__.get("job_cache_store_endtime"):
+        endtimes = dict(
+            _get_conn().execute(
+                "SELECT jid, endtime FROM jids WHERE endtime IS NOT NULL"
+            )
+        )
+    for jid, job in jobs:
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+        if endtimes.get(jid):
+            ret[jid]["EndTime"] = endtimes[jid]
+    return ret
+
+
+def get_jids():
+    """
+    Return a dict mapping all job ids to job information
+    """
+    return _format_jids(_get_jobs())
+
+
+def get_jids_range(start=None, end=None):
+    """
+    Return a dict mapping the job ids started within a time range to job
+    information
+
+    start
+        The first job id to return, a prefix of a job id like ``2021031619``
+        can be passed
+
+    end
+        The last job id to return, every job id starting with ``end`` is
+        returned
+    """
+    where = ""
+    params = []
+    if start:
+        where += "AND jid >= ? "
+        params.append(str(start))
+    if end:
+        # Include the job ids which are suffixed or start with the prefix
+        where += "AND jid < ? "
+        params.append(str(end) + "~")
+    return _format_jids(_get_jobs(where, params))
+
+
+def get_jids_filter(count, filter_find_job=True):
+    """
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    """
+    where = "AND fun IS NOT 'saltutil.find_job'" if filter_find_job else ""
+    rows = (
+        _get_conn()
+        .execute(
+            "SELECT jid, segment, load_offset, load_size FROM jids "
+            "WHERE load_offset IS NOT NULL {} ORDER BY jid DESC LIMIT ?".format(where),
+            (count,),
+        )
+        .fetchall()
+    )
+    jobs = dict(_read_records(sorted(rows, key=lambda row: (row[1], row[2]))))
+    return [
+        salt.utils.jid.format_jid_instance_ext(jid, jobs[jid])
+        for jid, _, _, _ in reversed(rows)
+        if jid in jobs
+    ]
+
+
+def clean_old_jobs():
+    """
+    Clean out the old jobs from the job cache by dropping the expired segments
+    """
+    if __opts__["keep_jobs"] == 0:
+        return
+    cutoff = "{:%Y%m%d%H}".format(
+        datetime.datetime.utcnow()
+        - datetime.timedelta(hours=float(__opts__["keep_jobs"]))
+    )
+    with _Writer() as writer:
+        for table in ("returns", "minions", "jids"):
+            writer.conn.execute(
+                "DELETE FROM {} WHERE segment < ?".format(table), (cutoff,)
+            )
+
+    for path in glob.glob(os.path.join(_index_dir(), "*" + SEGMENT_EXT)):
+        segment = os.path.basename(path)[: -len(SEGMENT_EXT)]
+        if segment < cutoff:
+            log.debug("Removing expired job cache segment %s", path)
+            try:
+                os.remove(path)
+            except OSError as err:
+                log.error("Unable to remove %s: %s", path, err)
+
+
+def update_endtime(jid, time):
+    """
+    Update (or store) the end time for a given job
+    """
+    with _Writer() as writer:
+        writer.set_endtime(jid, time)
+
+
+def get_endtime(jid):
+    """
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    """
+    row = (
+        _get_conn().execute("SELECT endtime FROM jids WHERE jid = ?", (jid,)).fetchone()
+    )
+    if row is None or row[0] is None:
+        return False
+    return row[0]
+
+
+def _read_job_dir(serial, jid_dir):
+    """
+    Read a job stored in a ``local_cache`` jid dir
+    """
+
+    def _load(path):
+        with salt.utils.files.fopen(path, "rb") as rfh:
+            return serial.load(rfh)
+
+    with salt.utils.files.fopen(os.path.join(jid_dir, "jid"), "rb") as rfh:
+        jid = salt.utils.stringutils.to_unicode(rfh.read()).strip()
+    job = {
+        "jid": jid,
+        "nocache": os.path.exists(os.path.join(jid_dir, "nocache")),
+        "load": None,
+        "minions": {},
+        "returns": [],
+        "endtime": None,
+    }
+    if os.path.isfile(os.path.join(jid_dir, LOAD_P)):
+        job["load"] = _load(os.path.join(jid_dir, LOAD_P))
+    if os.path.isfile(os.path.join(jid_dir, MINIONS_P)):
+        job["minions"][None] = _load(os.path.join(jid_dir, MINIONS_P))
+    prefix, suffix = SYNDIC_MINIONS_P.split("{0}")
+    for path in glob.glob(os.path.join(jid_dir, SYNDIC_MINIONS_P.format("*"))):
+        syndic_id = os.path.basename(path)[len(prefix) : -len(suffix)]
+        job["minions"][syndic_id] = _load(path)
+    if os.path.isfile(os.path.join(jid_dir, ENDTIME)):
+        with salt.utils.files.fopen(os.path.join(jid_dir, ENDTIME), "r") as etfile:
+            job["endtime"] = salt.utils.stringutils.to_unicode(etfile.read()).strip()
+    for minion in os.listdir(jid_dir):
+        retp = os.path.join(jid_dir, minion, RETURN_P)
+        if minion.startswith(".") or not os.path.isfile(retp):
+            continue
+        ret = _load(retp)
+        if not isinstance(ret, dict) or "return" not in ret:
+            # Old format in which return.p only contains the return data
+            ret = {"return": ret}
+        ret["jid"] = jid
+        ret["id"] = minion
+        outp = os.path.join(jid_dir, minion, OUT_P)
+        if os.path.isfile(outp):
+            ret["out"] = _load(outp)
+        job["returns"].append(ret)
+    return job
+
+
+def import_local_cache(job_dir=None):
+    """
+    Import the jobs stored by the ``local_cache`` returner, jobs which are
+    already indexed are skipped. Return the number of imported jobs.
+
+    job_dir
+        The ``local_cache`` job directory, defaults to the ``jobs`` directory
+        in the master cachedir
+    """
+    if job_dir is None:
+        job_dir = os.path.join(__opts__["cachedir"], "jobs")
+    if not os.path.isdir(job_dir):
+        return 0
+    serial = salt.payload.Serial(__opts__)
+    imported = 0
+    for top in os.listdir(job_dir):
+        t_path = os.path.join(job_dir, top)
+        if not os.path.isdir(t_path):
+            continue
+        for final in os.listdir(t_path):
+            jid_dir = os.path.join(t_path, final)
+            if not os.path.isfile(os.path.join(jid_dir, "jid")):
+                continue
+            try:
+                job = _read_job_dir(serial, jid_dir)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Failed to read the job cached in %s", jid_dir)
+                continue
+            with _Writer() as writer:
+                if not writer.add_job(job["jid"], nocache=job["nocache"]):
+                    continue
+                if job["load"] is not None:
+                    writer.add_load(job["jid"], job["load"])
+                for syndic_id, minions in job["minions"].items():
+                    writer.set_minions(job["jid"], minions, syndic_id=syndic_id)
+                if job["endtime"]:
+                    writer.set_endtime(job["jid"], job["endtime"])
+                for ret in job["returns"]:
+                    writer.add_return(ret)
+            imported += 1
+    log.info("Imported %d jobs from %s", imported, job_dir)
+    return imported
@@ -325,6 +325,47 @@ def returner(ret):
         )
 
 
+def returner_batch(rets):
+    """
+    Return a batch of returns to a mysql server in a single transaction
+    """
+    # Returns using an alternative configuration are sent to their own server
+    batches = {}
+    for ret in rets:
+        # if a minion is returning a standalone job, get a jobid
+        if ret["jid"] == "req":
+            ret["jid"] = prep_jid(nocache=ret.get("nocache", False))
+            save_load(ret["jid"], ret)
+        batches.setdefault(ret.get("ret_config"), []).append(ret)
+
+    for batch in batches.values():
+        try:
+            with _get_serv(batch[0], commit=True) as cur:
+                sql = """INSERT INTO `salt_returns`
+                         (`fun`, `jid`, `return`, `id`, `success`, `full_ret`)
+                         VALUES (%s, %s, %s, %s, %s, %s)"""
+
+                cur.executemany(
+                    sql,
+                    [
+                        (
+                            ret["fun"],
+                            ret["jid"],
+                            salt.utils.json.dumps(ret["return"]),
+                            ret["id"],
+                            ret.get("success", False),
+                            salt.utils.json.dumps(ret),
+                        )
+                        for ret in batch
+                    ],
+                )
+        except salt.exceptions.SaltMasterError as exc:
+            log.critical(exc)
+            log.critical(
+                "Could not store returns with MySQL returner. MySQL server unavailable."
+            )
+
+
 def event_return(events):
     """
     Return event to mysql server
@@ -251,6 +251,41 @@ def returner(ret):
         )
 
 
+def returner_batch(rets):
+    """
+    Return a batch of returns to a postgres server in a single transaction
+    """
+    # Returns using an alternative configuration are sent to their own server
+    batches = {}
+    for ret in rets:
+        batches.setdefault(ret.get("ret_config"), []).append(ret)
+
+    for batch in batches.values():
+        try:
+            with _get_serv(batch[0], commit=True) as cur:
+                sql = """INSERT INTO salt_returns
+                        (fun, jid, return, id, success, full_ret)
+                        VALUES (%s, %s, %s, %s, %s, %s)"""
+                cur.executemany(
+                    sql,
+                    [
+                        (
+                            ret["fun"],
+                            ret["jid"],
+                            salt.utils.json.dumps(ret["return"]),
+                            ret["id"],
+                            ret.get("success", False),
+                            salt.utils.json.dumps(ret),
+                        )
+                        for ret in batch
+                    ],
+                )
+        except salt.exceptions.SaltMasterError:
+            log.critical(
+                "Could not store returns with postgres returner. PostgreSQL server unavailable."
+            )
+
+
 def event_return(events):
     """
     Return event to Pg server
@@ -310,7 +310,17 @@ def list_jobs(
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners["{}.get_jids".format(returner)]()
+    range_fun = "{}.get_jids_range".format(returner)
+    if (start_time or end_time) and DATEUTIL_SUPPORT and range_fun in mminion.returners:
+        # Let the returner skip the jobs outside of the time range
+        start_jid = end_jid = None
+        if start_time:
+            start_jid = "{:%Y%m%d%H%M%S%f}".format(dateutil_parser.parse(start_time))
+        if end_time:
+            end_jid = "{:%Y%m%d%H%M%S%f}".format(dateutil_parser.parse(end_time))
+        ret = mminion.returners[range_fun](start_jid, end_jid)
+    else:
+        ret = mminion.returners["{}.get_jids".format(returner)]()
 
     mret = {}
     for item in ret:
@@ -419,6 +429,35 @@ def list_jobs_filter(
         return ret
 
 
+def migrate_local_cache(job_dir=None):
+    """
+    .. versionadded:: 3005
+
+    Import the jobs stored by the default ``local_cache`` job cache into the
+    configured :conf_master:`master_job_cache`, the returner has to provide an
+    ``import_local_cache`` function like the ``local_index_cache`` returner.
+    Return the number of imported jobs.
+
+    job_dir
+        The ``local_cache`` job directory, defaults to the ``jobs`` directory
+        in the master cachedir
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run jobs.migrate_local_cache
+    """
+    mminion = salt.minion.MasterMinion(__opts__)
+
+    fun = "{}.import_local_cache".format(__opts__["master_job_cache"])
+    if fun not in mminion.returners:
+        raise NotImplementedError(
+            "'{}' returner function not implemented yet.".format(fun)
+        )
+    return mminion.returners[fun](job_dir=job_dir)
+
+
 def print_job(jid, ext_source=None):
     """
     Print a specific job's detail given by its jid, including the return data.
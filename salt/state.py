@@ -12,11 +12,14 @@ The data sent to the state calls is as follows:
 """
 
 
+import bisect
 import copy
 import datetime
 import fnmatch
 import importlib
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
 import random
 import re
@@ -123,6 +126,9 @@ STATE_INTERNAL_KEYWORDS = STATE_REQUISITE_KEYWORDS.union(
     STATE_REQUISITE_IN_KEYWORDS
 ).union(STATE_RUNTIME_KEYWORDS)
 
+# The characters which make a requisite a glob pattern rather than a name
+GLOB_CHARS = frozenset("*?[")
+
 
 def _odict_hashable(self):
     return id(self)
@@ -275,6 +281,193 @@ def find_sls_ids(sls, high):
     return ret
 
 
+class ChunkIndex:
+    """
+    Resolve the requisites of low chunks without scanning every chunk
+
+    The chunks are indexed once by ``__id__``, ``name`` and ``__sls__``.
+    Glob patterns are only matched against the values which start with their
+    literal prefix, and their matches are cached, so resolving a requisite
+    costs about the number of chunks it matches rather than the number of
+    chunks.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.size = len(chunks)
+        self._fields = {"__id__": {}, "name": {}, "__sls__": {}}
+        self._sorted = {}
+        self._globs = {}
+        for pos, chunk in enumerate(chunks):
+            for field, index in self._fields.items():
+                value = chunk.get(field)
+                if isinstance(value, str):
+                    index.setdefault(value, []).append(pos)
+
+    def current(self, chunks):
+        """
+        Return True if the index was built from this list of chunks
+        """
+        return self.chunks is chunks and self.size == len(chunks)
+
+    def _match(self, field, pattern):
+        """
+        Return the positions of the chunks whose field matches the pattern as
+        fnmatch.fnmatch would match it
+        """
+        windows = salt.utils.platform.is_windows()
+        if not windows and not GLOB_CHARS.intersection(pattern):
+            # Without wildcards fnmatch is an equality test, except on
+            # Windows where it ignores the case
+            return self._fields[field].get(pattern, [])
+        key = (field, pattern)
+        if key in self._globs:
+            return self._globs[key]
+        if windows:
+            found = [
+                pos
+                for pos, chunk in enumerate(self.chunks)
+                if fnmatch.fnmatch(chunk[field], pattern)
+            ]
+        else:
+            if field not in self._sorted:
+                self._sorted[field] = sorted(self._fields[field])
+            values = self._sorted[field]
+            prefix = re.split(r"[*?[]", pattern, 1)[0]
+            found = []
+            for idx in range(bisect.bisect_left(values, prefix), len(values)):
+                if not values[idx].startswith(prefix):
+                    break
+                if fnmatch.fnmatch(values[idx], pattern):
+                    found.extend(self._fields[field][values[idx]])
+            found.sort()
+        self._globs[key] = found
+        return found
+
+    def find(self, req_key, req_val):
+        """
+        Return the chunks the requisite ``{req_key: req_val}`` refers to, in
+        the order of the chunks
+        """
+        if req_key == "sls":
+            # Allow requisite tracking of entire sls files
+            return [self.chunks[pos] for pos in self._match("__sls__", req_val)]
+        found = set(self._match("name", req_val))
+        found.update(self._match("__id__", req_val))
+        return [
+            self.chunks[pos]
+            for pos in sorted(found)
+            if req_key == "id" or self.chunks[pos]["state"] == req_key
+        ]
+
+    def first(self, value):
+        """
+        Return the first chunk whose ``__id__`` or ``name`` equals the value,
+        or None
+        """
+        if not isinstance(value, str):
+            return None
+        found = [
+            index[value][0]
+            for index in (self._fields["__id__"], self._fields["name"])
+            if value in index
+        ]
+        if not found:
+            return None
+        return self.chunks[min(found)]
+
+
+class HighIndex:
+    """
+    Look up the IDs of high data by SLS, by name and by the arguments of their
+    states, for the requisite_in pass. Each lookup table is built on first
+    use with a single pass over the high data.
+    """
+
+    def __init__(self, high):
+        self.high = high
+        self._sls = None
+        self._names = None
+        self._args = None
+
+    def _states(self):
+        for nid, item in self.high.items():
+            if not isinstance(item, dict):
+                continue
+            for state, run in item.items():
+                if state.startswith("__") or not isinstance(run, list):
+                    continue
+                yield nid, state, run
+
+    def find_sls_ids(self, sls):
+        """
+        Return the (ID, state) tuples of the given sls, like find_sls_ids
+        """
+        if self._sls is None:
+            self._sls = {}
+            for nid, item in self.high.items():
+                try:
+                    sls_tgt = item["__sls__"]
+                except TypeError:
+                    if nid != "__exclude__":
+                        log.error(
+                            "Invalid non-dict item '%s' in high data. Value: %r",
+                            nid,
+                            item,
+                        )
+                    continue
+                ids = self._sls.setdefault(sls_tgt, [])
+                for st_ in item:
+                    if not st_.startswith("__"):
+                        ids.append((nid, st_))
+        return list(self._sls.get(sls, []))
+
+    def find_state(self, name):
+        """
+        Return ``{state: ID}`` for the first state whose ``name`` argument
+        equals the given name, or None
+        """
+        if self._names is None:
+            self._names = {}
+            for nid, state, run in self._states():
+                for arg in run:
+                    if isinstance(arg, dict) and "name" in arg:
+                        try:
+                            self._names.setdefault(arg["name"], {state: nid})
+                        except TypeError:
+                            # Unhashable name
+                            pass
+        try:
+            return self._names.get(name)
+        except TypeError:
+            return None
+
+    def find_name(self, name, state):
+        """
+        Return the (ID, state) tuples referencing the given name, like
+        find_name
+        """
+        if state == "sls" or (name in self.high and state in self.high[name]):
+            return find_name(name, state, self.high)
+        if self._args is None:
+            self._args = {}
+            for nid, state_, run in self._states():
+                for arg in run:
+                    if not isinstance(arg, dict) or len(arg) != 1:
+                        continue
+                    try:
+                        self._args.setdefault(
+                            (state_, arg[next(iter(arg))]), []
+                        ).append((nid, state_))
+                    except TypeError:
+                        # Unhashable argument, it cannot equal a name
+                        pass
+        try:
+            return list(self._args.get((state, name), []))
+        except TypeError:
+            return find_name(name, state, self.high)
+
+
 def format_log(ret):
     """
     Format the state into a log message
@@ -769,6 +962,8 @@ class State:
         self.active = set()
         self.mod_init = set()
         self.pre = {}
+        self.chunk_index = None
+        self.parallel_started = False
         self.__run_num = 0
         self.jid = jid
         self.instance_id = str(id(self))
@@ -1740,6 +1935,7 @@ class State:
         )
         extend = {}
         errors = []
+        index = HighIndex(high)
         disabled_reqs = self.opts.get("disabled_requisites", [])
         if not isinstance(disabled_reqs, list):
             disabled_reqs = [disabled_reqs]
@@ -1819,22 +2015,8 @@ class State:
                                         ]
                                         ind = {_ind_high[0]: ind}
                                     else:
-                                        found = False
-                                        for _id in iter(high):
-                                            for state in [
-                                                state
-                                                for state in iter(high[_id])
-                                                if not state.startswith("__")
-                                            ]:
-                                                for j in iter(high[_id][state]):
-                                                    if (
-                                                        isinstance(j, dict)
-                                                        and "name" in j
-                                                    ):
-                                                        if j["name"] == ind:
-                                                            ind = {state: _id}
-                                                            found = True
-                                        if not found:
+                                        ind = index.find_state(ind)
+                                        if ind is None:
                                             continue
                                 if len(ind) < 1:
                                     continue
@@ -1842,7 +2024,7 @@ class State:
                                 pname = ind[pstate]
                                 if pstate == "sls":
                                     # Expand hinges here
-                                    hinges = find_sls_ids(pname, high)
+                                    hinges = index.find_sls_ids(pname)
                                 else:
                                     hinges.append((pname, pstate))
                                 if "." in pstate:
@@ -1871,7 +2053,7 @@ class State:
                                         )
                                     if key == "prereq":
                                         # Add prerequired to prereqs
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if ext_id not in extend:
                                                 extend[ext_id] = OrderedDict()
@@ -1884,7 +2066,7 @@ class State:
                                     if key == "use_in":
                                         # Add the running states args to the
                                         # use_in states
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1911,7 +2093,7 @@ class State:
                                     if key == "use":
                                         # Add the use state's args to the
                                         # running state
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -2024,6 +2206,7 @@ class State:
             target=self._call_parallel_target, args=(name, cdata, low)
         )
         proc.start()
+        self.parallel_started = True
         ret = {
             "name": name,
             "result": None,
@@ -2474,20 +2657,27 @@ class State:
                         chunks.remove(low)
                         break
         running = {}
-        for low in chunks:
-            if "__FAILHARD__" in running:
-                running.pop("__FAILHARD__")
+        if (
+            self.opts.get("state_concurrency", 1) > 1
+            and multiprocessing.get_start_method() == "fork"
+        ):
+            if not self.call_chunks_concurrent(chunks, running):
                 return running
-            tag = _gen_tag(low)
-            if tag not in running:
-                # Check if this low chunk is paused
-                action = self.check_pause(low)
-                if action == "kill":
-                    break
-                running = self.call_chunk(low, running, chunks)
-                if self.check_failhard(low, running):
+        else:
+            for low in chunks:
+                if "__FAILHARD__" in running:
+                    running.pop("__FAILHARD__")
                     return running
-            self.active = set()
+                tag = _gen_tag(low)
+                if tag not in running:
+                    # Check if this low chunk is paused
+                    action = self.check_pause(low)
+                    if action == "kill":
+                        break
+                    running = self.call_chunk(low, running, chunks)
+                    if self.check_failhard(low, running):
+                        return running
+                self.active = set()
         while True:
             if self.reconcile_procs(running):
                 break
@@ -2495,6 +2685,175 @@ class State:
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _chunk_deps(self, chunks):
+        """
+        Return the tags of the chunks each chunk has to wait for, and the tags
+        of the chunks which have to be called in this process because they
+        take part in a prereq or have a requisite which cannot be resolved
+        """
+        index = self._chunk_index(chunks)
+        deps = {}
+        serial = set()
+        for low in chunks:
+            tag = _gen_tag(low)
+            deps[tag] = set()
+            if "prereq" in low or "prerequired" in low or low.get("__prereq__"):
+                serial.add(tag)
+            for r_state in (
+                "require",
+                "require_any",
+                "watch",
+                "watch_any",
+                "onfail",
+                "onfail_any",
+                "onfail_all",
+                "onchanges",
+                "onchanges_any",
+            ):
+                for req in low.get(r_state) or ():
+                    if isinstance(req, str):
+                        req = {"id": req}
+                    try:
+                        req = trim_req(req)
+                        req_key = next(iter(req))
+                        found = index.find(req_key, req[req_key])
+                    except (AttributeError, StopIteration, TypeError):
+                        found = None
+                    if not found:
+                        serial.add(tag)
+                        continue
+                    deps[tag].update(_gen_tag(chunk) for chunk in found)
+            deps[tag].discard(tag)
+        return deps, serial
+
+    def _call_concurrent_target(self, low, status, reqs, chunks, running, conn):
+        """
+        Call a chunk in a child process and send its return to the parent
+        """
+        try:
+            if status == "change":
+                ret = self._call_watch(low, reqs, chunks, running)
+            else:
+                ret = self.call(low, chunks, running)
+        except Exception:  # pylint: disable=broad-except
+            ret = {
+                "result": False,
+                "name": low.get("name"),
+                "changes": {},
+                "comment": "An exception occurred in this state: {}".format(
+                    traceback.format_exc()
+                ),
+            }
+        conn.send_bytes(msgpack_serialize(ret))
+        conn.close()
+
+    def call_chunks_concurrent(self, chunks, running):
+        """
+        Call the chunks as their requisites are met, with up to
+        ``state_concurrency`` of them running at once in child processes.
+
+        The chunks which take part in a prereq or have requisites which cannot
+        be resolved are called in this process while no child runs. The
+        chunks ordered ``first`` finish before any other chunk starts and the
+        chunks ordered ``last`` start once all other chunks finished. Returns
+        False if the run was stopped by failhard.
+        """
+        workers = self.opts["state_concurrency"]
+        deps, serial = self._chunk_deps(chunks)
+
+        def _phase(low):
+            order = low.get("order")
+            if not isinstance(order, (int, float)):
+                return 1
+            if order < 1:
+                return 0
+            return 2 if order >= 1000000 else 1
+
+        pending = [low for low in chunks if _gen_tag(low) not in running]
+        inflight = {}
+        failhard = killed = False
+        while pending or inflight:
+            if "__FAILHARD__" in running:
+                running.pop("__FAILHARD__")
+                failhard = True
+            if failhard or killed:
+                pending = []
+            called = False
+            if pending:
+                phase = min(
+                    _phase(low)
+                    for low in pending + [item[0] for item in inflight.values()]
+                )
+            for low in list(pending):
+                if len(inflight) >= workers or _phase(low) > phase:
+                    break
+                tag = _gen_tag(low)
+                if tag in running:
+                    pending.remove(low)
+                    continue
+                if not deps[tag].issubset(running):
+                    continue
+                if tag in serial and inflight:
+                    # Let the children finish first
+                    break
+                if self.check_pause(low) == "kill":
+                    killed = True
+                    break
+                pending.remove(low)
+                called = True
+                if tag not in serial:
+                    call_low = self._mod_aggregate(low, running, chunks)
+                    self._mod_init(call_low)
+                    status, reqs = self.check_requisite(call_low, running, chunks)
+                    if status in ("met", "change"):
+                        call_low = call_low.copy()
+                        # The chunk already runs in a process of its own
+                        call_low.pop("parallel", None)
+                        parent, child = multiprocessing.Pipe(duplex=False)
+                        proc = salt.utils.process.Process(
+                            target=self._call_concurrent_target,
+                            args=(call_low, status, reqs, chunks, running, child),
+                        )
+                        proc.start()
+                        child.close()
+                        inflight[parent] = (call_low, tag, proc)
+                        continue
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if self.check_failhard(low, running):
+                    failhard = True
+                    break
+            if not inflight:
+                if pending and not called and not (failhard or killed):
+                    # Nothing can start, most likely a requisite loop which
+                    # call_chunk reports
+                    low = pending.pop(0)
+                    running = self.call_chunk(low, running, chunks)
+                    self.active = set()
+                    if self.check_failhard(low, running):
+                        failhard = True
+                continue
+            for conn in multiprocessing.connection.wait(list(inflight)):
+                low, tag, proc = inflight.pop(conn)
+                try:
+                    ret = msgpack_deserialize(conn.recv_bytes())
+                except (EOFError, OSError):
+                    ret = {
+                        "result": False,
+                        "name": low.get("name"),
+                        "changes": {},
+                        "comment": "Concurrent state process failed to return",
+                    }
+                conn.close()
+                proc.join()
+                ret["__run_num__"] = self.__run_num
+                self.__run_num += 1
+                running[tag] = ret
+                self._finish_chunk(low, tag, running, chunks)
+                if self.check_failhard(low, running):
+                    failhard = True
+        return not failhard
+
     def check_failhard(self, low, running):
         """
         Check if the low data chunk should send a failhard signal
@@ -2592,6 +2951,15 @@ class State:
                     retset.add(False)
         return False not in retset
 
+    def _chunk_index(self, chunks):
+        """
+        Return the requisite index of the chunks, built once per list of
+        chunks
+        """
+        if self.chunk_index is None or not self.chunk_index.current(chunks):
+            self.chunk_index = ChunkIndex(chunks)
+        return self.chunk_index
+
     def check_requisite(self, low, running, chunks, pre=False):
         """
         Look into the running data to check the status of all requisite
@@ -2638,7 +3006,9 @@ class State:
             present = True
         if not present:
             return "met", ()
-        self.reconcile_procs(running)
+        if self.parallel_started:
+            # Only parallel states leave processes in the running data
+            self.reconcile_procs(running)
         reqs = {
             "require": [],
             "require_any": [],
@@ -2653,6 +3023,7 @@ class State:
         }
         if pre:
             reqs["prerequired"] = []
+        index = self._chunk_index(chunks)
         for r_state in reqs:
             if r_state in low and low[r_state] is not None:
                 if r_state in disabled_reqs:
@@ -2664,45 +3035,20 @@ class State:
                     if isinstance(req, str):
                         req = {"id": req}
                     req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == "sls":
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk["__sls__"], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, str):
-                                if fnmatch.fnmatch(
-                                    chunk["name"], req_val
-                                ) or fnmatch.fnmatch(chunk["__id__"], req_val):
-                                    if req_key == "id" or chunk["state"] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                "Could not locate requisite of [{}] present in state with name [{}]".format(
-                                    req_key, chunk["name"]
-                                )
-                            )
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                "Could not locate requisite of [{}] present in state with name [{}]".format(
-                                    req_key, chunk["name"]
-                                )
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None or not chunks:
+                        return "unmet", ()
+                    if req_key != "sls" and not isinstance(req_val, str):
+                        raise SaltRenderError(
+                            "Could not locate requisite of [{}] present in state with name [{}]".format(
+                                req_key, chunks[0]["name"]
                             )
+                        )
+                    found = index.find(req_key, req_val)
                     if not found:
                         return "unmet", ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in reqs.items():
             req_stats = set()
@@ -2882,27 +3228,16 @@ class State:
                     found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == "sls":
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk["__sls__"], req_val):
-                                if requisite == "prereq":
-                                    chunk["__prereq__"] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if fnmatch.fnmatch(chunk["name"], req_val) or fnmatch.fnmatch(
-                            chunk["__id__"], req_val
-                        ):
-                            if req_key == "id" or chunk["state"] == req_key:
-                                if requisite == "prereq":
-                                    chunk["__prereq__"] = True
-                                elif requisite == "prerequired":
-                                    chunk["__prerequired__"] = True
-                                reqs.append(chunk)
-                                found = True
+                    if req_val is None:
+                        lost[requisite].append(req)
+                        continue
+                    for chunk in self._chunk_index(chunks).find(req_key, req_val):
+                        if requisite == "prereq":
+                            chunk["__prereq__"] = True
+                        elif requisite == "prerequired" and req_key != "sls":
+                            chunk["__prerequired__"] = True
+                        reqs.append(chunk)
+                        found = True
                     if not found:
                         lost[requisite].append(req)
             if (
@@ -3036,14 +3371,7 @@ class State:
                 self.pre[tag] = running[tag]
             self.__run_num += 1
         elif status == "change" and not low.get("__prereq__"):
-            ret = self.call(low, chunks, running)
-            if not ret["changes"] and not ret.get("skip_watch", False):
-                low = low.copy()
-                low["sfun"] = low["fun"]
-                low["fun"] = "mod_watch"
-                low["__reqs__"] = reqs
-                ret = self.call(low, chunks, running)
-            running[tag] = ret
+            running[tag] = self._call_watch(low, reqs, chunks, running)
         elif status == "pre":
             start_time, duration = _calculate_fake_duration()
             pre_ret = {
@@ -3090,26 +3418,47 @@ class State:
             else:
                 running[tag] = self.call(low, chunks, running)
         if tag in running:
-            self.event(running[tag], len(chunks), fire_event=low.get("fire_event"))
-
-            for sub_state_data in running[tag].pop("sub_state_run", ()):
-                start_time, duration = _calculate_fake_duration()
-                self.__run_num += 1
-                sub_tag = _gen_tag(sub_state_data["low"])
-                running[sub_tag] = {
-                    "name": sub_state_data["low"]["name"],
-                    "changes": sub_state_data["changes"],
-                    "result": sub_state_data["result"],
-                    "duration": sub_state_data.get("duration", duration),
-                    "start_time": sub_state_data.get("start_time", start_time),
-                    "comment": sub_state_data.get("comment", ""),
-                    "__state_ran__": True,
-                    "__run_num__": self.__run_num,
-                    "__sls__": low["__sls__"],
-                }
+            self._finish_chunk(low, tag, running, chunks)
 
         return running
 
+    def _call_watch(self, low, reqs, chunks, running):
+        """
+        Call a chunk whose watched requisites changed, and call its mod_watch
+        function if the call itself made no changes
+        """
+        ret = self.call(low, chunks, running)
+        if not ret["changes"] and not ret.get("skip_watch", False):
+            low = low.copy()
+            low["sfun"] = low["fun"]
+            low["fun"] = "mod_watch"
+            low["__reqs__"] = reqs
+            ret = self.call(low, chunks, running)
+        return ret
+
+    def _finish_chunk(self, low, tag, running, chunks):
+        """
+        Fire the event of a chunk which ran and add its sub state runs to the
+        running data
+        """
+        self.event(running[tag], len(chunks), fire_event=low.get("fire_event"))
+
+        for sub_state_data in running[tag].pop("sub_state_run", ()):
+            start_time, duration = _calculate_fake_duration()
+            self.__run_num += 1
+            sub_tag = _gen_tag(sub_state_data["low"])
+            running[sub_tag] = {
+                "name": sub_state_data["low"]["name"],
+                "changes": sub_state_data["changes"],
+                "result": sub_state_data["result"],
+                "duration": sub_state_data.get("duration", duration),
+                "start_time": sub_state_data.get("start_time", start_time),
+                "comment": sub_state_data.get("comment", ""),
+                "__state_ran__": True,
+                "__run_num__": self.__run_num,
+                "__sls__": low["__sls__"],
+            }
+
     def call_beacons(self, chunks, running):
         """
         Find all of the beacon routines and call the associated mod_beacon runs
@@ -3155,25 +3504,31 @@ class State:
                         listeners.append(
                             {(key, val, "lookup"): [{chunk["state"]: chunk["__id__"]}]}
                         )
+        # Map (state, state, ID or name) to the crefs it references
+        cref_index = {}
+        for cref in crefs:
+            for ref in set(cref):
+                cref_index.setdefault((cref[0], ref), []).append(cref)
 
+        def _refs(state, ref):
+            try:
+                return cref_index.get((state, ref), [])
+            except TypeError:
+                return []
+
+        index = self._chunk_index(chunks)
         mod_watchers = []
         errors = {}
         for l_dict in listeners:
             for key, val in l_dict.items():
                 for listen_to in val:
                     if not isinstance(listen_to, dict):
-                        found = False
-                        for chunk in chunks:
-                            if (
-                                chunk["__id__"] == listen_to
-                                or chunk["name"] == listen_to
-                            ):
-                                listen_to = {chunk["state"]: chunk["__id__"]}
-                                found = True
-                        if not found:
+                        chunk = index.first(listen_to)
+                        if chunk is None:
                             continue
+                        listen_to = {chunk["state"]: chunk["__id__"]}
                     for lkey, lval in listen_to.items():
-                        if not any(lkey == cref[0] and lval in cref for cref in crefs):
+                        if not _refs(lkey, lval):
                             rerror = {
                                 _l_tag(lkey, lval): {
                                     "comment": "Referenced state {}: {} does not exist".format(
@@ -3186,19 +3541,12 @@ class State:
                             }
                             errors.update(rerror)
                             continue
-                        to_tags = [
-                            _gen_tag(data)
-                            for cref, data in crefs.items()
-                            if lkey == cref[0] and lval in cref
-                        ]
+                        to_tags = [_gen_tag(crefs[cref]) for cref in _refs(lkey, lval)]
                         for to_tag in to_tags:
                             if to_tag not in running:
                                 continue
                             if running[to_tag]["changes"]:
-                                if not any(
-                                    key[0] == cref[0] and key[1] in cref
-                                    for cref in crefs
-                                ):
+                                if not _refs(key[0], key[1]):
                                     rerror = {
                                         _l_tag(key[0], key[1]): {
                                             "comment": "Referenced state {}: {} does not exist".format(
@@ -3215,9 +3563,7 @@ class State:
                                     continue
 
                                 new_chunks = [
-                                    data
-                                    for cref, data in crefs.items()
-                                    if key[0] == cref[0] and key[1] in cref
+                                    crefs[cref] for cref in _refs(key[0], key[1])
                                 ]
                                 for chunk in new_chunks:
                                     low = chunk.copy()
@@ -4302,6 +4302,10 @@ def recurse(
         merge_ret(os.path.join(name, srelpath), _ret)
     for dirname in mng_dirs:
         manage_directory(dirname)
+    if mng_files:
+        # Cache all of the sources in one batch, so that managed() finds them
+        # in the minion cache instead of fetching them one by one
+        __salt__["cp.cache_files"]([src for _, src in mng_files], senv)
     for dest, src in mng_files:
         manage_file(dest, src, replace)
 
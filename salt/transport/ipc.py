@@ -3,8 +3,11 @@ IPC transport classes
 """
 
 
+import collections
 import errno
+import fnmatch
 import logging
+import os
 import socket
 import time
 
@@ -511,6 +514,22 @@ class IPCMessagePublisher:
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        # The tags each subscriber asked for, streams without an entry
+        # receive every message
+        self.tag_filters = {}
+        # The sequence number of the first message sent to each subscriber,
+        # the older ones are all it can ask to be replayed
+        self.first_seqs = {}
+        # The recently published messages, kept to be sent again to the
+        # subscribers which ask for them
+        self.journal_size = opts.get("event_journal_size", 0)
+        self.journal_ttl = opts.get("event_journal_ttl", 60)
+        self.journal = collections.deque()
+        self.journal_bytes = 0
+        self.seq = 0
+        # Tells the sequence numbers of this publisher from those of a
+        # previous one on the same socket
+        self.epoch = os.urandom(8).hex()
 
     def start(self):
         """
@@ -542,22 +561,125 @@ class IPCMessagePublisher:
             yield stream.write(pack)
         except StreamClosedError:
             log.trace("Client disconnected from IPC %s", self.socket_path)
-            self.streams.discard(stream)
+            self._discard(stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error("Exception occurred while handling stream: %s", exc)
             if not stream.closed():
                 stream.close()
-            self.streams.discard(stream)
+            self._discard(stream)
 
-    def publish(self, msg):
+    def _discard(self, stream):
+        self.streams.discard(stream)
+        self.tag_filters.pop(stream, None)
+        self.first_seqs.pop(stream, None)
+
+    def _read_requests(self, stream):
         """
-        Send message to all connected sockets
+        Read the tag filters and replay requests a subscriber sends over its
+        connection
+        """
+        if salt.utils.msgpack.version >= (0, 5, 2):
+            unpacker = salt.utils.msgpack.Unpacker(raw=False)
+        else:
+            unpacker = salt.utils.msgpack.Unpacker(encoding="utf-8")
+
+        def handle_bytes(wire_bytes):
+            unpacker.feed(wire_bytes)
+            for framed_msg in unpacker:
+                body = framed_msg.get("body")
+                if not isinstance(body, dict):
+                    continue
+                if "tags" in body:
+                    tags = body["tags"]
+                    if tags is None:
+                        self.tag_filters.pop(stream, None)
+                    else:
+                        self.tag_filters[stream] = (
+                            tuple(tags.get("startswith") or ()),
+                            list(tags.get("fnmatch") or ()),
+                        )
+                if isinstance(body.get("replay"), dict):
+                    self._replay(stream, body["replay"])
+            read_next()
+
+        def read_next():
+            try:
+                stream.read_bytes(4096, callback=handle_bytes, partial=True)
+            except StreamClosedError:
+                self._discard(stream)
+
+        read_next()
+
+    @staticmethod
+    def _tag_matches(tag, tag_filter):
+        prefixes, globs = tag_filter
+        if tag.startswith(prefixes):
+            return True
+        return any(fnmatch.fnmatch(tag, glob) for glob in globs)
+
+    def _trim_journal(self):
+        expire = time.time() - self.journal_ttl
+        while self.journal and (
+            self.journal_bytes > self.journal_size or self.journal[0][1] < expire
+        ):
+            _, _, _, pack = self.journal.popleft()
+            self.journal_bytes -= len(pack)
+
+    def _replay(self, stream, request):
+        """
+        Send a subscriber the journaled messages it asked for again.
+
+        The request either holds the ``epoch`` and ``seq`` of the last message
+        the subscriber got, or a ``time`` to send the messages published since.
+        A subscriber which last got messages from an earlier publisher gets all
+        of the journal. The messages which were already sent to this
+        subscriber as they were published are not sent again, so the replayed
+        messages can arrive after newer ones.
+        """
+        self._trim_journal()
+        if request.get("epoch") == self.epoch and request.get("seq") is not None:
+            since_seq, since_time = request["seq"], None
+        elif request.get("time") is not None:
+            since_seq, since_time = None, request["time"]
+        else:
+            since_seq, since_time = 0, None
+        tag_filter = self.tag_filters.get(stream)
+        first_seq = self.first_seqs.get(stream, self.seq + 1)
+        for seq, stamp, tag, pack in self.journal:
+            if seq >= first_seq:
+                break
+            if since_seq is not None and seq <= since_seq:
+                continue
+            if since_time is not None and stamp < since_time:
+                continue
+            if tag is not None and tag_filter is not None:
+                if not self._tag_matches(tag, tag_filter):
+                    continue
+            self.io_loop.spawn_callback(self._write, stream, pack)
+
+    def publish(self, msg, tag=None):
         """
-        if not self.streams:
+        Send message to all connected sockets
+
+        When the tag of the message is passed, subscribers which registered tag
+        filters only get the message if the tag matches one of them.
+        """
+        if self.journal_size > 0:
+            self.seq += 1
+            header = {"seq": self.seq, "epoch": self.epoch}
+            pack = salt.transport.frame.frame_msg_ipc(msg, header=header, raw_body=True)
+            self.journal.append((self.seq, time.time(), tag, pack))
+            self.journal_bytes += len(pack)
+            self._trim_journal()
+        elif not self.streams:
             return
+        else:
+            pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
 
-        pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
         for stream in self.streams:
+            if tag is not None and stream in self.tag_filters:
+                if not self._tag_matches(tag, self.tag_filters[stream]):
+                    continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
     def handle_connection(self, connection, address):
@@ -573,11 +695,13 @@ class IPCMessagePublisher:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 stream = IOStream(connection, **kwargs)
             self.streams.add(stream)
+            self.first_seqs[stream] = self.seq + 1
 
             def discard_after_closed():
-                self.streams.discard(stream)
+                self._discard(stream)
 
             stream.set_close_callback(discard_after_closed)
+            self._read_requests(stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error("IPC streaming error: %s", exc)
 
@@ -593,6 +717,9 @@ class IPCMessagePublisher:
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.tag_filters.clear()
+        self.first_seqs.clear()
+        self.journal.clear()
         if hasattr(self.sock, "close"):
             self.sock.close()
 
@@ -645,11 +772,78 @@ class IPCMessageSubscriber(IPCClient):
         "close",
     ]
 
-    def __init__(self, socket_path, io_loop=None):
+    def __init__(self, socket_path, io_loop=None, tags=None, replay=None):
+        """
+        :param dict tags: Only receive the messages whose tags start with one
+                          of the strings in ``tags["startswith"]`` or match
+                          one of the globs in ``tags["fnmatch"]``. This is
+                          sent to the publisher, which then skips the other
+                          messages instead of forwarding them.
+        :param dict replay: Ask the publisher to send the messages it still
+                            has in its journal, either the ones after the
+                            ``seq`` of the ``epoch`` or the ones published
+                            since the ``time``, once connected.
+        """
         super().__init__(socket_path, io_loop=io_loop)
         self._read_stream_future = None
         self._saved_data = []
         self._read_in_progress = Lock()
+        self.tags = tags
+        self.replay_from = replay
+        # The sequence number of the last journaled message received
+        self.epoch = None
+        self.last_seq = None
+
+    @salt.ext.tornado.gen.coroutine
+    def _connect(self, timeout=None):
+        yield super()._connect(timeout=timeout)
+        if not self.connected():
+            return
+        if self.tags is not None:
+            yield self._send({"tags": self.tags})
+        if self.last_seq is not None:
+            # Get what was published while reconnecting
+            yield self._send({"replay": {"epoch": self.epoch, "seq": self.last_seq}})
+        elif self.replay_from is not None:
+            yield self._send({"replay": self.replay_from})
+
+    @salt.ext.tornado.gen.coroutine
+    def _send(self, request):
+        pack = salt.transport.frame.frame_msg_ipc(request, raw_body=True)
+        try:
+            yield self.stream.write(pack)
+        except StreamClosedError:
+            log.trace("Subscriber disconnected from IPC %s", self.socket_path)
+
+    def set_tags(self, tags):
+        """
+        Change the tags this subscriber receives, ``None`` receives everything
+        """
+        self.tags = tags
+        if self.connected():
+            self.io_loop.spawn_callback(self._send, {"tags": tags})
+
+    def replay(self, since):
+        """
+        Ask the publisher to send again the messages published since the
+        ``since`` timestamp which it still has in its journal
+        """
+        self.replay_from = {"time": since}
+        if self.connected():
+            self.io_loop.spawn_callback(self._send, {"replay": self.replay_from})
+
+    def _journaled(self, framed_msg):
+        """
+        Record the sequence number of a message
+        """
+        head = framed_msg.get("head")
+        if not head or head.get("seq") is None:
+            return
+        if head.get("epoch") != self.epoch or self.last_seq is None:
+            self.epoch = head.get("epoch")
+            self.last_seq = head["seq"]
+        else:
+            self.last_seq = max(self.last_seq, head["seq"])
 
     @salt.ext.tornado.gen.coroutine
     def _read(self, timeout, callback=None):
@@ -683,6 +877,7 @@ class IPCMessageSubscriber(IPCClient):
                 self.unpacker.feed(wire_bytes)
                 first_sync_msg = True
                 for framed_msg in self.unpacker:
+                    self._journaled(framed_msg)
                     if callback:
                         self.io_loop.spawn_callback(callback, framed_msg["body"])
                     elif first_sync_msg:
@@ -461,6 +461,11 @@ class AESReqServerMixin:
             "pub_key": self.master_key.get_pub_str(),
             "publish_port": self.opts["publish_port"],
         }
+        worker_pool = getattr(self, "worker_pool", None)
+        if worker_pool is not None and worker_pool.priority_workers:
+            # Let the minion send the commands served by the priority MWorkers
+            # in a routing frame
+            ret["route_cmds"] = sorted(worker_pool.priority_cmds)
 
         # sign the master's pubkey (if enabled) before it is
         # sent to the minion that was just authenticated
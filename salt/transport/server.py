@@ -95,8 +95,32 @@ class PubServerChannel:
         do the actual publishing
         """
 
-    def publish(self, load):
+    # The timings of the last publish, by step
+    publish_stats = None
+
+    def publish(self, load, minions=None):
         """
-        Publish "load" to minions
+        Publish "load" to minions, ``minions`` are the minions the master
+        already matched for the load
         """
         raise NotImplementedError()
+
+    # The crypticle of the current AES key, shared by all the channels of
+    # the process since the master creates a channel for every publish
+    _crypticles = {}
+
+    def _get_crypticle(self):
+        """
+        Return the crypticle for the current AES key, it is only created again
+        once the key was rotated
+        """
+        import salt.crypt
+        import salt.master
+
+        key = salt.master.SMaster.secrets["aes"]["secret"].value
+        crypticle = PubServerChannel._crypticles.get(key)
+        if crypticle is None:
+            crypticle = salt.crypt.Crypticle(self.opts, key)
+            PubServerChannel._crypticles.clear()
+            PubServerChannel._crypticles[key] = crypticle
+        return crypticle
@@ -1723,16 +1723,17 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         """
         process_manager.add_process(self._publish_daemon, kwargs=kwargs)
 
-    def publish(self, load):
+    def publish(self, load, minions=None):
         """
         Publish "load" to minions
+
+        :param dict load: A load to be sent across the wire to minions
+        :param list minions: The minions the master already matched for the
+            load, they are used instead of matching the target again
         """
         payload = {"enc": "aes"}
 
-        crypticle = salt.crypt.Crypticle(
-            self.opts, salt.master.SMaster.secrets["aes"]["secret"].value
-        )
-        payload["load"] = crypticle.dumps(load)
+        payload["load"] = self._get_crypticle().dumps(load)
         if self.opts["sign_pub_messages"]:
             master_pem_path = os.path.join(self.opts["pki_dir"], "master.pem")
             log.debug("Signing data packet")
@@ -1754,11 +1755,13 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         # add some targeting stuff for lists only (for now)
         if load["tgt_type"] == "list" and not self.opts.get("order_masters", False):
             if isinstance(load["tgt"], str):
-                # Fetch a list of minions that match
-                _res = self.ckminions.check_minions(
-                    load["tgt"], tgt_type=load["tgt_type"]
-                )
-                match_ids = _res["minions"]
+                if minions is None:
+                    # Fetch a list of minions that match
+                    _res = self.ckminions.check_minions(
+                        load["tgt"], tgt_type=load["tgt_type"]
+                    )
+                    minions = _res["minions"]
+                match_ids = minions
 
                 log.debug("Publish Side Match: %s", match_ids)
                 # Send list of miions thru so zmq can target them
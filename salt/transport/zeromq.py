@@ -1,14 +1,18 @@
 """
 Zeromq transport classes
 """
+import collections
 import copy
 import errno
+import functools
 import hashlib
 import logging
+import multiprocessing
 import os
 import signal
 import sys
 import threading
+import time
 import weakref
 from random import randint
 
@@ -339,6 +343,20 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             "load": load,
         }
 
+    def _route(self, load):
+        """
+        Return the routing frame of a request, the command of the load when
+        the master advertised that its priority MWorkers serve it
+        """
+        if not isinstance(load, dict):
+            return None
+        creds = salt.crypt.AsyncAuth.creds_map.get(
+            (self.opts.get("pki_dir"), self.opts.get("id"), self.master_uri)
+        )
+        if creds and load.get("cmd") in creds.get("route_cmds", ()):
+            return salt.utils.stringutils.to_bytes(load["cmd"])
+        return None
+
     @salt.ext.tornado.gen.coroutine
     def crypted_transfer_decode_dictentry(
         self, load, dictkey=None, tries=3, timeout=60
@@ -351,6 +369,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             self._package_load(self.auth.crypticle.dumps(load)),
             timeout=timeout,
             tries=tries,
+            route=self._route(load),
         )
         key = self.auth.get_keys()
         if "key" not in ret:
@@ -360,6 +379,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
                 self._package_load(self.auth.crypticle.dumps(load)),
                 timeout=timeout,
                 tries=tries,
+                route=self._route(load),
             )
         if HAS_M2:
             aes = key.private_decrypt(ret["key"], RSA.pkcs1_oaep_padding)
@@ -394,6 +414,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
                 self._package_load(self.auth.crypticle.dumps(load)),
                 timeout=timeout,
                 tries=tries,
+                route=self._route(load),
             )
             # we may not have always data
             # as for example for saltcall ret submission, this is a blind
@@ -427,7 +448,10 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         :param int timeout: The number of seconds on a response before failing
         """
         ret = yield self.message_client.send(
-            self._package_load(load), timeout=timeout, tries=tries,
+            self._package_load(load),
+            timeout=timeout,
+            tries=tries,
+            route=self._route(load),
         )
 
         raise salt.ext.tornado.gen.Return(ret)
@@ -676,6 +700,10 @@ class ZeroMQReqServerChannel(
         self._closing = False
         self._monitor = None
         self._w_monitor = None
+        # The salt.master.MWorkerPool of an adaptive worker pool
+        self.worker_pool = None
+        # The slot of the MWorker in the adaptive worker pool
+        self.worker_slot = None
 
     def zmq_device(self):
         """
@@ -712,6 +740,9 @@ class ZeroMQReqServerChannel(
 
         log.info("Setting up the master communication server")
         self.clients.bind(self.uri)
+        if self.worker_pool is not None:
+            self._route_requests()
+            return
         self.workers.bind(self.w_uri)
 
         while True:
@@ -726,6 +757,75 @@ class ZeroMQReqServerChannel(
             except (KeyboardInterrupt, SystemExit):
                 break
 
+    def _pool_worker_uri(self, slot):
+        """
+        Return the URI of the worker in ``slot`` of the adaptive worker pool
+        """
+        if self.opts.get("ipc_mode", "") == "tcp":
+            return "tcp://127.0.0.1:{}".format(
+                self.opts.get("tcp_master_workers", 4515) + 1 + slot
+            )
+        return "ipc://{}".format(
+            os.path.join(self.opts["sock_dir"], "workers-{}.ipc".format(slot))
+        )
+
+    def _route_requests(self):
+        """
+        Route the requests of the clients to the idle workers of the adaptive
+        worker pool and keep the others queued in their lane
+        """
+        pool = self.worker_pool
+        # Every worker connects to its own socket, so the device knows which
+        # workers are busy
+        self.pool_workers = []
+        slots = {}
+        poller = zmq.Poller()
+        poller.register(self.clients, zmq.POLLIN)
+        for slot in range(len(pool.states)):
+            sock = self.context.socket(zmq.DEALER)
+            sock.bind(self._pool_worker_uri(slot))
+            poller.register(sock, zmq.POLLIN)
+            self.pool_workers.append(sock)
+            slots[sock] = slot
+        queues = {pool.GENERAL: collections.deque(), pool.PRIORITY: collections.deque()}
+        while not self._closing:
+            if self.clients.closed:
+                break
+            try:
+                # Check for started workers soon when requests are waiting
+                timeout = 100 if any(queues.values()) else 1000
+                events = dict(poller.poll(timeout))
+            except zmq.ZMQError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                raise
+            except (KeyboardInterrupt, SystemExit):
+                break
+            now = time.time()
+            for sock in events:
+                if sock is self.clients:
+                    continue
+                slot = slots[sock]
+                self.clients.send_multipart(sock.recv_multipart())
+                pool.busy[slot] = 0
+                pool.idle[slot] = now
+            if self.clients in events:
+                while True:
+                    try:
+                        frames = self.clients.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    queues[pool.lane(frames)].append(frames)
+            for lane in (pool.PRIORITY, pool.GENERAL):
+                queue = queues[lane]
+                while queue:
+                    slot = pool.idle_slot(lane)
+                    if slot is None:
+                        break
+                    self.pool_workers[slot].send_multipart(queue.popleft())
+                    pool.busy[slot] = now
+                pool.backlog[lane] = len(queue)
+
     def close(self):
         """
         Cleanly shutdown the router socket
@@ -744,6 +844,8 @@ class ZeroMQReqServerChannel(
             self.clients.close()
         if hasattr(self, "workers") and self.workers.closed is False:
             self.workers.close()
+        for sock in getattr(self, "pool_workers", ()):
+            sock.close()
         if hasattr(self, "stream"):
             self.stream.close()
         if hasattr(self, "_socket") and self._socket.closed is False:
@@ -800,6 +902,11 @@ class ZeroMQReqServerChannel(
             self.w_uri = "ipc://{}".format(
                 os.path.join(self.opts["sock_dir"], "workers.ipc")
             )
+        if self.worker_pool is not None:
+            self.worker_slot = self.worker_pool.worker_started(
+                multiprocessing.current_process().name
+            )
+            self.w_uri = self._pool_worker_uri(self.worker_slot)
         log.info("Worker binding to socket %s", self.w_uri)
         self._socket.connect(self.w_uri)
 
@@ -823,7 +930,8 @@ class ZeroMQReqServerChannel(
         :param dict payload: A payload to process
         """
         try:
-            payload = self.serial.loads(payload[0])
+            # The payload may come after a routing frame
+            payload = self.serial.loads(payload[-1])
             payload = self._decode_payload(payload)
         except Exception as exc:  # pylint: disable=broad-except
             exc_type = type(exc).__name__
@@ -862,6 +970,20 @@ class ZeroMQReqServerChannel(
             )
             raise salt.ext.tornado.gen.Return()
 
+        if (
+            self.worker_pool is not None
+            and self.worker_slot < self.worker_pool.priority_workers
+            and payload["load"].get("cmd") not in self.worker_pool.priority_cmds
+        ):
+            # The routing frame is not encrypted, do not let it take over the
+            # priority workers
+            log.error(
+                "Payload routed to a priority MWorker for a %s command",
+                payload["load"].get("cmd"),
+            )
+            stream.send(self.serial.dumps("bad load: cmd does not match its route"))
+            raise salt.ext.tornado.gen.Return()
+
         # intercept the "_auth" commands, since the main daemon shouldn't know
         # anything about our key auth
         if payload["enc"] == "clear" and payload.get("load", {}).get("cmd") == "_auth":
@@ -936,6 +1058,17 @@ def _set_tcp_keepalive(zmq_socket, opts):
             zmq_socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, opts["tcp_keepalive_intvl"])
 
 
+@functools.lru_cache(maxsize=65536)
+def _topic_hash(topic):
+    """
+    Return the zmq topic of a minion id, zmq filters are substring matches so
+    the id is hashed to avoid collisions
+    """
+    return salt.utils.stringutils.to_bytes(
+        hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+    )
+
+
 class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
     """
     Encapsulate synchronous operations for a publisher channel
@@ -1011,6 +1144,12 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         with salt.utils.files.set_umask(0o177):
             pull_sock.bind(pull_uri)
 
+        event = None
+        if self.opts.get("publish_stats"):
+            event = salt.utils.event.get_master_event(
+                self.opts, self.opts["sock_dir"], listen=False
+            )
+
         try:
             while True:
                 # Catch and handle EINTR from when this process is sent
@@ -1026,29 +1165,27 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
                     )
                     payload = unpacked_package["payload"]
                     log.trace("Accepted unpacked package from puller")
+                    start = time.time()
                     if self.opts["zmq_filtering"]:
                         # if you have a specific topic list, use that
                         if "topic_lst" in unpacked_package:
+                            log.trace(
+                                "Sending filtered data over publisher %s to %d topics",
+                                pub_uri,
+                                len(unpacked_package["topic_lst"]),
+                            )
+                            # The payload is shared by the messages of every topic
+                            frame = zmq.Frame(payload, copy=False)
                             for topic in unpacked_package["topic_lst"]:
-                                log.trace(
-                                    "Sending filtered data over publisher %s", pub_uri
-                                )
-                                # zmq filters are substring match, hash the topic
-                                # to avoid collisions
-                                htopic = salt.utils.stringutils.to_bytes(
-                                    hashlib.sha1(
-                                        salt.utils.stringutils.to_bytes(topic)
-                                    ).hexdigest()
-                                )
-                                pub_sock.send(htopic, flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace("Filtered data has been sent")
+                                pub_sock.send(_topic_hash(topic), flags=zmq.SNDMORE)
+                                pub_sock.send(frame, copy=False)
+                            log.trace("Filtered data has been sent")
 
                             # Syndic broadcast
                             if self.opts.get("order_masters"):
                                 log.trace("Sending filtered data to syndic")
                                 pub_sock.send(b"syndic", flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
+                                pub_sock.send(frame, copy=False)
                                 log.trace("Filtered data has been sent to syndic")
                         # otherwise its a broadcast
                         else:
@@ -1065,6 +1202,18 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
                         )
                         pub_sock.send(payload)
                         log.trace("Unfiltered data has been sent")
+                    if event is not None and unpacked_package.get("jid"):
+                        event.fire_event(
+                            {
+                                "jid": unpacked_package["jid"],
+                                "size": len(payload),
+                                "topics": len(unpacked_package.get("topic_lst", ())),
+                                "fanout": time.time() - start,
+                            },
+                            salt.utils.event.tagify(
+                                ["fanout", unpacked_package["jid"]], "stats"
+                            ),
+                        )
                 except zmq.ZMQError as exc:
                     if exc.errno == errno.EINTR:
                         continue
@@ -1072,6 +1221,8 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
 
         except KeyboardInterrupt:
             log.trace("Publish daemon caught Keyboard interupt, tearing down")
+        if event is not None:
+            event.destroy()
         # Cleanly close the sockets if we're shutting down
         if pub_sock.closed is False:
             pub_sock.close()
@@ -1134,23 +1285,27 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             self._sock_data.sock.close()
             delattr(self._sock_data, "sock")
 
-    def publish(self, load):
+    def publish(self, load, minions=None):
         """
         Publish "load" to minions. This send the load to the publisher daemon
         process with does the actual sending to minions.
 
         :param dict load: A load to be sent across the wire to minions
+        :param list minions: The minions the master already matched for the
+            load, they are used instead of matching the target again
         """
+        stats = self.publish_stats = {}
+        start = time.time()
         payload = {"enc": "aes"}
-        crypticle = salt.crypt.Crypticle(
-            self.opts, salt.master.SMaster.secrets["aes"]["secret"].value
-        )
-        payload["load"] = crypticle.dumps(load)
+        payload["load"] = self._get_crypticle().dumps(load)
         if self.opts["sign_pub_messages"]:
             master_pem_path = os.path.join(self.opts["pki_dir"], "master.pem")
             log.debug("Signing data packet")
             payload["sig"] = salt.crypt.sign_message(master_pem_path, payload["load"])
+        stats["encrypt"] = time.time() - start
+        start = time.time()
         int_payload = {"payload": self.serial.dumps(payload)}
+        stats["serialize"] = time.time() - start
 
         # add some targeting stuff for lists only (for now)
         if load["tgt_type"] == "list":
@@ -1159,14 +1314,24 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         # If zmq_filtering is enabled, target matching has to happen master side
         match_targets = ["pcre", "glob", "list"]
         if self.opts["zmq_filtering"] and load["tgt_type"] in match_targets:
-            # Fetch a list of minions that match
-            _res = self.ckminions.check_minions(load["tgt"], tgt_type=load["tgt_type"])
-            match_ids = _res["minions"]
+            if minions is None:
+                # Fetch a list of minions that match
+                start = time.time()
+                _res = self.ckminions.check_minions(
+                    load["tgt"], tgt_type=load["tgt_type"]
+                )
+                minions = _res["minions"]
+                stats["match"] = time.time() - start
 
-            log.debug("Publish Side Match: %s", match_ids)
+            log.debug("Publish Side Match: %s", minions)
             # Send list of miions thru so zmq can target them
-            int_payload["topic_lst"] = match_ids
+            int_payload["topic_lst"] = minions
+        if self.opts.get("publish_stats"):
+            # Let the publish daemon report the fan-out of the job
+            int_payload["jid"] = load.get("jid")
+        start = time.time()
         payload = self.serial.dumps(int_payload)
+        stats["serialize"] += time.time() - start
         log.debug(
             "Sending payload to publish daemon. jid=%s size=%d",
             load.get("jid", None),
@@ -1325,7 +1490,11 @@ class AsyncReqMessageClient:
                     future.set_result(data)
 
             self.stream.on_recv(mark_future)
-            self.stream.send(message)
+            if isinstance(message, tuple):
+                # The message has a routing frame
+                self.stream.send_multipart(message)
+            else:
+                self.stream.send(message)
 
             try:
                 ret = yield future
@@ -1373,10 +1542,18 @@ class AsyncReqMessageClient:
                 future.set_exception(SaltReqTimeoutError("Message timed out"))
 
     def send(
-        self, message, timeout=None, tries=3, future=None, callback=None, raw=False
+        self,
+        message,
+        timeout=None,
+        tries=3,
+        future=None,
+        callback=None,
+        raw=False,
+        route=None,
     ):
         """
-        Return a future which will be completed when the message has a response
+        Return a future which will be completed when the message has a response,
+        ``route`` is sent in a frame before the message
         """
         if future is None:
             future = salt.ext.tornado.concurrent.Future()
@@ -1385,6 +1562,8 @@ class AsyncReqMessageClient:
             future.timeout = timeout
             # if a future wasn't passed in, we need to serialize the message
             message = self.serial.dumps(message)
+            if route is not None:
+                message = (route, message)
         if callback is not None:
 
             def handle_future(future):
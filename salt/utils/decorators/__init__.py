@@ -856,6 +856,37 @@ def ignores_kwargs(*kwarg_names):
     return _ignores_kwargs
 
 
+def cached_virtual(grains=(), opts=()):
+    """
+    Decorator for a module's ``__virtual__`` function, which declares that its
+    result only depends on the module's code and the named grains and opts.
+
+    When the :conf_minion:`loader_virtual_cache` option is enabled, a module
+    which was found to be unavailable is not imported again by later
+    processes, until the module or any of the named grains and opts changes.
+    The ``__virtual__`` function must not check anything else, such as the
+    presence of a binary, which could change independently.
+
+    grains:
+        List of the names of the grains the function reads
+
+    opts:
+        List of the names of the opts the function reads
+
+    Example:
+
+        @cached_virtual(grains=['os_family'])
+        def __virtual__():
+
+    """
+
+    def wrapper(function):
+        function.__virtual_inputs__ = {"grains": list(grains), "opts": list(opts)}
+        return function
+
+    return wrapper
+
+
 def ensure_unicode_args(function):
     """
     Decodes all arguments passed to the wrapped function
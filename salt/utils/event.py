@@ -83,6 +83,7 @@ log = logging.getLogger(__name__)
 SUB_EVENT = ("state.highstate", "state.sls")
 
 TAGEND = "\n\n"  # long tag delimiter
+_TAGEND_BYTES = TAGEND.encode()
 TAGPARTER = "/"  # name spaced tag delimiter
 SALT = "salt"  # base prefix for all salt/ events
 # dict map of namespaced base tag prefixes for salt events
@@ -153,6 +154,18 @@ def get_master_event(opts, sock_dir, listen=True, io_loop=None, raise_errors=Fal
         )
 
 
+def _event_tag(package):
+    """
+    Return the tag of a packed event without unpacking its data, or None
+    """
+    if not isinstance(package, bytes):
+        return None
+    end = package.find(_TAGEND_BYTES)
+    if end == -1:
+        return None
+    return package[:end].decode("utf-8", "replace")
+
+
 def fire_args(opts, jid, tag_data, prefix=""):
     """
     Fire an event containing the arguments passed to an orchestration job
@@ -258,6 +271,8 @@ class SaltEvent:
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
         self.pending_tags = []
         self.pending_events = []
+        self.tag_filter = None
+        self.replay_from = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -348,6 +363,40 @@ class SaltEvent:
             ):
                 self.pending_events.append(evt)
 
+    def filter_tags(self, prefixes=None, globs=None):
+        """
+        Ask the event publisher to only send the events whose tags start with
+        one of ``prefixes`` or match one of the ``globs``. The other events are
+        dropped by the publisher instead of being sent to this listener and
+        discarded by get_event. Calling this without arguments receives all
+        events again.
+
+        .. versionadded:: 3005
+        """
+        if prefixes is None and globs is None:
+            self.tag_filter = None
+        else:
+            self.tag_filter = {
+                "startswith": list(prefixes or []),
+                "fnmatch": list(globs or []),
+            }
+        if self.subscriber is not None:
+            self.subscriber.set_tags(self.tag_filter)
+
+    def replay(self, since):
+        """
+        Ask the event publisher to send again the events fired since the
+        ``since`` timestamp. Only the events still in the journal of the
+        publisher can be sent, see the ``event_journal_size`` option. The
+        replayed events can arrive after newer ones.
+
+        .. versionadded:: 3005
+        """
+        if self.subscriber is not None:
+            self.subscriber.replay(since)
+        else:
+            self.replay_from = {"time": since}
+
     def connect_pub(self, timeout=None):
         """
         Establish the publish connection
@@ -361,9 +410,14 @@ class SaltEvent:
                     self.subscriber = salt.utils.asynchronous.SyncWrapper(
                         salt.transport.ipc.IPCMessageSubscriber,
                         args=(self.puburi,),
-                        kwargs={"io_loop": self.io_loop},
+                        kwargs={
+                            "io_loop": self.io_loop,
+                            "tags": self.tag_filter,
+                            "replay": self.replay_from,
+                        },
                         loop_kwarg="io_loop",
                     )
+                    self.replay_from = None
                 try:
                     self.subscriber.connect(timeout=timeout)
                     self.cpub = True
@@ -372,8 +426,12 @@ class SaltEvent:
         else:
             if self.subscriber is None:
                 self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
-                    self.puburi, io_loop=self.io_loop
+                    self.puburi,
+                    io_loop=self.io_loop,
+                    tags=self.tag_filter,
+                    replay=self.replay_from,
                 )
+                self.replay_from = None
 
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
@@ -655,6 +713,15 @@ class SaltEvent:
                             ret = self._get_event(wait, tag, match_func, no_block)
                             break
                         except salt.ext.tornado.iostream.StreamClosedError:
+                            if (
+                                self.subscriber is not None
+                                and self.subscriber.last_seq is not None
+                            ):
+                                # Get the events fired while reconnecting
+                                self.replay_from = {
+                                    "epoch": self.subscriber.epoch,
+                                    "seq": self.subscriber.last_seq,
+                                }
                             self.close_pub()
                             self.connect_pub(timeout=wait)
                             continue
@@ -1112,7 +1179,7 @@ class AsyncEventPublisher:
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_event_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1219,7 +1286,7 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_event_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
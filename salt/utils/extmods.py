@@ -145,6 +145,12 @@ def sync(opts, form, saltenv=None, extmod_whitelist=None, extmod_blacklist=None)
                     for emptydir in emptydirs:
                         touched = True
                         shutil.rmtree(emptydir, ignore_errors=True)
+            if touched:
+                # The loader's discovery cache might hold the virtual names of
+                # the modules which were replaced
+                shutil.rmtree(
+                    os.path.join(opts["cachedir"], "loader"), ignore_errors=True
+                )
         except Exception as exc:  # pylint: disable=broad-except
             log.error("Failed to sync %s module: %s", form, exc)
     return ret, touched
@@ -3,6 +3,7 @@ Classes which provide the shared base for GitFS, git_pillar, and winrepo
 """
 
 
+import concurrent.futures
 import contextlib
 import copy
 import errno
@@ -150,6 +151,13 @@ except Exception as exc:  # pylint: disable=broad-except
 # pylint: enable=import-error
 
 # Minimum versions for backend providers
+# The number of failed fetches in a row and the time of the next try, keyed by
+# role and remote id
+_FETCH_BACKOFF = {}
+
+# The longest a remote is skipped after failed fetches, in seconds
+FETCH_BACKOFF_MAX = 3600
+
 GITPYTHON_MINVER = _LooseVersion("0.3")
 PYGIT2_MINVER = _LooseVersion("0.20.3")
 LIBGIT2_MINVER = _LooseVersion("0.20.0")
@@ -216,6 +224,90 @@ def failhard(role):
     raise FileserverConfigError("Failed to load {}".format(role))
 
 
+class TreeIndex:
+    """
+    The paths of the blobs and directories in a git tree, with the sha and
+    mode of each blob and the target of each symlink
+    """
+
+    def __init__(self, entries):
+        """
+        ``entries`` yields the path, sha and mode of each blob and directory,
+        and the target of the symlinks (None for the other entries)
+        """
+        self.blobs = {}
+        self.symlinks = {}
+        self.dirs = set()
+        for path, hexsha, mode, link_tgt in entries:
+            if stat.S_ISDIR(mode):
+                self.dirs.add(path)
+                continue
+            self.blobs[path] = (hexsha, mode)
+            if link_tgt is not None:
+                self.symlinks[path] = link_tgt
+        # The file and directory lists, keyed by root and mountpoint
+        self._lists = {}
+
+    def find(self, path):
+        """
+        Return the sha and mode of the blob at path, following symlinks
+        """
+        for _ in range(SYMLINK_RECURSE_DEPTH):
+            try:
+                hexsha, mode = self.blobs[path]
+            except KeyError:
+                # File not found or path points to a directory
+                return None, None
+            if not stat.S_ISLNK(mode):
+                return hexsha, mode
+            # Path is a symlink, follow it to the location it points to
+            path = salt.utils.path.join(
+                os.path.dirname(path),
+                salt.utils.stringutils.to_str(self.symlinks[path]),
+                use_posixpath=True,
+            )
+        return None, None
+
+    def lists(self, root, mountpoint):
+        """
+        Return the files, symlinks and directories under root, with root
+        replaced by mountpoint in their paths
+        """
+        try:
+            return self._lists[(root, mountpoint)]
+        except KeyError:
+            pass
+        if root and root not in self.dirs:
+            return set(), {}, set()
+        prefix = root + "/" if root else ""
+        relpath = lambda path: path[len(prefix) :] if path.startswith(prefix) else None
+        if mountpoint:
+            add_mountpoint = lambda path: salt.utils.path.join(
+                mountpoint, path, use_posixpath=True
+            )
+        else:
+            add_mountpoint = lambda path: path
+        files = set()
+        symlinks = {}
+        dirs = set()
+        for path in self.blobs:
+            rel = relpath(path)
+            if rel is not None:
+                files.add(add_mountpoint(rel))
+        for path, link_tgt in self.symlinks.items():
+            rel = relpath(path)
+            if rel is not None:
+                symlinks[add_mountpoint(rel)] = link_tgt
+        for path in self.dirs:
+            rel = relpath(path)
+            if rel is not None:
+                dirs.add(add_mountpoint(rel))
+        if mountpoint:
+            dirs.add(mountpoint)
+        self._lists[(root, mountpoint)] = files, symlinks, dirs
+        return files, symlinks, dirs
+
+
 class GitProvider:
     """
     Base class for gitfs/git_pillar provider classes. Should never be used
@@ -237,6 +329,10 @@ class GitProvider:
     ):
         self.opts = opts
         self.role = role
+        # The TreeIndex of each tree in use, keyed by tree sha, and the sha of
+        # the tree of each environment
+        self._tree_indexes = {}
+        self._env_trees = {}
         self.global_saltenv = salt.utils.data.repack_dictlist(
             self.opts.get("{}_saltenv".format(self.role), []),
             strict=True,
@@ -1002,9 +1098,12 @@ class GitProvider:
 
     def dir_list(self, tgt_env):
         """
-        This function must be overridden in a sub-class
+        Get list of directories for the target environment
         """
-        raise NotImplementedError()
+        index = self.tree_index(tgt_env)
+        if index is None:
+            return set()
+        return set(index.lists(self.root(tgt_env), self.mountpoint(tgt_env))[2])
 
     def env_is_exposed(self, tgt_env):
         """
@@ -1029,17 +1128,87 @@ class GitProvider:
         raise NotImplementedError()
 
     def file_list(self, tgt_env):
+        """
+        Get file list for the target environment
+        """
+        index = self.tree_index(tgt_env)
+        if index is None:
+            # Not found, return empty objects
+            return set(), {}
+        files, symlinks, _ = index.lists(self.root(tgt_env), self.mountpoint(tgt_env))
+        return set(files), dict(symlinks)
+
+    def find_blob(self, path, tgt_env):
+        """
+        Find the specified file in the specified environment, and return the
+        sha and mode of its blob
+        """
+        index = self.tree_index(tgt_env)
+        if index is None:
+            # Branch/tag/SHA not found in repo
+            return None, None
+        return index.find(path)
+
+    def find_file(self, path, tgt_env):
+        """
+        Find the specified file in the specified environment
+        """
+        blob_hexsha, blob_mode = self.find_blob(path, tgt_env)
+        if blob_hexsha is None:
+            return None, None, None
+        return self.get_blob(blob_hexsha), blob_hexsha, blob_mode
+
+    def get_blob(self, hexsha):
         """
         This function must be overridden in a sub-class
         """
         raise NotImplementedError()
 
-    def find_file(self, path, tgt_env):
+    def tree_id(self, tree):
         """
         This function must be overridden in a sub-class
         """
         raise NotImplementedError()
 
+    def walk_tree(self, tree):
+        """
+        This function must be overridden in a sub-class
+        """
+        raise NotImplementedError()
+
+    def tree_index(self, tgt_env):
+        """
+        Return the TreeIndex of the tree of the target environment. It is built
+        the first time the tree is used, and replaced once a fetch changes the
+        tree of the environment.
+        """
+        tree = self.get_tree(tgt_env)
+        if not tree:
+            return None
+        tree_id = self.tree_id(tree)
+        index = self._tree_indexes.get(tree_id)
+        if index is None:
+            start = time.time()
+            index = TreeIndex(self.walk_tree(tree))
+            log.profile(
+                "%s indexed tree %s of remote '%s' in %s seconds",
+                self.role,
+                tree_id,
+                self.id,
+                time.time() - start,
+            )
+            self._env_trees[tgt_env] = tree_id
+            # Only keep the indexes of the trees still in use
+            in_use = set(self._env_trees.values())
+            indexes = {
+                key: val for key, val in self._tree_indexes.items() if key in in_use
+            }
+            indexes[tree_id] = index
+            self._tree_indexes = indexes
+        else:
+            self._env_trees[tgt_env] = tree_id
+        return index
+
     def get_checkout_target(self):
         """
         Resolve dynamically-set branch
@@ -1300,32 +1469,6 @@ class GitPython(GitProvider):
 
         return new
 
-    def dir_list(self, tgt_env):
-        """
-        Get list of directories for the target environment using GitPython
-        """
-        ret = set()
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            return ret
-        if self.root(tgt_env):
-            try:
-                tree = tree / self.root(tgt_env)
-            except KeyError:
-                return ret
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for blob in tree.traverse():
-            if isinstance(blob, git.Tree):
-                ret.add(add_mountpoint(relpath(blob.path)))
-        if self.mountpoint(tgt_env):
-            ret.add(self.mountpoint(tgt_env))
-        return ret
-
     def envs(self):
         """
         Check the refs and return a list of the ones which can be used as salt
@@ -1370,84 +1513,34 @@ class GitPython(GitProvider):
         cleaned = self.clean_stale_refs()
         return True if (new_objs or cleaned) else None
 
-    def file_list(self, tgt_env):
+    def get_blob(self, hexsha):
         """
-        Get file list for the target environment using GitPython
+        Return the git.Blob object with the specified SHA
         """
-        files = set()
-        symlinks = {}
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Not found, return empty objects
-            return files, symlinks
-        if self.root(tgt_env):
-            try:
-                tree = tree / self.root(tgt_env)
-            except KeyError:
-                return files, symlinks
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for file_blob in tree.traverse():
-            if not isinstance(file_blob, git.Blob):
-                continue
-            file_path = add_mountpoint(relpath(file_blob.path))
-            files.add(file_path)
-            if stat.S_ISLNK(file_blob.mode):
-                stream = io.BytesIO()
-                file_blob.stream_data(stream)
-                stream.seek(0)
-                link_tgt = salt.utils.stringutils.to_str(stream.read())
-                stream.close()
-                symlinks[file_path] = link_tgt
-        return files, symlinks
+        return git.Blob(self.repo, bytes.fromhex(hexsha))
 
-    def find_file(self, path, tgt_env):
+    def tree_id(self, tree):
         """
-        Find the specified file in the specified environment
+        Return the SHA of a git.Tree object
         """
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Branch/tag/SHA not found in repo
-            return None, None, None
-        blob = None
-        depth = 0
-        while True:
-            depth += 1
-            if depth > SYMLINK_RECURSE_DEPTH:
-                blob = None
-                break
-            try:
-                file_blob = tree / path
-                if stat.S_ISLNK(file_blob.mode):
-                    # Path is a symlink. The blob data corresponding to
-                    # this path's object ID will be the target of the
-                    # symlink. Follow the symlink and set path to the
-                    # location indicated in the blob data.
+        return tree.hexsha
+
+    def walk_tree(self, tree):
+        """
+        Yield the path, SHA and mode of each blob and directory in a git.Tree
+        object, and the target of the symlinks
+        """
+        for obj in tree.traverse():
+            if isinstance(obj, git.Tree):
+                yield obj.path, obj.hexsha, stat.S_IFDIR, None
+            elif isinstance(obj, git.Blob):
+                link_tgt = None
+                if stat.S_ISLNK(obj.mode):
                     stream = io.BytesIO()
-                    file_blob.stream_data(stream)
-                    stream.seek(0)
-                    link_tgt = salt.utils.stringutils.to_str(stream.read())
+                    obj.stream_data(stream)
+                    link_tgt = salt.utils.stringutils.to_str(stream.getvalue())
                     stream.close()
-                    path = salt.utils.path.join(
-                        os.path.dirname(path), link_tgt, use_posixpath=True
-                    )
-                else:
-                    blob = file_blob
-                    if isinstance(blob, git.Tree):
-                        # Path is a directory, not a file.
-                        blob = None
-                    break
-            except KeyError:
-                # File not found or repo_path points to a directory
-                blob = None
-                break
-        if isinstance(blob, git.Blob):
-            return blob, blob.hexsha, blob.mode
-        return None, None, None
+                yield obj.path, obj.hexsha, obj.mode, link_tgt
 
     def get_tree_from_branch(self, ref):
         """
@@ -1779,60 +1872,6 @@ class Pygit2(GitProvider):
 
         return new
 
-    def dir_list(self, tgt_env):
-        """
-        Get a list of directories for the target environment using pygit2
-        """
-
-        def _traverse(tree, blobs, prefix):
-            """
-            Traverse through a pygit2 Tree object recursively, accumulating all
-            the empty directories within it in the "blobs" list
-            """
-            for entry in iter(tree):
-                if entry.oid not in self.repo:
-                    # Entry is a submodule, skip it
-                    continue
-                blob = self.repo[entry.oid]
-                if not isinstance(blob, pygit2.Tree):
-                    continue
-                blobs.append(
-                    salt.utils.path.join(prefix, entry.name, use_posixpath=True)
-                )
-                if blob:
-                    _traverse(
-                        blob,
-                        blobs,
-                        salt.utils.path.join(prefix, entry.name, use_posixpath=True),
-                    )
-
-        ret = set()
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            return ret
-        if self.root(tgt_env):
-            try:
-                oid = tree[self.root(tgt_env)].oid
-                tree = self.repo[oid]
-            except KeyError:
-                return ret
-            if not isinstance(tree, pygit2.Tree):
-                return ret
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        blobs = []
-        if tree:
-            _traverse(tree, blobs, self.root(tgt_env))
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for blob in blobs:
-            ret.add(add_mountpoint(relpath(blob)))
-        if self.mountpoint(tgt_env):
-            ret.add(self.mountpoint(tgt_env))
-        return ret
-
     def envs(self):
         """
         Check the refs and return a list of the ones which can be used as salt
@@ -1896,10 +1935,12 @@ class Pygit2(GitProvider):
         try:
             # pygit2.Remote.fetch() returns a dict in pygit2 < 0.21.0
             received_objects = fetch_results["received_objects"]
+            self.fetch_bytes = fetch_results.get("received_bytes")
         except (AttributeError, TypeError):
             # pygit2.Remote.fetch() returns a class instance in
             # pygit2 >= 0.21.0
             received_objects = fetch_results.received_objects
+            self.fetch_bytes = getattr(fetch_results, "received_bytes", None)
         if received_objects != 0:
             log.debug(
                 "%s received %s objects for remote '%s'",
@@ -1913,107 +1954,41 @@ class Pygit2(GitProvider):
         cleaned = self.clean_stale_refs(local_refs=refs_post)
         return True if (received_objects or refs_pre != refs_post or cleaned) else None
 
-    def file_list(self, tgt_env):
+    def get_blob(self, hexsha):
         """
-        Get file list for the target environment using pygit2
+        Return the pygit2.Blob object with the specified SHA
         """
+        return self.repo[hexsha]
 
-        def _traverse(tree, blobs, prefix):
-            """
-            Traverse through a pygit2 Tree object recursively, accumulating all
-            the file paths and symlink info in the "blobs" dict
-            """
-            for entry in iter(tree):
-                if entry.oid not in self.repo:
-                    # Entry is a submodule, skip it
-                    continue
-                obj = self.repo[entry.oid]
-                if isinstance(obj, pygit2.Blob):
-                    repo_path = salt.utils.path.join(
-                        prefix, entry.name, use_posixpath=True
-                    )
-                    blobs.setdefault("files", []).append(repo_path)
-                    if stat.S_ISLNK(tree[entry.name].filemode):
-                        link_tgt = self.repo[tree[entry.name].oid].data
-                        blobs.setdefault("symlinks", {})[repo_path] = link_tgt
-                elif isinstance(obj, pygit2.Tree):
-                    _traverse(
-                        obj,
-                        blobs,
-                        salt.utils.path.join(prefix, entry.name, use_posixpath=True),
-                    )
-
-        files = set()
-        symlinks = {}
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Not found, return empty objects
-            return files, symlinks
-        if self.root(tgt_env):
-            try:
-                # This might need to be changed to account for a root that
-                # spans more than one directory
-                oid = tree[self.root(tgt_env)].oid
-                tree = self.repo[oid]
-            except KeyError:
-                return files, symlinks
-            if not isinstance(tree, pygit2.Tree):
-                return files, symlinks
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        blobs = {}
-        if tree:
-            _traverse(tree, blobs, self.root(tgt_env))
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for repo_path in blobs.get("files", []):
-            files.add(add_mountpoint(relpath(repo_path)))
-        for repo_path, link_tgt in blobs.get("symlinks", {}).items():
-            symlinks[add_mountpoint(relpath(repo_path))] = link_tgt
-        return files, symlinks
+    def tree_id(self, tree):
+        """
+        Return the SHA of a pygit2.Tree object
+        """
+        return tree.hex
 
-    def find_file(self, path, tgt_env):
+    def walk_tree(self, tree):
         """
-        Find the specified file in the specified environment
+        Yield the path, SHA and mode of each blob and directory in a
+        pygit2.Tree object, and the target of the symlinks
         """
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Branch/tag/SHA not found in repo
-            return None, None, None
-        blob = None
-        mode = None
-        depth = 0
-        while True:
-            depth += 1
-            if depth > SYMLINK_RECURSE_DEPTH:
-                blob = None
-                break
-            try:
-                entry = tree[path]
+        trees = [("", tree)]
+        while trees:
+            prefix, tree = trees.pop()
+            for entry in iter(tree):
                 mode = entry.filemode
-                if stat.S_ISLNK(mode):
-                    # Path is a symlink. The blob data corresponding to this
-                    # path's object ID will be the target of the symlink. Follow
-                    # the symlink and set path to the location indicated
-                    # in the blob data.
-                    link_tgt = self.repo[entry.oid].data
-                    path = salt.utils.path.join(
-                        os.path.dirname(path), link_tgt, use_posixpath=True
-                    )
-                else:
-                    blob = self.repo[entry.oid]
-                    if isinstance(blob, pygit2.Tree):
-                        # Path is a directory, not a file.
-                        blob = None
-                    break
-            except KeyError:
-                blob = None
-                break
-        if isinstance(blob, pygit2.Blob):
-            return blob, blob.hex, mode
-        return None, None, None
+                if stat.S_ISDIR(mode):
+                    if entry.oid not in self.repo:
+                        continue
+                    path = salt.utils.path.join(prefix, entry.name, use_posixpath=True)
+                    yield path, entry.hex, mode, None
+                    trees.append((path, self.repo[entry.oid]))
+                elif stat.S_ISREG(mode) or stat.S_ISLNK(mode):
+                    # Anything else is a submodule
+                    link_tgt = None
+                    if stat.S_ISLNK(mode):
+                        link_tgt = self.repo[entry.oid].data
+                    path = salt.utils.path.join(prefix, entry.name, use_posixpath=True)
+                    yield path, entry.hex, mode, link_tgt
 
     def get_tree_from_branch(self, ref):
         """
@@ -2286,6 +2261,8 @@ class GitBase:
             self.remote_root = salt.utils.path.join(self.cache_root, "remotes")
         self.env_cache = salt.utils.path.join(self.cache_root, "envs.p")
         self.hash_cachedir = salt.utils.path.join(self.cache_root, "hash")
+        # The SHA of the blob this process last wrote to each cached file
+        self.cached_blobs = {}
         self.file_list_cachedir = salt.utils.path.join(
             self.opts["cachedir"], "file_lists", self.role
         )
@@ -2523,27 +2500,173 @@ class GitBase:
             )
             remotes = []
 
-        changed = False
+        repos = []
         for repo in self.remotes:
             name = getattr(repo, "name", None)
             if not remotes or (repo.id, name) in remotes or name in remotes:
-                try:
-                    if repo.fetch():
-                        # We can't just use the return value from repo.fetch()
-                        # because the data could still have changed if old
-                        # remotes were cleared above. Additionally, we're
-                        # running this in a loop and later remotes without
-                        # changes would override this value and make it
-                        # incorrect.
-                        changed = True
-                except Exception as exc:  # pylint: disable=broad-except
+                repos.append(repo)
+
+        workers = self.opts.get("{}_fetch_workers".format(self.role), 1)
+        timeout = self.opts.get("{}_fetch_timeout".format(self.role), 0)
+        stats = {}
+        start = time.time()
+        if repos and (workers > 1 or timeout):
+            changed = self._fetch_concurrent(repos, workers, timeout, stats)
+        else:
+            changed = False
+            for repo in repos:
+                result, stats[repo.id] = self._fetch_remote(repo)
+                if result:
+                    # We can't just use the return value from repo.fetch()
+                    # because the data could still have changed if old
+                    # remotes were cleared above. Additionally, we're
+                    # running this in a loop and later remotes without
+                    # changes would override this value and make it
+                    # incorrect.
+                    changed = True
+
+        if stats and self.opts.get("fileserver_events", False):
+            data = {"remotes": stats, "duration": time.time() - start}
+            with salt.utils.event.get_event(
+                "master",
+                self.opts["sock_dir"],
+                self.opts["transport"],
+                opts=self.opts,
+                listen=False,
+            ) as event:
+                event.fire_event(
+                    data, tagify([self.role, "fetch"], prefix="fileserver")
+                )
+        return changed
+
+    def _fetch_remote(self, repo):
+        """
+        Fetch a remote, unless its last fetches failed and it has to wait for
+        its next try. Return whether the remote was updated and the stats of
+        the fetch.
+        """
+        backoff = _FETCH_BACKOFF.get((self.role, repo.id))
+        if backoff is not None and time.time() < backoff[1]:
+            log.debug(
+                "Skipping fetch of %s remote '%s' after %d failed fetches",
+                self.role,
+                repo.id,
+                backoff[0],
+            )
+            return False, {"skipped": True}
+
+        start = time.time()
+        repo.fetch_bytes = None
+        try:
+            result = repo.fetch()
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Exception caught while fetching %s remote '%s': %s",
+                self.role,
+                repo.id,
+                exc,
+                exc_info=True,
+            )
+            result = False
+        if result is False:
+            self._fetch_failed(repo)
+        else:
+            _FETCH_BACKOFF.pop((self.role, repo.id), None)
+        return (
+            bool(result),
+            {
+                "duration": time.time() - start,
+                "bytes": repo.fetch_bytes,
+                "changed": bool(result),
+                "failed": result is False,
+            },
+        )
+
+    def _fetch_failed(self, repo):
+        """
+        Make a remote whose fetch failed wait before its next try, twice as
+        long after each failure in a row
+        """
+        backoff = self.opts.get("{}_fetch_backoff".format(self.role), 0)
+        if not backoff:
+            return
+        failures = _FETCH_BACKOFF.get((self.role, repo.id), (0, 0))[0] + 1
+        delay = min(backoff * 2 ** (failures - 1), FETCH_BACKOFF_MAX)
+        _FETCH_BACKOFF[(self.role, repo.id)] = (failures, time.time() + delay)
+
+    def _fetch_concurrent(self, repos, workers, timeout, stats):
+        """
+        Fetch the remotes on a pool of threads, giving up on the fetches which
+        take longer than ``timeout`` seconds. Each remote still takes its own
+        update lock, so a fetch which timed out keeps its remote locked until
+        it ends.
+        """
+        changed = False
+        starts = {}
+        workers = min(max(workers, 1), len(repos))
+
+        def _fetch(repo):
+            starts[repo.id] = time.time()
+            return self._fetch_remote(repo)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(_fetch, repo): repo for repo in repos}
+        pending = set(futures)
+        stuck = set()
+        while pending:
+            now = time.time()
+            deadlines = []
+            if timeout:
+                for future in list(pending):
+                    repo = futures[future]
+                    if repo.id not in starts:
+                        # Check again soon whether the fetch started
+                        deadlines.append(now + 0.1)
+                        continue
+                    if now - starts[repo.id] < timeout:
+                        deadlines.append(starts[repo.id] + timeout)
+                        continue
+                    pending.discard(future)
+                    stuck.add(future)
                     log.error(
-                        "Exception caught while fetching %s remote '%s': %s",
+                        "Fetch of %s remote '%s' timed out after %s seconds",
                         self.role,
                         repo.id,
-                        exc,
-                        exc_info=True,
+                        timeout,
+                    )
+                    stats[repo.id] = {
+                        "duration": now - starts[repo.id],
+                        "bytes": None,
+                        "changed": False,
+                        "failed": True,
+                    }
+                    self._fetch_failed(repo)
+            if len([future for future in stuck if not future.done()]) >= workers:
+                # Every thread is held by a fetch which timed out
+                for future in pending:
+                    future.cancel()
+                    log.error(
+                        "Fetch of %s remote '%s' skipped, the fetches before it "
+                        "timed out",
+                        self.role,
+                        futures[future].id,
                     )
+                    stats[futures[future].id] = {"skipped": True}
+                break
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(
+                pending,
+                timeout=min(deadlines) - now if deadlines else None,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.discard(future)
+                result, stats[futures[future].id] = future.result()
+                if result:
+                    changed = True
+        # Do not wait for the fetches which timed out
+        executor.shutdown(wait=False)
         return changed
 
     def lock(self, remote=None):
@@ -2940,20 +3063,6 @@ class GitFS(GitBase):
         lk_fn = salt.utils.path.join(self.hash_cachedir, tgt_env, "{}.lk".format(path))
         destdir = os.path.dirname(dest)
         hashdir = os.path.dirname(blobshadest)
-        if not os.path.isdir(destdir):
-            try:
-                os.makedirs(destdir)
-            except OSError:
-                # Path exists and is a file, remove it and retry
-                os.remove(destdir)
-                os.makedirs(destdir)
-        if not os.path.isdir(hashdir):
-            try:
-                os.makedirs(hashdir)
-            except OSError:
-                # Path exists and is a file, remove it and retry
-                os.remove(hashdir)
-                os.makedirs(hashdir)
 
         for repo in self.remotes:
             if repo.mountpoint(tgt_env) and not path.startswith(
@@ -2970,8 +3079,8 @@ class GitFS(GitBase):
             if repo.root(tgt_env):
                 repo_path = salt.utils.path.join(repo.root(tgt_env), repo_path)
 
-            blob, blob_hexsha, blob_mode = repo.find_file(repo_path, tgt_env)
-            if blob is None:
+            blob_hexsha, blob_mode = repo.find_blob(repo_path, tgt_env)
+            if blob_hexsha is None:
                 continue
 
             def _add_file_stat(fnd, mode):
@@ -2988,11 +3097,27 @@ class GitFS(GitBase):
                     fnd["stat"] = [mode]
                 return fnd
 
+            if self.cached_blobs.get(dest) == blob_hexsha and os.path.isfile(dest):
+                # This process already wrote this blob to the cache
+                fnd["rel"] = path
+                fnd["path"] = dest
+                return _add_file_stat(fnd, blob_mode)
+
+            for dirname in (destdir, hashdir):
+                if not os.path.isdir(dirname):
+                    try:
+                        os.makedirs(dirname)
+                    except OSError:
+                        # Path exists and is a file, remove it and retry
+                        os.remove(dirname)
+                        os.makedirs(dirname)
+
             salt.fileserver.wait_lock(lk_fn, dest)
             try:
                 with salt.utils.files.fopen(blobshadest, "r") as fp_:
                     sha = salt.utils.stringutils.to_unicode(fp_.read())
                     if sha == blob_hexsha:
+                        self.cached_blobs[dest] = blob_hexsha
                         fnd["rel"] = path
                         fnd["path"] = dest
                         return _add_file_stat(fnd, blob_mode)
@@ -3009,9 +3134,10 @@ class GitFS(GitBase):
                 except Exception:  # pylint: disable=broad-except
                     pass
             # Write contents of file to their destination in the FS cache
-            repo.write_file(blob, dest)
+            repo.write_file(repo.get_blob(blob_hexsha), dest)
             with salt.utils.files.fopen(blobshadest, "w+") as fp_:
                 fp_.write(blob_hexsha)
+            self.cached_blobs[dest] = blob_hexsha
             try:
                 os.remove(lk_fn)
             except OSError:
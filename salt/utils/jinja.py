@@ -22,6 +22,7 @@ import salt.fileclient
 import salt.utils.data
 import salt.utils.files
 import salt.utils.json
+import salt.utils.renderinputs
 import salt.utils.stringutils
 import salt.utils.url
 import salt.utils.yaml
@@ -181,6 +182,7 @@ class SaltCacheLoader(BaseLoader):
                 with salt.utils.files.fopen(filepath, "rb") as ifile:
                     contents = ifile.read().decode(self.encoding)
                     mtime = os.path.getmtime(filepath)
+                    salt.utils.renderinputs.record_file(filepath, contents)
 
                     def uptodate():
                         try:
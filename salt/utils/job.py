@@ -4,6 +4,7 @@ Functions for interacting with the job cache
 
 
 import logging
+import time
 
 import salt.minion
 import salt.utils.event
@@ -13,20 +14,11 @@ import salt.utils.verify
 log = logging.getLogger(__name__)
 
 
-def store_job(opts, load, event=None, mminion=None):
+def _prep_job(opts, load, mminion):
     """
-    Store job information using the configured master_job_cache
+    Prepare the master job cache to receive the return in ``load``, a jid is
+    requested for standalone jobs returned by minions
     """
-    # Generate EndTime
-    endtime = salt.utils.jid.jid_to_time(salt.utils.jid.gen_jid(opts))
-    # If the return data is invalid, just ignore it
-    if any(key not in load for key in ("return", "jid", "id")):
-        return False
-    if not salt.utils.verify.valid_id(opts, load["id"]):
-        return False
-    if mminion is None:
-        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
-
     job_cache = opts["master_job_cache"]
     if load["jid"] == "req":
         # The minion is returning a standalone job, request a jobid
@@ -65,33 +57,45 @@ def store_job(opts, load, event=None, mminion=None):
                 exc_info=True,
             )
     elif salt.utils.jid.is_jid(load["jid"]):
-        # Store the jid
-        jidstore_fstr = "{}.prep_jid".format(job_cache)
-        try:
-            mminion.returners[jidstore_fstr](False, passed_jid=load["jid"])
-        except KeyError:
-            emsg = "Returner '{}' does not support function prep_jid".format(job_cache)
-            log.error(emsg)
-            raise KeyError(emsg)
-        except Exception:  # pylint: disable=broad-except
-            log.critical(
-                "The specified '%s' returner threw a stack trace",
-                job_cache,
-                exc_info=True,
-            )
+        _store_jid(opts, load["jid"], mminion)
 
-    if event:
-        # If the return data is invalid, just ignore it
-        log.info("Got return from %s for job %s", load["id"], load["jid"])
-        event.fire_event(
-            load, salt.utils.event.tagify([load["jid"], "ret", load["id"]], "job")
+
+def _store_jid(opts, jid, mminion):
+    """
+    Store the jid of a job which was published by this master
+    """
+    job_cache = opts["master_job_cache"]
+    jidstore_fstr = "{}.prep_jid".format(job_cache)
+    try:
+        mminion.returners[jidstore_fstr](False, passed_jid=jid)
+    except KeyError:
+        emsg = "Returner '{}' does not support function prep_jid".format(job_cache)
+        log.error(emsg)
+        raise KeyError(emsg)
+    except Exception:  # pylint: disable=broad-except
+        log.critical(
+            "The specified '%s' returner threw a stack trace", job_cache, exc_info=True,
         )
-        event.fire_ret_load(load)
 
+
+def _fire_ret_event(load, event):
+    # If the return data is invalid, just ignore it
+    log.info("Got return from %s for job %s", load["id"], load["jid"])
+    event.fire_event(
+        load, salt.utils.event.tagify([load["jid"], "ret", load["id"]], "job")
+    )
+    event.fire_ret_load(load)
+
+
+def _is_cached(opts, load):
+    """
+    Return whether the return in ``load`` has to be written to the master job
+    cache
+    """
     # if you have a job_cache, or an ext_job_cache, don't write to
     # the regular master cache
     if not opts["job_cache"] or opts.get("ext_job_cache"):
-        return
+        return False
 
     # do not cache job results if explicitly requested
     if load.get("jid") == "nocache":
@@ -100,19 +104,27 @@ def store_job(opts, load, event=None, mminion=None):
             load["jid"],
             load["id"],
         )
-        return
+        return False
+    return True
 
-    # otherwise, write to the master cache
+
+def _store_returns(opts, returns, mminion):
+    """
+    Write a list of ``(load, endtime)`` returns to the master job cache
+    """
+    job_cache = opts["master_job_cache"]
     savefstr = "{}.save_load".format(job_cache)
     getfstr = "{}.get_load".format(job_cache)
     fstr = "{}.returner".format(job_cache)
+    batchfstr = "{}.returner_batch".format(job_cache)
     updateetfstr = "{}.update_endtime".format(job_cache)
-    if "fun" not in load and load.get("return", {}):
-        ret_ = load.get("return", {})
-        if "fun" in ret_:
-            load.update({"fun": ret_["fun"]})
-        if "user" in ret_:
-            load.update({"user": ret_["user"]})
+    for load, _ in returns:
+        if "fun" not in load and load.get("return", {}):
+            ret_ = load.get("return", {})
+            if "fun" in ret_:
+                load.update({"fun": ret_["fun"]})
+            if "user" in ret_:
+                load.update({"user": ret_["user"]})
 
     # Try to reach returner methods
     try:
@@ -125,26 +137,157 @@ def store_job(opts, load, event=None, mminion=None):
         raise KeyError(emsg)
 
     if job_cache != "local_cache":
+        for load, _ in returns:
+            try:
+                mminion.returners[savefstr](load["jid"], load)
+            except KeyError as e:
+                log.error("Load does not contain 'jid': %s", e)
+            except Exception:  # pylint: disable=broad-except
+                log.critical(
+                    "The specified '%s' returner threw a stack trace",
+                    job_cache,
+                    exc_info=True,
+                )
+
+    if len(returns) > 1 and batchfstr in mminion.returners:
         try:
-            mminion.returners[savefstr](load["jid"], load)
-        except KeyError as e:
-            log.error("Load does not contain 'jid': %s", e)
+            mminion.returners[batchfstr]([load for load, _ in returns])
         except Exception:  # pylint: disable=broad-except
             log.critical(
                 "The specified '%s' returner threw a stack trace",
                 job_cache,
                 exc_info=True,
             )
+    else:
+        for load, _ in returns:
+            try:
+                mminion.returners[fstr](load)
+            except Exception:  # pylint: disable=broad-except
+                log.critical(
+                    "The specified '%s' returner threw a stack trace",
+                    job_cache,
+                    exc_info=True,
+                )
 
-    try:
-        mminion.returners[fstr](load)
-    except Exception:  # pylint: disable=broad-except
-        log.critical(
-            "The specified '%s' returner threw a stack trace", job_cache, exc_info=True,
+    if opts.get("job_cache_store_endtime") and updateetfstr in mminion.returners:
+        endtimes = {}
+        for load, endtime in returns:
+            endtimes[load["jid"]] = endtime
+        for jid, endtime in endtimes.items():
+            mminion.returners[updateetfstr](jid, endtime)
+
+
+def store_job(opts, load, event=None, mminion=None):
+    """
+    Store job information using the configured master_job_cache
+    """
+    # Generate EndTime
+    endtime = salt.utils.jid.jid_to_time(salt.utils.jid.gen_jid(opts))
+    # If the return data is invalid, just ignore it
+    if any(key not in load for key in ("return", "jid", "id")):
+        return False
+    if not salt.utils.verify.valid_id(opts, load["id"]):
+        return False
+    if mminion is None:
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+
+    _prep_job(opts, load, mminion)
+
+    if event:
+        _fire_ret_event(load, event)
+
+    if not _is_cached(opts, load):
+        return
+
+    # otherwise, write to the master cache
+    _store_returns(opts, [(load, endtime)], mminion)
+
+
+class ReturnBatcher:
+    """
+    Coalesce the returns stored by ``store_job`` and write them to the master
+    job cache in batches.
+
+    The return events are fired as soon as a return is added, only the writes
+    to the master job cache are delayed until ``job_cache_batch_size`` returns
+    are pending or the oldest pending return waited ``job_cache_batch_interval``
+    seconds. Job cache returners which provide a ``returner_batch`` function
+    receive the whole batch at once.
+    """
+
+    def __init__(self, opts, event=None, mminion=None):
+        self.opts = opts
+        self.event = event
+        self.mminion = mminion
+        self.size = opts.get("job_cache_batch_size", 0)
+        self.interval = opts.get("job_cache_batch_interval", 1.0)
+        self.pending = []
+        # The jids which were already prepared in the job cache by this batch
+        self.jids = set()
+        self.started = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    @property
+    def due(self):
+        """
+        Whether the pending returns have to be written to the job cache
+        """
+        if not self.pending:
+            return False
+        return (
+            len(self.pending) >= self.size
+            or time.time() - self.started >= self.interval
         )
 
-    if opts.get("job_cache_store_endtime") and updateetfstr in mminion.returners:
-        mminion.returners[updateetfstr](load["jid"], endtime)
+    def add(self, load):
+        """
+        Add a minion return, this is the batched equivalent of ``store_job``
+        """
+        endtime = salt.utils.jid.jid_to_time(salt.utils.jid.gen_jid(self.opts))
+        if any(key not in load for key in ("return", "jid", "id")):
+            return False
+        if not salt.utils.verify.valid_id(self.opts, load["id"]):
+            return False
+        if self.mminion is None:
+            self.mminion = salt.minion.MasterMinion(self.opts, states=False, rend=False)
+
+        if load["jid"] == "req":
+            # The jid has to be known before the event is fired
+            _prep_job(self.opts, load, self.mminion)
+            self.jids.add(load["jid"])
+
+        if self.event:
+            _fire_ret_event(load, self.event)
+
+        if not _is_cached(self.opts, load):
+            return
+
+        if not self.pending:
+            self.started = time.time()
+        self.pending.append((load, endtime))
+        if self.due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the pending returns to the master job cache
+        """
+        if not self.pending:
+            return
+        returns = self.pending
+        jids = self.jids
+        self.pending = []
+        self.jids = set()
+        self.started = None
+        log.debug("Storing a batch of %d returns in the job cache", len(returns))
+        # Prepare every job only once per batch
+        for load, _ in returns:
+            if load["jid"] not in jids and salt.utils.jid.is_jid(load["jid"]):
+                _store_jid(self.opts, load["jid"], self.mminion)
+                jids.add(load["jid"])
+        _store_returns(self.opts, returns, self.mminion)
 
 
 def store_minions(opts, jid, minions, mminion=None, syndic_id=None):
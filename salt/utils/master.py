@@ -7,27 +7,33 @@
 """
 
 
+import hashlib
 import logging
+import multiprocessing
 import os
 import signal
+import time
 from threading import Event, Thread
 
 import salt.cache
 import salt.client
 import salt.config
+import salt.ext.tornado.ioloop
 import salt.log
 import salt.payload
 import salt.pillar
 import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.json
 import salt.utils.minions
 import salt.utils.platform
+import salt.utils.process
 import salt.utils.stringutils
 import salt.utils.verify
-from salt.exceptions import SaltException
+from salt.exceptions import SaltException, SaltReqTimeoutError
 from salt.utils.cache import CacheCli as cache_cli
 from salt.utils.process import Process
-from salt.utils.zeromq import zmq
+from salt.utils.zeromq import ZMQDefaultLoop, install_zmq, zmq
 
 log = logging.getLogger(__name__)
 
@@ -530,10 +536,19 @@ class MasterPillarUtil:
                 ):
                     # Not saving pillar or grains, so just delete the cache file
                     self.cache.flush(bank, "data")
+                    salt.utils.minions.update_minion_data_index(
+                        self.opts, self.cache, minion_id, {}
+                    )
                 elif clear_pillar and minion_grains:
                     self.cache.store(bank, "data", {"grains": minion_grains})
+                    salt.utils.minions.update_minion_data_index(
+                        self.opts, self.cache, minion_id, {"grains": minion_grains}
+                    )
                 elif clear_grains and minion_pillar:
                     self.cache.store(bank, "data", {"pillar": minion_pillar})
+                    salt.utils.minions.update_minion_data_index(
+                        self.opts, self.cache, minion_id, {"pillar": minion_pillar}
+                    )
                 if clear_mine:
                     # Delete the whole mine file
                     self.cache.flush(bank, "mine")
@@ -839,6 +854,319 @@ class ConnectedCache(Process):
         log.debug("ConCache Shutting down")
 
 
+# The opts of a pillar render process
+_PILLAR_OPTS = None
+
+
+def _pillar_worker_init(opts):
+    """
+    Set up a pillar render process of the PillarServer pool
+    """
+    global _PILLAR_OPTS  # pylint: disable=global-statement
+    _PILLAR_OPTS = opts
+
+
+def _pillar_top_matches(load):
+    """
+    Return the pillar SLS files the top file matches for the minion of a
+    pillar request
+    """
+    pillar = salt.pillar.Pillar(
+        _PILLAR_OPTS,
+        load["grains"],
+        load["id"],
+        load.get("saltenv", load.get("env")),
+        pillar_override=load.get("pillar_override", {}),
+        pillarenv=load.get("pillarenv"),
+        extra_minion_data=load.get("extra_minion_data"),
+    )
+    top, errors = pillar.get_top()
+    if errors:
+        # Don't share the render of a broken top file
+        return None
+    return pillar.top_matches(top)
+
+
+def _pillar_compile(load):
+    """
+    Compile the pillar data of a pillar request
+    """
+    pillar = salt.pillar.get_pillar(
+        _PILLAR_OPTS,
+        load["grains"],
+        load["id"],
+        load.get("saltenv", load.get("env")),
+        ext=load.get("ext"),
+        pillar_override=load.get("pillar_override", {}),
+        pillarenv=load.get("pillarenv"),
+        extra_minion_data=load.get("extra_minion_data"),
+    )
+    return pillar.compile_pillar()
+
+
+class PillarServer(salt.utils.process.SignalHandlingProcess):
+    """
+    Compile the pillar data for the MWorkers in a pool of processes
+
+    Concurrent requests which resolve to the same rendering inputs share a
+    single compilation, its result is sent back to every MWorker waiting for
+    it. With ``pillar_coalesce_by_grains`` and no external pillars the minion
+    id is left out of the rendering inputs and the SLS files matched by the
+    top file are used instead, so minions with identical grains share a
+    compilation too. A compilation which does not finish within
+    ``pillar_workers_timeout`` is given up and its requests get an error.
+    """
+
+    def __init__(self, opts, **kwargs):
+        super().__init__(**kwargs)
+        self.opts = opts
+        self.serial = salt.payload.Serial(opts)
+        self.sock_path = os.path.join(opts["sock_dir"], "pillar.ipc")
+        # The fingerprints of the running compilations and the envelopes of
+        # the requests waiting for each of them
+        self.running = {}
+        self.pool = None
+        self.stream = None
+        self.io_loop = None
+
+    # __setstate__ and __getstate__ are only used on Windows.
+    # We do this so that __init__ will be invoked on Windows in the child
+    # process so that a register_after_fork() equivalent will work on Windows.
+    def __setstate__(self, state):
+        self.__init__(
+            state["opts"],
+            log_queue=state["log_queue"],
+            log_queue_level=state["log_queue_level"],
+        )
+
+    def __getstate__(self):
+        return {
+            "opts": self.opts,
+            "log_queue": self.log_queue,
+            "log_queue_level": self.log_queue_level,
+        }
+
+    def _handle_signals(self, signum, sigframe):
+        # Stop the render processes while the pool still manages them, a
+        # pool whose processes were killed can't be terminated
+        if self.pool is not None:
+            self.pool.terminate()
+        super()._handle_signals(signum, sigframe)
+
+    def fingerprint(self, load, matches=None):
+        """
+        Return the fingerprint of the rendering inputs of a pillar request
+        """
+        inputs = {
+            key: load.get(key)
+            for key in (
+                "id",
+                "grains",
+                "saltenv",
+                "env",
+                "pillarenv",
+                "ext",
+                "pillar_override",
+                "extra_minion_data",
+            )
+        }
+        if matches is not None:
+            inputs["id"] = None
+            inputs["grains"] = {
+                key: value for key, value in load["grains"].items() if key != "id"
+            }
+            inputs["matches"] = matches
+        return hashlib.sha256(
+            salt.utils.stringutils.to_bytes(
+                salt.utils.json.dumps(inputs, sort_keys=True, default=repr)
+            )
+        ).hexdigest()
+
+    def handle_request(self, frames):
+        """
+        Handle a pillar request of a MWorker
+        """
+        envelope, payload = frames[:-1], frames[-1]
+        try:
+            load = self.serial.loads(payload)
+            load["grains"]["id"] = load["id"]
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Bad pillar request: %s", exc)
+            self.send(envelope, {"error": "bad pillar request"})
+            return
+        if (
+            not self.opts["pillar_coalesce_by_grains"]
+            or self.opts.get("ext_pillar")
+            or load.get("ext")
+        ):
+            # External pillars are looked up by minion id, their data is
+            # never shared with other minions
+            self.compile(envelope, load, self.fingerprint(load))
+            return
+
+        def _matched(matches):
+            if matches is None:
+                key = self.fingerprint(load)
+            else:
+                key = self.fingerprint(load, matches)
+            self.io_loop.add_callback(self.compile, envelope, load, key)
+
+        def _failed(exc):
+            self.io_loop.add_callback(
+                self.compile, envelope, load, self.fingerprint(load)
+            )
+
+        self.pool.apply_async(
+            _pillar_top_matches,
+            (load,),
+            callback=_matched,
+            error_callback=_failed,
+        )
+
+    def compile(self, envelope, load, key):
+        """
+        Compile the pillar data of a request, or wait for the running
+        compilation with the same fingerprint
+        """
+        now = time.time()
+        running = self.running.get(key)
+        if running is not None and running["deadline"] > now:
+            log.debug("Sharing the pillar compilation of %s with %s", key, load["id"])
+            running["waiters"].append(envelope)
+            return
+        self.expire(now)
+        # The result of a compilation that outlived its deadline is dropped
+        running = self.running[key] = {
+            "deadline": now + self.opts["pillar_workers_timeout"],
+            "waiters": [envelope],
+        }
+
+        def _compiled(data):
+            self.io_loop.add_callback(self.finish, key, running, {"pillar": data})
+
+        def _failed(exc):
+            log.error("Error compiling the pillar of %s: %s", load["id"], exc)
+            self.io_loop.add_callback(self.finish, key, running, {"error": str(exc)})
+
+        self.pool.apply_async(
+            _pillar_compile, (load,), callback=_compiled, error_callback=_failed
+        )
+
+    def finish(self, key, running, ret):
+        """
+        Send the result of a compilation to every request waiting for it
+        """
+        if self.running.get(key) is not running:
+            # The compilation was expired
+            return
+        del self.running[key]
+        payload = self.serial.dumps(ret)
+        for envelope in running["waiters"]:
+            self.send(envelope, payload)
+
+    def expire(self, now=None):
+        """
+        Give up on the compilations which did not finish in time, their render
+        process died or hangs
+        """
+        if now is None:
+            now = time.time()
+        for key, running in list(self.running.items()):
+            if running["deadline"] > now:
+                continue
+            log.error(
+                "The pillar compilation %s did not finish in %s seconds",
+                key,
+                self.opts["pillar_workers_timeout"],
+            )
+            del self.running[key]
+            payload = self.serial.dumps({"error": "pillar compilation timed out"})
+            for envelope in running["waiters"]:
+                self.send(envelope, payload)
+
+    def send(self, envelope, ret):
+        if not isinstance(ret, bytes):
+            ret = self.serial.dumps(ret)
+        self.stream.send_multipart(envelope + [ret], copy=False)
+
+    def run(self):
+        """
+        Start the pillar render processes and serve the MWorkers
+        """
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
+            self.pool = multiprocessing.Pool(
+                self.opts["pillar_workers"],
+                initializer=_pillar_worker_init,
+                initargs=(self.opts,),
+            )
+        import zmq.eventloop.zmqstream
+
+        install_zmq()
+        self.io_loop = ZMQDefaultLoop()
+        self.io_loop.make_current()
+        context = zmq.Context()
+        sock = context.socket(zmq.ROUTER)
+        sock.setsockopt(zmq.LINGER, 100)
+        sock.bind("ipc://" + self.sock_path)
+        os.chmod(self.sock_path, 0o600)
+        self.stream = zmq.eventloop.zmqstream.ZMQStream(sock, io_loop=self.io_loop)
+        self.stream.on_recv(self.handle_request)
+        salt.ext.tornado.ioloop.PeriodicCallback(self.expire, 1000).start()
+        log.info("PillarServer started with %s workers", self.opts["pillar_workers"])
+        try:
+            self.io_loop.start()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            self.pool.terminate()
+            self.stream.close()
+            context.term()
+
+
+class PillarClient:
+    """
+    Compile pillar data through the PillarServer
+    """
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.serial = salt.payload.Serial(opts)
+        self.context = zmq.Context()
+        self.socket = None
+
+    def compile_pillar(self, load):
+        """
+        Return the pillar data of a pillar request of a minion
+        """
+        if self.socket is None:
+            self.socket = self.context.socket(zmq.REQ)
+            self.socket.setsockopt(zmq.LINGER, 0)
+            self.socket.connect(
+                "ipc://" + os.path.join(self.opts["sock_dir"], "pillar.ipc")
+            )
+        self.socket.send(self.serial.dumps(load))
+        if not self.socket.poll(self.opts["pillar_workers_timeout"] * 1000):
+            # A REQ socket can't send again before it got the reply
+            self.socket.close()
+            self.socket = None
+            raise SaltReqTimeoutError(
+                "The pillar of {} was not compiled in time".format(load["id"])
+            )
+        ret = self.serial.loads(self.socket.recv())
+        if "error" in ret:
+            raise SaltException(
+                "Error compiling the pillar of {}: {}".format(load["id"], ret["error"])
+            )
+        return ret["pillar"]
+
+    def destroy(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        self.context.term()
+
+
 def ping_all_connected_minions(opts):
     if opts["minion_data_cache"]:
         tgt = list(salt.utils.minions.CkMinions(opts).connected_ids())
@@ -8,6 +8,8 @@ import fnmatch
 import logging
 import os
 import re
+import threading
+import time
 
 import salt.auth.ldap
 import salt.cache
@@ -119,6 +121,319 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+class _IndexPath:
+    """
+    The minions found at a single flattened path of the minion data index
+    """
+
+    __slots__ = ("tokens", "dict_keys", "dicts", "lists", "complex")
+
+    def __init__(self):
+        # Lowercased string value (or list member) -> minion ids
+        self.tokens = {}
+        # Key of a dict found at this path -> minion ids
+        self.dict_keys = {}
+        # Minion ids with a dict at this path
+        self.dicts = set()
+        # Minion ids with a list at this path
+        self.lists = set()
+        # Minion ids with a list holding nested data at this path, those can
+        # only be resolved by salt.utils.data.subdict_match
+        self.complex = set()
+
+    def __bool__(self):
+        return bool(
+            self.tokens or self.dict_keys or self.dicts or self.lists or self.complex
+        )
+
+    def match_tokens(self, pattern, regex_match=False, exact_match=False):
+        """
+        Return the minions holding a value matching ``pattern`` at this path,
+        following the rules of ``salt.utils.data.subdict_match``
+        """
+        pattern = str(pattern).lower()
+        if exact_match:
+            return set(self.tokens.get(pattern, ()))
+        ret = set()
+        if regex_match:
+            try:
+                regex = re.compile(pattern)
+            except re.error:
+                log.error("Invalid regex '%s' in match", pattern)
+                return ret
+            for token, minions in self.tokens.items():
+                if regex.match(token):
+                    ret.update(minions)
+        else:
+            for token, minions in self.tokens.items():
+                if fnmatch.fnmatch(token, pattern):
+                    ret.update(minions)
+        return ret
+
+
+class MinionDataIndex:
+    """
+    Inverted index of the grains and pillar data stored in the minion data
+    cache.
+
+    Every value found in the cached grains and pillar is indexed by its
+    flattened path, i.e. ``os`` or ``roles:web``, so that grain and pillar
+    targeting does not have to fetch and decode the cached data of every
+    minion on each publish. The index lives in the memory of the process using
+    it and is refreshed incrementally whenever a writer of the minion data
+    cache announces a change through :py:func:`update_minion_data_index`.
+
+    Lookups return the same minions ``salt.utils.data.subdict_match`` would,
+    the few data layouts which can not be resolved from the index alone (data
+    nested in lists, ``*:`` wildcards) are verified against the cache.
+    """
+
+    # Bank and key of the marker bumped every time minion data is changed
+    BANK = "minion_data_index"
+    KEY = "serial"
+    SEARCH_TYPES = ("grains", "pillar")
+    # Force a revalidation of the index against the cache after this many
+    # seconds, even if no change was announced
+    REVALIDATE_INTERVAL = 60
+
+    def __init__(self, opts, cache=None):
+        self.opts = opts
+        self.cache = cache if cache is not None else salt.cache.factory(opts)
+        self._lock = threading.RLock()
+        self._paths = {stype: {} for stype in self.SEARCH_TYPES}
+        # Minion id -> [(search_type, path, attribute, token)]
+        self._postings = {}
+        # Minion id -> epoch of the moment the data was indexed, None means
+        # that the minion is in the cache without any data
+        self._stamps = {}
+        self._serial = None
+        self._last_refresh = 0
+
+    @property
+    def minions(self):
+        """
+        The minions holding data in the minion data cache
+        """
+        with self._lock:
+            return set(self._postings)
+
+    def _remove(self, minion_id):
+        for stype, path, attr, token in self._postings.pop(minion_id, ()):
+            entry = self._paths[stype].get(path)
+            if entry is None:
+                continue
+            container = getattr(entry, attr)
+            if token is None:
+                container.discard(minion_id)
+            else:
+                minions = container.get(token)
+                if minions is not None:
+                    minions.discard(minion_id)
+                    if not minions:
+                        del container[token]
+            if not entry:
+                del self._paths[stype][path]
+
+    def _add(self, minion_id, mdata):
+        postings = []
+
+        def _post(stype, path, attr, token=None):
+            entry = self._paths[stype].get(path)
+            if entry is None:
+                entry = self._paths[stype][path] = _IndexPath()
+            container = getattr(entry, attr)
+            if token is None:
+                container.add(minion_id)
+            else:
+                container.setdefault(token, set()).add(minion_id)
+            postings.append((stype, path, attr, token))
+
+        def _walk(stype, node, path):
+            if isinstance(node, dict):
+                if path:
+                    _post(stype, path, "dicts")
+                for key, value in node.items():
+                    # Non-string keys can't be reached by a target expression
+                    if isinstance(key, str):
+                        if path:
+                            _post(stype, path, "dict_keys", key)
+                        _walk(stype, value, path + (key,))
+            elif isinstance(node, (list, tuple)):
+                if not path:
+                    return
+                _post(stype, path, "lists")
+                for member in node:
+                    if isinstance(member, (dict, list, tuple)):
+                        _post(stype, path, "complex")
+                    else:
+                        _post(stype, path, "tokens", _token(member))
+            elif path:
+                _post(stype, path, "tokens", _token(node))
+
+        for stype in self.SEARCH_TYPES:
+            _walk(stype, mdata.get(stype), ())
+        self._postings[minion_id] = postings
+
+    def update(self, minion_id, mdata):
+        """
+        Replace the indexed data of a minion, ``None`` removes the minion from
+        the index
+        """
+        with self._lock:
+            self._remove(minion_id)
+            if mdata is None:
+                self._stamps.pop(minion_id, None)
+            else:
+                self._add(minion_id, mdata)
+                self._stamps[minion_id] = int(time.time())
+
+    def _fetch(self, minion_id):
+        try:
+            return self.cache.fetch("minions/{}".format(minion_id), "data")
+        except SaltCacheError:
+            return None
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date with the minion data cache if a change was
+        announced since the last refresh
+        """
+        with self._lock:
+            serial = self.cache.fetch(self.BANK, self.KEY)
+            now = time.time()
+            if (
+                not force
+                and self._serial is not None
+                and serial == self._serial
+                and now - self._last_refresh < self.REVALIDATE_INTERVAL
+            ):
+                return
+            has_updated = "{}.updated".format(self.cache.driver) in self.cache.modules
+            cached = set(self.cache.list("minions") or ())
+            for minion_id in set(self._stamps) - cached:
+                self.update(minion_id, None)
+            for minion_id in cached:
+                bank = "minions/{}".format(minion_id)
+                stamp = self._stamps.get(minion_id)
+                if has_updated and stamp is not None:
+                    if not self.cache.contains(bank, "data"):
+                        if self._postings.get(minion_id) == []:
+                            continue
+                        self.update(minion_id, {})
+                        continue
+                    updated = self.cache.updated(bank, "data")
+                    # Cache mtimes only have a resolution of one second
+                    if updated is not None and updated < stamp:
+                        continue
+                mdata = self._fetch(minion_id)
+                if mdata is not None:
+                    self.update(minion_id, mdata)
+                else:
+                    self._remove(minion_id)
+                    self._stamps[minion_id] = int(now)
+            self._serial = serial
+            self._last_refresh = now
+
+    def match(
+        self,
+        search_type,
+        expr,
+        delimiter=DEFAULT_TARGET_DELIM,
+        regex_match=False,
+        exact_match=False,
+    ):
+        """
+        Return the set of indexed minions whose ``search_type`` data matches
+        ``expr``
+        """
+        splits = expr.split(delimiter)
+        if len(splits) == 1:
+            return set()
+        paths = self._paths[search_type]
+        found = set()
+        verify = set()
+        with self._lock:
+            for idx in range(len(splits) - 1, 0, -1):
+                path = tuple(splits[:idx])
+                if path == ("*",):
+                    verify.update(self._postings)
+                    continue
+                matchstr = delimiter.join(splits[idx:])
+                # Lists along the way are traversed by index or into
+                # embedded dicts, leave these to subdict_match
+                for depth in range(1, idx):
+                    entry = paths.get(path[:depth])
+                    if entry is not None:
+                        verify.update(entry.lists)
+                entry = paths.get(path)
+                if entry is None:
+                    continue
+                found.update(
+                    entry.match_tokens(
+                        matchstr, regex_match=regex_match, exact_match=exact_match
+                    )
+                )
+                verify.update(entry.complex)
+                if entry.dicts:
+                    if matchstr == "*":
+                        found.update(entry.dicts)
+                    elif matchstr.startswith("*:"):
+                        verify.update(entry.dicts)
+                    else:
+                        found.update(entry.dict_keys.get(matchstr, ()))
+        for minion_id in verify - found:
+            mdata = self._fetch(minion_id)
+            if mdata and salt.utils.data.subdict_match(
+                mdata.get(search_type),
+                expr,
+                delimiter=delimiter,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            ):
+                found.add(minion_id)
+        return found
+
+
+def _token(value):
+    try:
+        return str(value).lower()
+    except UnicodeDecodeError:
+        return salt.utils.stringutils.to_unicode(value).lower()
+
+
+_MINION_DATA_INDEXES = {}
+
+
+def get_minion_data_index(opts, cache=None):
+    """
+    Return the :py:class:`MinionDataIndex` shared by this process for the
+    configured minion data cache
+    """
+    key = (opts.get("cache", "localfs"), opts.get("cachedir"))
+    if key not in _MINION_DATA_INDEXES:
+        _MINION_DATA_INDEXES[key] = MinionDataIndex(opts, cache=cache)
+    return _MINION_DATA_INDEXES[key]
+
+
+def update_minion_data_index(opts, cache, minion_id, mdata=None):
+    """
+    Announce a change of the cached data of ``minion_id`` to every process
+    using the minion data index. ``mdata`` is the data which was just written,
+    ``None`` if it was removed from the cache.
+    """
+    if not opts.get("minion_data_index", False):
+        return
+    get_minion_data_index(opts, cache).update(minion_id, mdata)
+    try:
+        cache.store(
+            MinionDataIndex.BANK,
+            MinionDataIndex.KEY,
+            "{}-{}-{}".format(time.time(), os.getpid(), minion_id),
+        )
+    except SaltCacheError as exc:
+        log.error("Unable to update the minion data index marker: %s", exc)
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     """
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -314,7 +629,24 @@ class CkMinions:
         else:
             return {"minions": [], "missing": []}
 
-        if cache_enabled:
+        if cache_enabled and self.opts.get("minion_data_index", False):
+            index = get_minion_data_index(self.opts, self.cache)
+            index.refresh()
+            cminions = index.minions
+            matched = index.match(
+                search_type,
+                expr,
+                delimiter=delimiter,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            )
+            if greedy:
+                minions = [
+                    id_ for id_ in minions if id_ not in cminions or id_ in matched
+                ]
+            else:
+                minions = [id_ for id_ in minions if id_ in matched]
+        elif cache_enabled:
             if greedy:
                 cminions = list_cached_minions()
             else:
@@ -2200,6 +2200,17 @@ class SaltCMDOptionParser(
             dest="batch_safe_size",
             help=("Batch size to use for batch jobs created by batch-safe-limit."),
         )
+        self.add_option(
+            "--batch-stream",
+            default=False,
+            dest="batch_stream",
+            action="store_true",
+            help=(
+                "Start the batch job on each minion as soon as it is found, "
+                "rather than waiting for all of the targeted minions to be "
+                "found first."
+            ),
+        )
         self.add_option(
             "--return",
             default="",
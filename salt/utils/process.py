@@ -607,6 +607,16 @@ class ProcessManager:
 
         del self._process_map[pid]
 
+    def terminate_process(self, name):
+        """
+        Terminate the process named ``name`` and stop managing it
+        """
+        for pid, mapping in list(self._process_map.items()):
+            if mapping["Process"].name == name:
+                del self._process_map[pid]
+                mapping["Process"].terminate()
+                mapping["Process"].join(self.wait_for_kill)
+
     def stop_restarting(self):
         self._restart_processes = False
 
@@ -638,9 +648,12 @@ class ProcessManager:
                 del self._process_map[pid]
 
     @gen.coroutine
-    def run(self, asynchronous=False):
+    def run(self, asynchronous=False, interval=10, callback=None):
         """
         Load and start all available api modules
+
+        The children are checked every ``interval`` seconds, ``callback`` is
+        called after every check
         """
         log.debug("Process Manager starting!")
         appendproctitle(self.name)
@@ -658,13 +671,15 @@ class ProcessManager:
             try:
                 # in case someone died while we were waiting...
                 self.check_children()
+                if callback is not None:
+                    callback()
                 # The event-based subprocesses management code was removed from here
                 # because os.wait() conflicts with the subprocesses management logic
                 # implemented in `multiprocessing` package. See #35480 for details.
                 if asynchronous:
-                    yield gen.sleep(10)
+                    yield gen.sleep(interval)
                 else:
-                    time.sleep(10)
+                    time.sleep(interval)
                 if not self._process_map:
                     break
             # OSError is raised if a signal handler is called (SIGTERM) during os.wait
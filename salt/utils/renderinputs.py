@@ -0,0 +1,339 @@
+"""
+Record the data a template reads while it is rendered
+
+The grains, pillar and opts passed to a template, and the ``salt`` functions
+it calls, are wrapped so that every key the template looks up and every
+function call it makes is recorded. The rendered output can then be reused
+for any other set of inputs which agrees on those values.
+
+.. code-block:: python
+
+    with salt.utils.renderinputs.record() as inputs:
+        data = compile_template(...)
+    ...
+    sources = {"grains": grains, "pillar": pillar, "opts": opts, "salt": funcs}
+    if inputs.matches(sources, call):
+        # data can be reused
+"""
+
+import contextlib
+import contextvars
+import copy
+import hashlib
+import logging
+
+import salt.utils.stringutils
+
+log = logging.getLogger(__name__)
+
+# The RenderInputs of the template rendered in the current context, if any
+_CURRENT = contextvars.ContextVar("render_inputs", default=None)
+
+# The key recorded when a template reads a whole dictionary
+WHOLE = None
+
+
+class _Missing:
+    """
+    Marks a key which was looked up but not found
+    """
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+MISSING = _Missing()
+
+
+def _digest(contents):
+    return hashlib.sha256(salt.utils.stringutils.to_bytes(contents)).hexdigest()
+
+
+class RenderInputs:
+    """
+    The data read by the templates rendered while this object was current
+    """
+
+    def __init__(self):
+        self.reads = {}
+        self.calls = []
+        self.files = {}
+        self.cacheable = True
+
+    def wrap(self, context):
+        """
+        Wrap the grains, pillar, opts and salt functions of a template context
+        """
+        for name in ("grains", "pillar", "opts"):
+            value = context.get(name)
+            if value is not None and not isinstance(value, TrackedDict):
+                context[name] = TrackedDict(self, name, value)
+        funcs = context.get("salt")
+        if funcs is not None and not isinstance(funcs, TrackedFunctions):
+            context["salt"] = TrackedFunctions(self, funcs)
+
+    def read(self, name, key, value):
+        """
+        Record the value a template read from one of its inputs
+        """
+        if (name, key) in self.reads:
+            return
+        try:
+            self.reads[(name, key)] = copy.deepcopy(value)
+        except Exception:  # pylint: disable=broad-except
+            self.cacheable = False
+
+    def call(self, name, args, kwargs, ret):
+        """
+        Record a call a template made to a salt function
+        """
+        try:
+            self.calls.append(
+                (name, copy.deepcopy(args), copy.deepcopy(kwargs), copy.deepcopy(ret))
+            )
+        except Exception:  # pylint: disable=broad-except
+            self.cacheable = False
+
+    def file(self, path, contents):
+        """
+        Record a file a template included or imported
+        """
+        self.files[path] = _digest(contents)
+
+    def matches(self, sources, call):
+        """
+        Return True if the inputs in ``sources``, keyed by ``grains``,
+        ``pillar``, ``opts`` and ``salt``, agree on everything which was read.
+        ``call`` is called with the name, args and kwargs of every recorded
+        function call and has to return the same result again.
+        """
+        if not self.cacheable:
+            return False
+        for (name, key), value in self.reads.items():
+            source = sources.get(name)
+            if source is None:
+                return False
+            if name == "salt":
+                current = key in source
+            elif key is WHOLE:
+                current = dict(source)
+            else:
+                current = source.get(key, MISSING)
+            if current != value:
+                return False
+        # Avoid circular import
+        import salt.utils.files
+
+        for path, digest in self.files.items():
+            try:
+                with salt.utils.files.fopen(path, "rb") as fp_:
+                    if _digest(fp_.read()) != digest:
+                        return False
+            except OSError:
+                return False
+        for name, args, kwargs, ret in self.calls:
+            try:
+                if call(name, args, kwargs) != ret:
+                    return False
+            except Exception:  # pylint: disable=broad-except
+                return False
+        return True
+
+
+@contextlib.contextmanager
+def record():
+    """
+    Record the data read by the templates rendered in this context
+    """
+    inputs = RenderInputs()
+    token = _CURRENT.set(inputs)
+    try:
+        yield inputs
+    finally:
+        _CURRENT.reset(token)
+
+
+def current():
+    """
+    Return the RenderInputs recording in this context, or None
+    """
+    return _CURRENT.get()
+
+
+def record_file(path, contents):
+    """
+    Record a file read by a template, if recording is enabled
+    """
+    inputs = _CURRENT.get()
+    if inputs is not None:
+        inputs.file(path, contents)
+
+
+def untracked(value):
+    """
+    Return the data a TrackedDict was made from, for the code which renders a
+    template rather than the template itself
+    """
+    if isinstance(value, TrackedDict):
+        return value._source
+    return value
+
+
+class TrackedDict(dict):
+    """
+    A copy of a template input which records the keys read from it. Reading
+    all of it, for instance by iterating over it, records the whole data.
+    Changing it disables the reuse of the output, and changes the source too.
+    """
+
+    def __init__(self, inputs, name, source):
+        super().__init__(source)
+        self._inputs = inputs
+        self._name = name
+        self._source = source
+
+    def _read(self, key):
+        self._inputs.read(self._name, key, dict.get(self, key, MISSING))
+
+    def _read_all(self):
+        self._inputs.read(self._name, WHOLE, dict(dict.items(self)))
+
+    def _changed(self):
+        self._inputs.cacheable = False
+
+    def __getitem__(self, key):
+        self._read(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._read(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._read(key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._read_all()
+        return super().__iter__()
+
+    def __len__(self):
+        self._read_all()
+        return super().__len__()
+
+    def __repr__(self):
+        self._read_all()
+        return super().__repr__()
+
+    def __eq__(self, other):
+        self._read_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def keys(self):
+        self._read_all()
+        return super().keys()
+
+    def items(self):
+        self._read_all()
+        return super().items()
+
+    def values(self):
+        self._read_all()
+        return super().values()
+
+    def copy(self):
+        self._read_all()
+        return dict(super().items())
+
+    def __reduce_ex__(self, protocol):
+        self._read_all()
+        return (dict, (dict(super().items()),))
+
+    def __setitem__(self, key, value):
+        self._changed()
+        self._source[key] = value
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._changed()
+        del self._source[key]
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._changed()
+        self._source.update(*args, **kwargs)
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._changed()
+        self._source.setdefault(key, default)
+        return super().setdefault(key, default)
+
+    def pop(self, key, *args):
+        self._changed()
+        self._source.pop(key, *args)
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self._changed()
+        key, value = super().popitem()
+        self._source.pop(key, None)
+        return key, value
+
+    def clear(self):
+        self._changed()
+        self._source.clear()
+        super().clear()
+
+
+class TrackedFunctions:
+    """
+    Wraps the salt functions passed to a template and records their calls
+    """
+
+    def __init__(self, inputs, wrapped, prefix=""):
+        self._inputs = inputs
+        self._wrapped = wrapped
+        self._prefix = prefix
+
+    def _track(self, name, value):
+        if "." not in name:
+            # A module, whose functions are looked up as attributes
+            return TrackedFunctions(self._inputs, value, name + ".")
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            ret = value(*args, **kwargs)
+            self._inputs.call(name, args, kwargs, ret)
+            return ret
+
+        return call
+
+    def __getitem__(self, name):
+        return self._track(self._prefix + name, self._wrapped[name])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._track(self._prefix + name, getattr(self._wrapped, name))
+
+    def __contains__(self, name):
+        present = name in self._wrapped
+        self._inputs.read("salt", self._prefix + name, present)
+        return present
+
+    def __call__(self, *args, **kwargs):
+        # A module object looked up by mistake still calls through
+        return self._wrapped(*args, **kwargs)
@@ -12,6 +12,7 @@ Detailed tutorial about scheduling jobs can be found :ref:`here
 import copy
 import datetime
 import errno
+import heapq
 import itertools
 import logging
 import os
@@ -183,6 +184,11 @@ class Schedule:
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        # The jobs which are not due before their next fire time, by name,
+        # and a heap of these fire times
+        self._deferred = {}
+        self._wakeups = []
+        self._deferred_settings = None
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
@@ -195,6 +201,25 @@ class Schedule:
             return self.functions["config.merge"](opt, {}, omit_master=True)
         return self.opts.get(opt, {})
 
+    def _defer(self, job, data, wake):
+        """
+        Skip the evaluation of ``job`` until ``wake``, nothing about the job
+        changes before then unless its data is replaced or modified through
+        the scheduler
+        """
+        self._deferred[job] = (wake, data)
+        heapq.heappush(self._wakeups, (wake, job))
+
+    def _undefer(self, job=None):
+        """
+        Evaluate ``job``, or all of the jobs, again on the next ``eval``
+        """
+        if job is None:
+            self._deferred.clear()
+            self._wakeups = []
+        else:
+            self._deferred.pop(job, None)
+
     def _get_schedule(
         self, include_opts=True, include_pillar=True, remove_hidden=False
     ):
@@ -332,6 +357,7 @@ class Schedule:
         # remove from self.intervals
         if name in self.intervals:
             del self.intervals[name]
+        self._undefer(name)
 
         if persist:
             self.persist()
@@ -345,6 +371,7 @@ class Schedule:
         self.enabled = True
         self.splay = None
         self.opts["schedule"] = {}
+        self._undefer()
 
     def delete_job_prefix(self, name, persist=True):
         """
@@ -369,6 +396,7 @@ class Schedule:
         for job in list(self.intervals.keys()):
             if job.startswith(name):
                 del self.intervals[job]
+        self._undefer()
 
         if persist:
             self.persist()
@@ -405,6 +433,7 @@ class Schedule:
         else:
             log.info("Added new job %s to scheduler", new_job)
             self.opts["schedule"].update(data)
+        self._undefer(new_job)
 
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
@@ -423,6 +452,7 @@ class Schedule:
         # ensure job exists, then enable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = True
+            self._undefer(name)
             log.info("Enabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -444,6 +474,7 @@ class Schedule:
         # ensure job exists, then disable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = False
+            self._undefer(name)
             log.info("Disabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -470,6 +501,7 @@ class Schedule:
             return
 
         self.opts["schedule"][name] = schedule
+        self._undefer(name)
 
         if persist:
             self.persist()
@@ -546,6 +578,7 @@ class Schedule:
         """
         # Remove all jobs from self.intervals
         self.intervals = {}
+        self._undefer()
 
         if "schedule" in schedule:
             schedule = schedule["schedule"]
@@ -601,6 +634,7 @@ class Schedule:
             self.opts["schedule"][name]["run_explicit"].append(
                 {"time": new_time, "time_fmt": time_fmt}
             )
+            self._undefer(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -627,6 +661,7 @@ class Schedule:
             self.opts["schedule"][name]["skip_explicit"].append(
                 {"time": time, "time_fmt": time_fmt}
             )
+            self._undefer(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -1449,6 +1484,26 @@ class Schedule:
         if "splay" in schedule:
             self.splay = schedule["splay"]
 
+        if not now:
+            now = datetime.datetime.now()
+
+        # The global settings change the evaluation of every job
+        settings = (
+            self.enabled,
+            self.splay,
+            self.skip_function,
+            self.skip_during_range,
+            loop_interval,
+        )
+        if settings != self._deferred_settings:
+            self._undefer()
+            self._deferred_settings = settings
+        # Evaluate the deferred jobs again once their fire time is reached
+        while self._wakeups and self._wakeups[0][0] <= now:
+            wake, job = heapq.heappop(self._wakeups)
+            if self._deferred.get(job, (None,))[0] == wake:
+                del self._deferred[job]
+
         _hidden = ["enabled", "skip_function", "skip_during_range", "splay"]
         for job, data in schedule.items():
 
@@ -1456,6 +1511,9 @@ class Schedule:
             if job in _hidden:
                 continue
 
+            if job in self._deferred and self._deferred[job][1] is data:
+                continue
+
             # Clear these out between runs
             for item in [
                 "_continue",
@@ -1507,9 +1565,6 @@ class Schedule:
             ):
                 data["_run_on_start"] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1771,6 +1826,21 @@ class Schedule:
                         data["_next_fire_time"] = now + datetime.timedelta(
                             seconds=data["_seconds"]
                         )
+
+            # Until the next fire time of interval and cron jobs, evaluating
+            # them again leaves them untouched
+            if (
+                not self.standalone
+                and ("_seconds" in data or "cron" in data)
+                and "run_explicit" not in data
+                and not data.get("_skipped")
+                and not data.get("_continue")
+                and data["_next_fire_time"] is not None
+                and (data["_splay"] or not data["splay"])
+            ):
+                wake = data["_splay"] or _chop_ms(data["_next_fire_time"])
+                if wake > now:
+                    self._defer(job, data, wake)
         return jids
 
     def _run_job(self, func, data, jid=None):
@@ -20,6 +20,7 @@ import salt.utils.http
 import salt.utils.jinja
 import salt.utils.network
 import salt.utils.platform
+import salt.utils.renderinputs
 import salt.utils.stringutils
 import salt.utils.yamlencoding
 from salt import __path__ as saltpath
@@ -230,6 +231,10 @@ def wrap_tmpl_func(render_str):
         assert "opts" in context
         assert "saltenv" in context
 
+        inputs = salt.utils.renderinputs.current()
+        if inputs is not None:
+            inputs.wrap(context)
+
         if "sls" in context:
             sls_context = generate_sls_context(tmplpath, context["sls"])
             context.update(sls_context)
@@ -378,7 +383,7 @@ def _get_jinja_error(trace, context=None):
 
 
 def render_jinja_tmpl(tmplstr, context, tmplpath=None):
-    opts = context["opts"]
+    opts = salt.utils.renderinputs.untracked(context["opts"])
     saltenv = context["saltenv"]
     loader = None
     newline = False
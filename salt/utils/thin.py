@@ -4,7 +4,9 @@ Generate the salt thin tarball from the installed python files
 
 import contextvars as py_contextvars
 import copy
+import hashlib
 import importlib.util
+import io
 import logging
 import os
 import shutil
@@ -13,6 +15,7 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import time
 import zipfile
 
 import distro
@@ -21,6 +24,7 @@ import msgpack
 import salt
 import salt.exceptions
 import salt.ext.tornado as tornado
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.json
@@ -87,6 +91,10 @@ concurrent = None
 
 log = logging.getLogger(__name__)
 
+# The file of a delta archive which lists the files to remove, keep this in
+# sync with salt/client/ssh/ssh_py_shim.py
+DELTA_MANIFEST = "salt-delta.json"
+
 
 def import_module(name, path):
     """
@@ -1023,3 +1031,98 @@ def min_sum(cachedir, form="sha1"):
     """
     mintar = gen_min(cachedir)
     return salt.utils.hashutils.get_hash(mintar, form)
+
+
+def manifest_dir(cachedir):
+    """
+    Return the directory holding the manifests of the deployed archives
+    """
+    return os.path.join(cachedir, "thin", "manifests")
+
+
+def _member_hash(tfp, member):
+    """
+    Return the hash of a member of a tar archive
+    """
+    if member.issym() or member.islnk():
+        return "link:{}".format(member.linkname)
+    hash_obj = hashlib.sha1()
+    fileobj = tfp.extractfile(member)
+    for chunk in iter(lambda: fileobj.read(65536), b""):
+        hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+
+def gen_manifest(archive, cachedir, key=None):
+    """
+    Write the manifest of a tar archive, which maps the paths of its files to
+    their hashes, to the manifest directory under key, and return the key.
+    The key defaults to the sha1 checksum of the archive.
+    """
+    if key is None:
+        key = salt.utils.hashutils.get_hash(archive, "sha1")
+    path = os.path.join(manifest_dir(cachedir), "{}.json".format(key))
+    if os.path.isfile(path):
+        return key
+    manifest = {}
+    with tarfile.open(archive) as tfp:
+        for member in tfp:
+            if member.isfile() or member.issym() or member.islnk():
+                manifest[member.name] = _member_hash(tfp, member)
+    os.makedirs(manifest_dir(cachedir), exist_ok=True)
+    with salt.utils.atomicfile.atomic_open(path, "w") as fp_:
+        salt.utils.json.dump(manifest, fp_)
+    return key
+
+
+def gen_delta(archive, cachedir, old_key, new_key=None):
+    """
+    Return the path of a tar archive holding the files of archive which are
+    new or changed since the archive whose manifest is stored under old_key,
+    and a DELTA_MANIFEST listing the files to remove. Return None when that
+    manifest is not known.
+
+    The new_key defaults to the sha1 checksum of archive, and is stored in the
+    DELTA_MANIFEST as the checksum the delta brings the files up to date with.
+    """
+    old_path = os.path.join(manifest_dir(cachedir), "{}.json".format(old_key))
+    if not os.path.isfile(old_path):
+        return None
+    new_key = gen_manifest(archive, cachedir, new_key)
+    delta_path = os.path.join(
+        manifest_dir(cachedir), "{}-{}.tgz".format(old_key, new_key)
+    )
+    if os.path.isfile(delta_path):
+        return delta_path
+
+    with salt.utils.files.fopen(old_path, "r") as fp_:
+        old = salt.utils.json.load(fp_)
+    with salt.utils.files.fopen(
+        os.path.join(manifest_dir(cachedir), "{}.json".format(new_key)), "r"
+    ) as fp_:
+        new = salt.utils.json.load(fp_)
+    delta = {"remove": sorted(set(old).difference(new)), "checksum": new_key}
+
+    tmp_path = _get_thintar_prefix(delta_path)
+    with tarfile.open(archive) as src, tarfile.open(tmp_path, "w:gz") as dst:
+        for member in src:
+            if member.name not in new or old.get(member.name) == new[member.name]:
+                continue
+            if member.isfile():
+                dst.addfile(member, src.extractfile(member))
+            else:
+                dst.addfile(member)
+        data = salt.utils.stringutils.to_bytes(salt.utils.json.dumps(delta))
+        info = tarfile.TarInfo(DELTA_MANIFEST)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        dst.addfile(info, io.BytesIO(data))
+    shutil.move(tmp_path, delta_path)
+    log.debug(
+        "Generated the delta from %s to %s of %s: %s",
+        old_key,
+        new_key,
+        archive,
+        delta_path,
+    )
+    return delta_path
@@ -323,7 +323,10 @@ class Terminal:
             if self.child_fde is not None:
                 os.close(self.child_fde)
                 self.child_fde = None
-            time.sleep(0.1)
+            if mswindows or self.isalive():
+                # Give the child a moment to exit now that its terminal is
+                # closed, there is no need to wait for one which already has
+                time.sleep(0.1)
             if terminate:
                 if not self.terminate(kill):
                     raise TerminalException("Failed to terminate child process.")
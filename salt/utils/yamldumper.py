@@ -10,6 +10,7 @@
 import collections
 
 import salt.utils.context
+import salt.utils.renderinputs
 import yaml  # pylint: disable=blacklisted-import
 from salt.utils.odict import OrderedDict
 
@@ -87,6 +88,14 @@ SafeOrderedDumper.add_representer(
     salt.utils.context.NamespacedDictWrapper,
     yaml.representer.SafeRepresenter.represent_dict,
 )
+OrderedDumper.add_representer(
+    salt.utils.renderinputs.TrackedDict,
+    yaml.representer.SafeRepresenter.represent_dict,
+)
+SafeOrderedDumper.add_representer(
+    salt.utils.renderinputs.TrackedDict,
+    yaml.representer.SafeRepresenter.represent_dict,
+)
 
 OrderedDumper.add_representer(
     "tag:yaml.org,2002:timestamp", OrderedDumper.represent_scalar
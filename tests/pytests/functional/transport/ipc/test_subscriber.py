@@ -113,3 +113,84 @@ async def test_basic_send(channel):
     await channel.publish(msg)
     ret = await channel.read()
     assert ret == msg
+
+
+async def test_tag_filters(io_loop, ipc_socket_path):
+    socket_path = str(ipc_socket_path)
+    publisher = salt.transport.ipc.IPCMessagePublisher(
+        {"ipc_write_buffer": 0}, socket_path, io_loop=io_loop,
+    )
+    publisher.start()
+    subscribers = [
+        salt.transport.ipc.IPCMessageSubscriber(socket_path, io_loop=io_loop),
+        salt.transport.ipc.IPCMessageSubscriber(
+            socket_path,
+            io_loop=io_loop,
+            tags={"startswith": ["salt/job/"], "fnmatch": ["*/beacon/*"]},
+        ),
+    ]
+    try:
+        for subscriber in subscribers:
+            await subscriber.connect()
+        while len(publisher.tag_filters) < 1:
+            await salt.ext.tornado.gen.sleep(0.01)
+        for tag in ("salt/auth", "salt/job/1/ret/a", "salt/beacon/a/load", "done"):
+            publisher.publish(tag, tag=tag)
+        received = [[], []]
+        for subscriber, tags in zip(subscribers, received):
+            while not tags or tags[-1] != "salt/beacon/a/load":
+                tags.append(await subscriber.read(5))
+        assert received[0] == ["salt/auth", "salt/job/1/ret/a", "salt/beacon/a/load"]
+        assert received[1] == ["salt/job/1/ret/a", "salt/beacon/a/load"]
+
+        # Removing the filter receives every message again
+        subscribers[1].set_tags(None)
+        while publisher.tag_filters:
+            await salt.ext.tornado.gen.sleep(0.01)
+        publisher.publish("salt/auth", tag="salt/auth")
+        assert await subscribers[1].read(5) == "salt/auth"
+    finally:
+        for subscriber in subscribers:
+            subscriber.close()
+        publisher.close()
+
+
+async def test_journal_replay(io_loop, ipc_socket_path):
+    socket_path = str(ipc_socket_path)
+    publisher = salt.transport.ipc.IPCMessagePublisher(
+        {"ipc_write_buffer": 0, "event_journal_size": 1024},
+        socket_path,
+        io_loop=io_loop,
+    )
+    publisher.start()
+    for idx in range(3):
+        publisher.publish("before-{}".format(idx), tag="before")
+    subscriber = salt.transport.ipc.IPCMessageSubscriber(
+        socket_path,
+        io_loop=io_loop,
+        tags={"startswith": ["before", "after"]},
+        replay={"time": 0},
+    )
+    try:
+        await subscriber.connect()
+        received = [await subscriber.read(5) for _ in range(3)]
+        assert received == ["before-0", "before-1", "before-2"]
+        assert subscriber.last_seq == 3
+
+        # The messages published while disconnected are sent on reconnect
+        subscriber.stream.close()
+        while publisher.streams:
+            await salt.ext.tornado.gen.sleep(0.01)
+        publisher.publish("other", tag="other")
+        publisher.publish("after", tag="after")
+        assert await subscriber.read(5) == "after"
+        assert subscriber.last_seq == 5
+
+        # The journal is bounded in size
+        for idx in range(100):
+            publisher.publish("padding-{}".format(idx), tag="padding")
+        assert publisher.journal_bytes <= 1024
+        assert publisher.journal[0][0] > 5
+    finally:
+        subscriber.close()
+        publisher.close()
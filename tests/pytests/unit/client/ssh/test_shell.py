@@ -26,3 +26,21 @@ def test_ssh_shell_key_gen(keys):
         ["ssh-keygen", "-f", str(keys.priv_key), "-y"], timeout=30,
     )
     assert ret.decode().startswith("ssh-rsa")
+
+
+def test_ssh_shell_control_opts(tmp_path):
+    """
+    Test that the commands to a host share one connection when
+    ssh_control_persist is set
+    """
+    opts = {"cachedir": str(tmp_path), "ssh_control_persist": 60}
+    _shell = shell.Shell(opts, "web1")
+    cmd = _shell._cmd_str("true")
+    assert "-o ControlMaster=auto" in cmd
+    assert "-o ControlPath={}".format(tmp_path / "ssh_mux" / "%C") in cmd
+    assert "-o ControlPersist=60" in cmd
+    assert (tmp_path / "ssh_mux").is_dir()
+    assert "-o ControlPersist=60" in _shell._cmd_str("/tmp/file web1:/tmp", "scp")
+
+    opts["ssh_control_persist"] = 0
+    assert "Control" not in _shell._cmd_str("true")
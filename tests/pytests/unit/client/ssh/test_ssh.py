@@ -1,5 +1,10 @@
+import os
+import time
+
 import pytest
 import salt.client.ssh.client
+import salt.client.ssh.shell
+import salt.utils.thin
 import salt.utils.msgpack
 from salt.client import ssh
 from tests.support.mock import MagicMock, patch
@@ -64,6 +69,52 @@ def test_cmd_block_python_version_error(ssh_target):
         assert "ERROR: Python version error. Recommendation(s) follow:" in ret[0]
 
 
+@pytest.mark.skip_on_windows(reason="SSH_PY_SHIM not set on windows")
+def test_cmd_block_deploy_delta(ssh_target, tmp_path):
+    opts = ssh_target[0]
+    opts["ssh_thin_delta"] = True
+    target = ssh_target[1]
+    thin = str(tmp_path / "salt-thin.tgz")
+
+    single = ssh.Single(
+        opts,
+        opts["argv"],
+        "localhost",
+        mods={"file": str(tmp_path / "salt-ext_mods.tgz"), "version": "2"},
+        fsclient=None,
+        thin=thin,
+        mine=False,
+        winrm=False,
+        **target
+    )
+    rstr = "{}\n".format(ssh.RSTR)
+    mock_shim = MagicMock(
+        side_effect=[
+            (rstr + "deploy_delta abc\n", "", 11),
+            (rstr + "ok", rstr, 0),
+            (rstr + "ext_mods 1\n", "", 13),
+            (rstr + "ok", rstr, 0),
+        ]
+    )
+    mock_send = MagicMock(return_value=("", "", 0))
+    mock_delta = MagicMock(side_effect=["thin-delta.tgz", "ext-delta.tgz"])
+    with patch("salt.client.ssh.Single.shim_cmd", mock_shim), patch.object(
+        single.shell, "send", mock_send
+    ), patch("salt.utils.thin.gen_delta", mock_delta):
+        single.cmd_block()
+        single.cmd_block()
+    mock_delta.assert_any_call(thin, opts["cachedir"], "abc")
+    mock_delta.assert_any_call(
+        str(tmp_path / "salt-ext_mods.tgz"), opts["cachedir"], "1", "2"
+    )
+    assert [call[0][0] for call in mock_send.call_args_list] == [
+        "thin-delta.tgz",
+        "ext-delta.tgz",
+    ]
+    assert mock_send.call_args_list[0][0][1].endswith("salt-thin-delta.tgz")
+    assert mock_send.call_args_list[1][0][1].endswith("salt-ext_mods-delta.tgz")
+
+
 @pytest.mark.parametrize(
     "test_opts",
     [
@@ -135,3 +186,122 @@ def test_ssh_kwargs(test_opts):
     with patch("salt.roster.get_roster_file", MagicMock(return_value="")):
         ssh_obj = client._prep_ssh(**opts)
         assert ssh_obj.opts.get(opt_key, None) == opt_value
+
+
+@pytest.fixture
+def ssh_runner(tmp_path):
+    """
+    An SSH object to run routines on three targets, without a roster
+    """
+    client = ssh.SSH.__new__(ssh.SSH)
+    client.opts = {"argv": ["test.ping"], "cachedir": str(tmp_path)}
+    client.targets = {"web1": {}, "web2": {}, "db1": {}}
+    client.defaults = {"user": "root"}
+    client.mods = {}
+    client.fsclient = None
+    client.thin = None
+    return client
+
+
+def test_handle_ssh_threads(ssh_runner):
+    """
+    Test running the targets in a pool of threads, each with a file client
+    of its own
+    """
+
+    def handle_routine(que, opts, host, target, mine=False, fsclient=None):
+        assert target == {"host": host, "user": "root"}
+        if host == "db1":
+            raise Exception("db1 is down")
+        que.put({"id": host, "ret": fsclient})
+
+    ssh_runner.opts.update({"ssh_use_threads": True, "ssh_max_procs": 2})
+    ssh_runner.handle_routine = handle_routine
+    with patch(
+        "salt.fileclient.FSClient", MagicMock(side_effect=lambda opts: object())
+    ):
+        ret = {}
+        for host_ret in ssh_runner.handle_ssh():
+            ret.update(host_ret)
+    assert sorted(ret) == ["db1", "web1", "web2"]
+    assert ret["db1"] == (
+        "Target 'db1' did not return any data, probably due to an error."
+    )
+    assert ret["web1"] is not None and ret["web2"] is not None
+
+
+# A stand-in for ssh connecting to an sshd. Opening a connection costs a
+# handshake, a command sent through the control master of the host does not.
+FAKE_SSH = """#!/bin/bash
+host="$1"
+control=""
+persist=""
+for arg in "$@"; do
+    case "$arg" in
+        ControlPath=*) control="${arg#ControlPath=}" ;;
+        ControlPersist=*) persist=1 ;;
+    esac
+done
+control="${control/\\%C/$host}"
+if [ -z "$control" ] || [ ! -e "$control" ]; then
+    sleep 0.05
+    if [ -n "$persist" ]; then
+        touch "$control"
+    fi
+fi
+echo ok
+"""
+
+
+class FakeSingle:
+    """
+    Runs the four ssh commands of a salt-ssh call on a host
+    """
+
+    def __init__(self, opts, argv, id_, host, **kwargs):
+        self.id = id_
+        self.shell = salt.client.ssh.shell.Shell(opts, host)
+
+    def run(self):
+        for cmd in ("pre-flight", "check-thin-dir", "deploy", "shim"):
+            stdout, stderr, retcode = self.shell.exec_cmd(cmd)
+        return stdout, stderr, retcode
+
+
+@pytest.mark.slow_test
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_handle_ssh_benchmark(ssh_runner, tmp_path, monkeypatch):
+    """
+    Compare running the targets in a process each with a connection per
+    command, with running them in threads through a shared connection each
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_ssh = bin_dir / "ssh"
+    fake_ssh.write_text(FAKE_SSH)
+    fake_ssh.chmod(0o755)
+    monkeypatch.setenv("PATH", "{}{}{}".format(bin_dir, os.pathsep, os.environ["PATH"]))
+    ssh_runner.targets = {"host{}".format(num): {} for num in range(12)}
+    ssh_runner.opts["ssh_max_procs"] = 4
+
+    timings = {}
+    with patch("salt.client.ssh.Single", FakeSingle), patch(
+        "salt.fileclient.FSClient", MagicMock()
+    ):
+        for use_threads, persist in ((False, 0), (True, 60)):
+            ssh_runner.opts["ssh_use_threads"] = use_threads
+            ssh_runner.opts["ssh_control_persist"] = persist
+            start = time.time()
+            ret = {}
+            for host_ret in ssh_runner.handle_ssh():
+                ret.update(host_ret)
+            timings[use_threads] = time.time() - start
+            assert ret == {
+                host: {"stdout": "ok\n", "stderr": "", "retcode": 0}
+                for host in ssh_runner.targets
+            }
+    print(
+        "processes, connection per command: {:.2f}s; "
+        "threads, shared connections: {:.2f}s".format(timings[False], timings[True])
+    )
+    assert timings[True] < timings[False]
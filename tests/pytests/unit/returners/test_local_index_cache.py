@@ -0,0 +1,192 @@
+"""
+Unit tests for the indexed local job cache (local_index_cache)
+"""
+import datetime
+import logging
+import os
+import time
+
+import pytest
+import salt.returners.local_cache as local_cache
+import salt.returners.local_index_cache as local_index_cache
+import salt.utils.jid
+
+log = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def configure_loader_modules(tmp_path):
+    opts = {
+        "cachedir": str(tmp_path),
+        "hash_type": "sha256",
+        "keep_jobs": 24,
+        "unique_jid": False,
+    }
+    return {local_cache: {"__opts__": opts}, local_index_cache: {"__opts__": opts}}
+
+
+def _old_jid(hours):
+    return "{:%Y%m%d%H%M%S%f}".format(
+        datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
+    )
+
+
+def _load(jid, fun="test.ping"):
+    return {
+        "jid": jid,
+        "fun": fun,
+        "arg": [],
+        "tgt": "minion*",
+        "tgt_type": "glob",
+        "user": "root",
+    }
+
+
+def _ret(jid, minion, ret=True):
+    return {
+        "jid": jid,
+        "id": minion,
+        "return": ret,
+        "retcode": 0,
+        "success": True,
+        "fun": "test.ping",
+    }
+
+
+def _store_job(cache, jid=None, fun="test.ping", minions=("minion1", "minion2")):
+    jid = cache.prep_jid(passed_jid=jid)
+    cache.save_load(jid, _load(jid, fun), minions=list(minions))
+    for minion in minions:
+        cache.returner(_ret(jid, minion))
+    return jid
+
+
+def test_job_roundtrip():
+    jid = local_index_cache.prep_jid()
+    assert salt.utils.jid.is_jid(jid)
+    local_index_cache.save_load(jid, _load(jid), minions=["minion1", "minion2"])
+    local_index_cache.returner(_ret(jid, "minion1"))
+    local_index_cache.returner_batch([dict(_ret(jid, "minion2", ret="two"), out="txt")])
+
+    load = local_index_cache.get_load(jid)
+    assert load["fun"] == "test.ping"
+    assert load["Minions"] == ["minion1", "minion2"]
+    assert local_index_cache.get_jid(jid) == {
+        "minion1": {"return": True, "retcode": 0, "success": True},
+        "minion2": {"return": "two", "retcode": 0, "success": True, "out": "txt"},
+    }
+    assert local_index_cache.get_load("20010101000000000000") == {}
+    assert local_index_cache.get_jid("20010101000000000000") == {}
+
+
+def test_extra_return_dropped():
+    jid = _store_job(local_index_cache, minions=["minion1"])
+    assert local_index_cache.returner(_ret(jid, "minion1", ret="again")) is False
+    assert local_index_cache.get_jid(jid)["minion1"]["return"] is True
+    # The load of the returns does not replace the load of the job
+    local_index_cache.save_load(jid, _ret(jid, "minion1"))
+    assert local_index_cache.get_load(jid)["tgt"] == "minion*"
+
+
+def test_unknown_and_nocache_jobs():
+    assert local_index_cache.returner(_ret("20010101000000000000", "minion1")) is False
+
+    jid = local_index_cache.prep_jid(nocache=True)
+    local_index_cache.returner(_ret(jid, "minion1"))
+    assert local_index_cache.get_jid(jid) == {}
+
+    ret = _ret("req", "minion1")
+    local_index_cache.returner(ret)
+    assert salt.utils.jid.is_jid(ret["jid"])
+    assert local_index_cache.get_jid(ret["jid"]) == {
+        "minion1": {"return": True, "retcode": 0, "success": True}
+    }
+
+
+def test_get_jids():
+    jids = [
+        _store_job(local_index_cache, jid=_old_jid(hours), fun=fun)
+        for hours, fun in ((5, "test.ping"), (3, "saltutil.find_job"), (1, "test.echo"))
+    ]
+
+    ret = local_index_cache.get_jids()
+    assert sorted(ret) == jids
+    assert ret[jids[2]]["Function"] == "test.echo"
+
+    assert sorted(local_index_cache.get_jids_range(start=jids[1])) == jids[1:]
+    assert sorted(local_index_cache.get_jids_range(end=jids[1])) == jids[:2]
+    assert sorted(local_index_cache.get_jids_range(end=jids[1][:10])) == jids[:2]
+
+    ret = local_index_cache.get_jids_filter(2)
+    assert [job["JID"] for job in ret] == [jids[0], jids[2]]
+    ret = local_index_cache.get_jids_filter(2, filter_find_job=False)
+    assert [job["JID"] for job in ret] == jids[1:]
+
+
+def test_endtime():
+    jid = _store_job(local_index_cache)
+    assert local_index_cache.get_endtime(jid) is False
+    local_index_cache.update_endtime(jid, "2021, Mar 16 19:00:00.000000")
+    assert local_index_cache.get_endtime(jid) == "2021, Mar 16 19:00:00.000000"
+
+
+def test_clean_old_jobs():
+    old = _store_job(local_index_cache, jid=_old_jid(30))
+    new = _store_job(local_index_cache, jid=_old_jid(1))
+    segments = os.listdir(local_index_cache._index_dir())
+    assert old[:10] + ".seg" in segments
+
+    local_index_cache.clean_old_jobs()
+
+    assert sorted(local_index_cache.get_jids()) == [new]
+    assert local_index_cache.get_jid(old) == {}
+    assert local_index_cache.get_load(old) == {}
+    assert len(local_index_cache.get_jid(new)) == 2
+    segments = os.listdir(local_index_cache._index_dir())
+    assert old[:10] + ".seg" not in segments
+    assert new[:10] + ".seg" in segments
+
+
+def test_import_local_cache():
+    jid = _store_job(local_cache, minions=["minion1", "minion2"])
+    local_cache.save_minions(jid, ["minion3"], syndic_id="syndic")
+    local_cache.update_endtime(jid, "2021, Mar 16 19:00:00.000000")
+    nocache = local_cache.prep_jid(nocache=True)
+
+    assert local_index_cache.import_local_cache() == 2
+    # Jobs are only imported once
+    assert local_index_cache.import_local_cache() == 0
+
+    assert local_index_cache.get_load(jid) == local_cache.get_load(jid)
+    assert local_index_cache.get_jid(jid) == local_cache.get_jid(jid)
+    assert local_index_cache.get_endtime(jid) == local_cache.get_endtime(jid)
+    assert local_index_cache.get_jids() == local_cache.get_jids()
+    local_index_cache.returner(_ret(nocache, "minion1"))
+    assert local_index_cache.get_jid(nocache) == {}
+
+
+@pytest.mark.slow_test
+def test_lookup_benchmark():
+    """
+    Compare the job lookups of local_cache and local_index_cache
+    """
+    jobs = 2000
+    jids = [_old_jid(idx / 100) for idx in range(jobs)]
+    minions = ["minion{}".format(idx) for idx in range(5)]
+    for cache in (local_cache, local_index_cache):
+        for jid in jids:
+            _store_job(cache, jid=jid, minions=minions)
+
+    results = {}
+    for cache in (local_cache, local_index_cache):
+        start = time.time()
+        listed = cache.get_jids_filter(50)
+        latest = cache.get_jid(listed[-1]["JID"])
+        results[cache.__name__] = (time.time() - start, listed, latest)
+        log.info(
+            "%s: listed the latest jobs of %d in %.3f seconds",
+            cache.__name__,
+            jobs,
+            results[cache.__name__][0],
+        )
+    assert results[local_cache.__name__][1:] == results[local_index_cache.__name__][1:]
@@ -4,6 +4,7 @@
 
 import copy
 import logging
+import time
 
 import pytest
 import salt.utils.platform
@@ -64,6 +65,47 @@ def test_job_result_return_failure(master_config):
             next(ret)
 
 
+def test_job_heartbeats_replace_find_job(master_config):
+    """
+    A minion which sends heartbeats for the job is not asked whether it is
+    still running it, and is waited for as long as the heartbeats go on
+    """
+    jid = "20210101000000000001"
+    start = time.time()
+    last_heartbeat = [start]
+    returned = []
+
+    def get_event(tag="", **kwargs):
+        now = time.time()
+        if tag != "salt/job/{}".format(jid) or returned:
+            return None
+        if now - start > 2.5:
+            returned.append(True)
+            return {
+                "tag": "salt/job/{}/ret/m1".format(jid),
+                "data": {"id": "m1", "jid": jid, "return": True},
+            }
+        if now - last_heartbeat[0] > 0.2:
+            last_heartbeat[0] = now
+            return {
+                "tag": "salt/job/{}/heartbeat/m1".format(jid),
+                "data": {"id": "m1", "jid": jid, "interval": 0},
+            }
+        return None
+
+    with client.LocalClient(mopts=master_config) as local_client:
+        local_client.event.get_event = get_event
+        local_client.returns_for_job = MagicMock(return_value=True)
+        local_client.gather_job_info = MagicMock()
+        ret = list(
+            local_client.get_iter_returns(
+                jid, {"m1"}, timeout=1, gather_job_timeout=1, expect_minions=True
+            )
+        )
+    assert ret == [{"m1": {"ret": True, "jid": jid}}]
+    local_client.gather_job_info.assert_not_called()
+
+
 def test_create_local_client(master_config):
     with client.LocalClient(mopts=master_config) as local_client:
         assert isinstance(
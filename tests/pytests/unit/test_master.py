@@ -14,3 +14,87 @@ def test_fileserver_duration():
         update.called_once()
         # Timeout is 1 second
         assert 2 > end - start > 1
+
+
+def _worker_pool(**kwargs):
+    opts = {
+        "worker_threads": 2,
+        "worker_threads_max": 4,
+        "worker_threads_idle_timeout": 300,
+        "worker_threads_scale_interval": 5,
+        "worker_threads_priority": 1,
+        "worker_threads_priority_cmds": ["_auth", "_return"],
+    }
+    opts.update(kwargs)
+    pool = salt.master.MWorkerPool(opts)
+    for slot in range(pool.priority_workers + pool.min_workers):
+        pool.states[slot] = pool.RUNNING
+        pool.idle[slot] = 1000
+    return pool
+
+
+def test_worker_pool_lane():
+    pool = _worker_pool()
+    payload = b"\xc1payload"
+
+    assert pool.lane([b"minion", b"", b"_auth", payload]) == pool.PRIORITY
+    assert pool.lane([b"minion", b"", b"_return", payload]) == pool.PRIORITY
+    assert pool.lane([b"minion", b"", b"_pillar", payload]) == pool.GENERAL
+    assert pool.lane([b"minion", b"", payload]) == pool.GENERAL
+    assert pool.lane([b"_auth", b"", payload]) == pool.GENERAL
+    assert pool.lane([payload]) == pool.GENERAL
+    pool.priority_workers = 0
+    assert pool.lane([b"minion", b"", b"_auth", payload]) == pool.GENERAL
+
+
+def test_worker_pool_idle_slot():
+    pool = _worker_pool()
+    assert pool.idle_slot(pool.PRIORITY) == 0
+    assert pool.idle_slot(pool.GENERAL) == 1
+    pool.busy[0] = pool.busy[1] = 1000
+    # Priority requests overflow to the general workers
+    assert pool.idle_slot(pool.PRIORITY) == 2
+    pool.busy[2] = 1000
+    assert pool.idle_slot(pool.GENERAL) is None
+
+
+def test_worker_pool_scale():
+    pool = _worker_pool()
+    assert pool.scale(now=1010) == ([], [])
+
+    # All of the general workers are busy and requests are waiting
+    pool.busy[1] = pool.busy[2] = 1005
+    pool.backlog[pool.GENERAL] = 1
+    pool.backlog[pool.PRIORITY] = 5
+    assert pool.scale(now=1010) == ([3, 4], [])
+    # The pool does not grow past worker_threads_max
+    pool.busy[3] = pool.busy[4] = 1010
+    assert pool.scale(now=1011) == ([], [])
+
+    # The extra workers are drained and then stopped once they stay idle
+    pool.backlog[pool.GENERAL] = pool.backlog[pool.PRIORITY] = 0
+    for slot in range(1, 5):
+        pool.busy[slot] = 0
+        pool.idle[slot] = 1020
+    assert pool.scale(now=1100) == ([], [])
+    assert pool.scale(now=1400) == ([], [])
+    assert list(pool.states) == [pool.RUNNING] * 3 + [pool.DRAINING] * 2
+    # A request routed to a draining worker keeps it running
+    pool.busy[3] = 1400
+    assert pool.scale(now=1401) == ([], [4])
+    # and an other idle worker is drained instead
+    assert list(pool.states) == [
+        pool.RUNNING,
+        pool.RUNNING,
+        pool.DRAINING,
+        pool.RUNNING,
+        pool.STOPPED,
+    ]
+
+
+def test_worker_pool_scale_busy_workers():
+    pool = _worker_pool()
+    pool.busy[1] = pool.busy[2] = 1000
+    # No request is waiting yet, but the workers are stuck
+    assert pool.scale(now=1004) == ([], [])
+    assert pool.scale(now=1006) == ([3], [])
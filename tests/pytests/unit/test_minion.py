@@ -100,3 +100,40 @@ def test_mine_send_tries(req_channel_factory):
 
         rtn = minion._mine_send(tag, data)
         assert rtn == 20
+
+
+def test_fire_job_heartbeats():
+    """
+    The heartbeats of all of the running jobs are sent in a single request
+    """
+    opts = {
+        "random_startup_delay": 0,
+        "grains": {},
+        "id": "minion1",
+        "job_heartbeat_interval": 5,
+    }
+    with patch("salt.loader.grains"):
+        minion = salt.minion.Minion(opts)
+    running = [{"jid": "20210101000000000001"}, {"jid": "20210101000000000002"}]
+    with patch("salt.utils.minion.running", return_value=running), patch.object(
+        minion, "_fire_master"
+    ) as fire_master:
+        minion._fire_job_heartbeats()
+    fire_master.assert_called_once_with(
+        events=[
+            {
+                "tag": "salt/job/{}/heartbeat/minion1".format(job["jid"]),
+                "data": {"id": "minion1", "jid": job["jid"], "interval": 5},
+            }
+            for job in running
+        ],
+        timeout=5,
+        sync=False,
+    )
+
+    # Nothing is sent while no job is running
+    with patch("salt.utils.minion.running", return_value=[]), patch.object(
+        minion, "_fire_master"
+    ) as fire_master:
+        minion._fire_job_heartbeats()
+    fire_master.assert_not_called()
@@ -3,17 +3,24 @@
 """
 
 import hashlib
+import threading
+import time
 
 import salt.config
+import salt.crypt
 import salt.exceptions
 import salt.ext.tornado.gen
 import salt.ext.tornado.ioloop
 import salt.log.setup
+import salt.master
+import salt.payload
 import salt.transport.client
 import salt.transport.server
 import salt.utils.platform
 import salt.utils.process
 import salt.utils.stringutils
+import zmq
+from saltfactories.utils.ports import get_unused_localhost_port
 from salt.transport.zeromq import AsyncReqMessageClientPool
 from tests.support.mock import MagicMock, call, patch
 
@@ -251,3 +258,190 @@ def test_zeromq_async_pub_channel_filtering_decode_message(
             res = channel._decode_messages(message)
 
     assert res.result()["enc"] == "aes"
+
+
+def test_zeromq_pub_server_channel_publish_matched_minions(temp_salt_master):
+    """
+    test ZeroMQPubServerChannel.publish uses the minions matched by the master
+    """
+    opts = dict(
+        temp_salt_master.config.copy(),
+        zmq_filtering=True,
+        sign_pub_messages=False,
+        publish_stats=True,
+    )
+    with patch("salt.master.SMaster.secrets") as secrets, patch(
+        "salt.crypt.Crypticle"
+    ) as crypticle, patch(
+        "salt.utils.minions.CkMinions.check_minions"
+    ) as check_minions, patch.object(
+        salt.transport.zeromq.ZeroMQPubServerChannel, "pub_sock", MagicMock()
+    ) as pub_sock:
+        crypticle.return_value.dumps.return_value = b"encrypted"
+        channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
+        load = {"jid": "20210316190000000000", "tgt_type": "glob", "tgt": "minion*"}
+
+        channel.publish(load, minions=["minion01", "minion02"])
+        check_minions.assert_not_called()
+        payload = channel.serial.loads(pub_sock.send.call_args[0][0])
+        assert payload["topic_lst"] == ["minion01", "minion02"]
+        assert payload["jid"] == "20210316190000000000"
+        assert sorted(channel.publish_stats) == ["encrypt", "serialize"]
+
+        # The target is matched when the minions are not known
+        check_minions.return_value = {"minions": ["minion03"]}
+        channel.publish(load)
+        check_minions.assert_called_once_with("minion*", tgt_type="glob")
+        payload = channel.serial.loads(pub_sock.send.call_args[0][0])
+        assert payload["topic_lst"] == ["minion03"]
+        assert "match" in channel.publish_stats
+
+
+def test_zeromq_topic_hash():
+    """
+    test the zmq topics are the hashed minion ids
+    """
+    assert salt.transport.zeromq._topic_hash(
+        "minion"
+    ) == salt.utils.stringutils.to_bytes(hashlib.sha1(b"minion").hexdigest())
+
+
+def test_zeromq_req_server_channel_worker_pool(temp_salt_master, tmp_path):
+    """
+    test the request server device routes the requests to the idle workers of
+    the adaptive worker pool, and the priority commands to the priority lane
+    """
+    opts = dict(
+        temp_salt_master.config.copy(),
+        interface="127.0.0.1",
+        ret_port=get_unused_localhost_port(),
+        sock_dir=str(tmp_path),
+        ipc_mode="ipc",
+        zmq_monitor=False,
+        worker_threads=1,
+        worker_threads_max=2,
+        worker_threads_priority=1,
+    )
+    pool = salt.master.MWorkerPool(opts)
+    pool.states[0] = pool.states[1] = pool.RUNNING
+    serial = salt.payload.Serial(opts)
+    pillar = [serial.dumps({"enc": "aes", "load": b"pillar"})]
+    auth = [b"_auth", serial.dumps({"enc": "clear", "load": {"cmd": "_auth"}})]
+
+    channel = salt.transport.zeromq.ZeroMQReqServerChannel(opts)
+    channel.worker_pool = pool
+    context = zmq.Context()
+    sockets = []
+
+    def _socket(kind, uri):
+        sock = context.socket(kind)
+        sock.setsockopt(zmq.LINGER, 0)
+        sock.connect(uri)
+        sockets.append(sock)
+        return sock
+
+    def _recv(sock):
+        assert sock.poll(5000)
+        return sock.recv_multipart()
+
+    with patch.object(
+        salt.transport.zeromq.ZeroMQReqServerChannel,
+        "_ZeroMQReqServerChannel__setup_signals",
+    ):
+        device = threading.Thread(target=channel.zmq_device)
+        device.start()
+    try:
+        priority_worker = _socket(zmq.REP, channel._pool_worker_uri(0))
+        worker = _socket(zmq.REP, channel._pool_worker_uri(1))
+        uri = "tcp://127.0.0.1:{}".format(opts["ret_port"])
+        clients = [_socket(zmq.REQ, uri) for _ in range(3)]
+
+        clients[0].send_multipart(pillar)
+        assert _recv(worker) == pillar
+        assert pool.busy[1]
+        # The worker is busy, the authentication goes to the priority worker
+        clients[1].send_multipart(auth)
+        assert _recv(priority_worker) == auth
+        priority_worker.send(b"authenticated")
+        assert _recv(clients[1]) == [b"authenticated"]
+        # and the next pillar request waits for the worker
+        clients[2].send_multipart(pillar)
+        start = time.time()
+        while not pool.backlog[pool.GENERAL] and time.time() - start < 5:
+            time.sleep(0.01)
+        assert pool.backlog[pool.GENERAL] == 1
+        assert not priority_worker.poll(200)
+
+        worker.send(b"pillar1")
+        assert _recv(clients[0]) == [b"pillar1"]
+        assert _recv(worker) == pillar
+        worker.send(b"pillar2")
+        assert _recv(clients[2]) == [b"pillar2"]
+        assert pool.backlog[pool.GENERAL] == 0
+    finally:
+        channel._closing = True
+        device.join()
+        for sock in sockets:
+            sock.close()
+        context.term()
+        channel._closing = False
+        channel.close()
+
+
+def test_zeromq_req_server_channel_priority_worker(temp_salt_master):
+    """
+    test the priority workers of the adaptive worker pool reject the requests
+    whose command does not match their routing frame
+    """
+    opts = dict(
+        temp_salt_master.config.copy(),
+        worker_threads=1,
+        worker_threads_max=2,
+        worker_threads_priority=1,
+    )
+    channel = salt.transport.zeromq.ZeroMQReqServerChannel(opts)
+    channel.worker_pool = salt.master.MWorkerPool(opts)
+    channel.serial = salt.payload.Serial(opts)
+    channel.payload_handler = MagicMock(
+        return_value=salt.ext.tornado.gen.maybe_future(({}, {"fun": "send_clear"}))
+    )
+    stream = MagicMock()
+    request = [
+        b"_return",
+        channel.serial.dumps({"enc": "clear", "load": {"cmd": "publish"}}),
+    ]
+
+    channel.worker_slot = 0
+    channel.handle_message(stream, request)
+    channel.payload_handler.assert_not_called()
+    stream.send.assert_called_once_with(
+        channel.serial.dumps("bad load: cmd does not match its route")
+    )
+
+    stream.reset_mock()
+    channel.worker_slot = 1
+    channel.handle_message(stream, request)
+    channel.payload_handler.assert_called_once()
+    stream.send.assert_called_once_with(channel.serial.dumps({}))
+
+
+def test_zeromq_async_req_channel_route(temp_salt_minion):
+    """
+    test minions only send a routing frame for the commands the master
+    advertised in its auth reply
+    """
+    opts = temp_salt_minion.config.copy()
+    channel = MagicMock(opts=opts, master_uri="tcp://127.0.0.1:4506")
+    key = (opts["pki_dir"], opts["id"], channel.master_uri)
+    creds = {"aes": "aes", "publish_port": 4505}
+
+    def _route(load):
+        return salt.transport.zeromq.AsyncZeroMQReqChannel._route(channel, load)
+
+    with patch.dict(salt.crypt.AsyncAuth.creds_map, {key: creds}):
+        assert _route({"cmd": "_return"}) is None
+        creds["route_cmds"] = ["_auth", "_return"]
+        assert _route({"cmd": "_return"}) == b"_return"
+        assert _route({"cmd": "_pillar"}) is None
+        assert _route("") is None
+    assert _route({"cmd": "_return"}) is None
@@ -975,3 +975,90 @@ def test_eval_when_splay_in_past(schedule):
     ret = schedule.job_status(job_name)
     assert "_last_run" not in ret
     assert ret["_next_fire_time"] is None
+
+
+def test_eval_seconds_deferred(schedule):
+    """
+    verify that jobs are not evaluated again before their next fire time,
+    unless they are modified
+    """
+    job_name = "test_eval_seconds_deferred"
+    job = {
+        "schedule": {
+            job_name: {"function": "test.ping", "seconds": 30, "dry_run": True}
+        }
+    }
+    schedule.opts.update(job)
+
+    run_time = dateutil.parser.parse("11/29/2017 2:00pm")
+    next_run_time = run_time + datetime.timedelta(seconds=30)
+    schedule.eval(now=run_time)
+    assert schedule._deferred[job_name][0] == next_run_time
+
+    with patch("itertools.combinations", MagicMock()) as combinations:
+        schedule.eval(now=run_time + datetime.timedelta(seconds=10))
+        combinations.assert_not_called()
+    ret = schedule.job_status(job_name)
+    assert "_last_run" not in ret
+    assert ret["_next_fire_time"] == next_run_time
+
+    # The job is due at its next fire time
+    schedule.eval(now=next_run_time)
+    ret = schedule.job_status(job_name)
+    assert ret["_last_run"] == next_run_time
+    assert ret["_next_fire_time"] == next_run_time + datetime.timedelta(seconds=30)
+
+    # Disabling the job is seen on the next evaluation
+    with patch("salt.utils.event.get_event", MagicMock()), patch.object(
+        schedule, "persist", MagicMock()
+    ):
+        schedule.disable_job(job_name)
+    schedule.eval(now=next_run_time + datetime.timedelta(seconds=10))
+    ret = schedule.job_status(job_name)
+    assert ret["_skip_reason"] == "disabled"
+    assert job_name not in schedule._deferred
+
+    # and so is replacing the job
+    schedule.opts["schedule"][job_name] = {
+        "function": "test.ping",
+        "seconds": 10,
+        "dry_run": True,
+    }
+    schedule.eval(now=next_run_time + datetime.timedelta(seconds=20))
+    ret = schedule.job_status(job_name)
+    assert ret["_next_fire_time"] == next_run_time + datetime.timedelta(seconds=30)
+
+
+@pytest.mark.slow_test
+def test_eval_deferred_benchmark(schedule):
+    """
+    compare evaluating a schedule of 1000 interval jobs every second with
+    and without deferring the jobs which are not due
+    """
+    schedule.opts["schedule"] = {
+        "job{}".format(idx): {
+            "function": "test.ping",
+            "minutes": 60 + idx,
+            "dry_run": True,
+        }
+        for idx in range(1000)
+    }
+    run_time = dateutil.parser.parse("11/29/2017 2:00pm")
+    schedule.eval(now=run_time)
+
+    def _evals(undefer):
+        start = time.time()
+        for second in range(1, 11):
+            if undefer:
+                schedule._undefer()
+            schedule.eval(now=run_time + datetime.timedelta(seconds=second))
+        return time.time() - start
+
+    full = _evals(True)
+    deferred = _evals(False)
+    log.debug(
+        "10 evaluations of 1000 jobs took %.3fs, %.3fs when deferred",
+        full,
+        deferred,
+    )
+    assert deferred < full
@@ -1,7 +1,17 @@
+import logging
+import os
+import time
+
+import pytest
+import salt.cache
+import salt.config
+import salt.utils.files
 import salt.utils.minions
 import salt.utils.network
 from tests.support.mock import patch
 
+log = logging.getLogger(__name__)
+
 
 def test_connected_ids():
     """
@@ -20,3 +30,158 @@ def test_connected_ids():
         with patch_net, patch_list, patch_fetch:
             ret = ckminions.connected_ids()
             assert ret == {minion}
+
+
+@pytest.fixture
+def minion_data_index_opts(tmp_path):
+    pki_dir = tmp_path / "pki"
+    (pki_dir / "minions").mkdir(parents=True)
+    cachedir = tmp_path / "cache"
+    cachedir.mkdir()
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update(
+        {
+            "pki_dir": str(pki_dir),
+            "cachedir": str(cachedir),
+            "minion_data_cache": True,
+            "minion_data_index": True,
+            "key_cache": "",
+        }
+    )
+    yield opts
+    salt.utils.minions._MINION_DATA_INDEXES.clear()
+
+
+def _populate_minion_data(opts, count):
+    cache = salt.cache.factory(opts)
+    oses = ["Ubuntu", "CentOS", "Debian", "Windows"]
+    for idx in range(count):
+        minion_id = "minion{}".format(idx)
+        with salt.utils.files.fopen(
+            os.path.join(opts["pki_dir"], "minions", minion_id), "w"
+        ) as fp_:
+            fp_.write("key")
+        grains = {
+            "os": oses[idx % len(oses)],
+            "num_cpus": idx % 8,
+            "roles": ["web", "db"] if idx % 3 else ["web"],
+            "ip_interfaces": {"eth0": ["10.0.{}.{}".format(idx // 250, idx % 250)]},
+            "disks": [{"name": "sda", "size": idx % 2}],
+        }
+        pillar = {"env": "prod" if idx % 2 else "dev", "app": {"tier": "front"}}
+        cache.store(
+            "minions/{}".format(minion_id), "data", {"grains": grains, "pillar": pillar}
+        )
+    return cache
+
+
+@pytest.mark.parametrize(
+    "tgt_type,expr",
+    [
+        ("grain", "os:Ubuntu"),
+        ("grain", "os:ubuntu"),
+        ("grain", "os:Cent*"),
+        ("grain", "os:Solaris"),
+        ("grain", "num_cpus:3"),
+        ("grain", "roles:db"),
+        ("grain", "roles:*"),
+        ("grain", "ip_interfaces:eth0:10.0.1.*"),
+        ("grain", "ip_interfaces:eth0"),
+        ("grain", "ip_interfaces:*"),
+        ("grain", "disks:name:sda"),
+        ("grain", "disks:size:1"),
+        ("grain", "*:Windows"),
+        ("grain", "nothing"),
+        ("grain_pcre", "os:(Ubuntu|Debian)"),
+        ("grain_pcre", "roles:d.*"),
+        ("grain_pcre", "os:["),
+        ("pillar", "env:prod"),
+        ("pillar", "app:tier:front"),
+        ("pillar", "app:*:front"),
+        ("pillar_pcre", "env:pro.*"),
+        ("pillar_exact", "env:prod"),
+        ("pillar_exact", "env:pro*"),
+        ("compound", "G@os:Ubuntu and I@env:prod"),
+    ],
+)
+def test_minion_data_index_matches_cache_scan(minion_data_index_opts, tgt_type, expr):
+    """
+    test that the minion data index targets the same minions as the scan of
+    the minion data cache
+    """
+    _populate_minion_data(minion_data_index_opts, 40)
+    scan_opts = dict(minion_data_index_opts, minion_data_index=False)
+    for greedy in (True, False):
+        expected = salt.utils.minions.CkMinions(scan_opts).check_minions(
+            expr, tgt_type, greedy=greedy
+        )
+        ret = salt.utils.minions.CkMinions(minion_data_index_opts).check_minions(
+            expr, tgt_type, greedy=greedy
+        )
+        assert sorted(ret["minions"]) == sorted(expected["minions"])
+
+
+def test_minion_data_index_update(minion_data_index_opts):
+    """
+    test that minion data written after the index was built is picked up
+    """
+    cache = _populate_minion_data(minion_data_index_opts, 4)
+    ckminions = salt.utils.minions.CkMinions(minion_data_index_opts)
+    assert ckminions.check_minions("os:Gentoo", "grain")["minions"] == []
+
+    # A write announced by another process is picked up by the refresh
+    cache.store("minions/minion1", "data", {"grains": {"os": "Gentoo"}})
+    cache.store(
+        salt.utils.minions.MinionDataIndex.BANK,
+        salt.utils.minions.MinionDataIndex.KEY,
+        "changed",
+    )
+    assert ckminions.check_minions("os:Gentoo", "grain")["minions"] == ["minion1"]
+
+    # A write announced by this process updates the index right away
+    mdata = {"grains": {"os": "Gentoo"}}
+    cache.store("minions/minion2", "data", mdata)
+    salt.utils.minions.update_minion_data_index(
+        minion_data_index_opts, cache, "minion2", mdata
+    )
+    assert sorted(ckminions.check_minions("os:Gentoo", "grain")["minions"]) == [
+        "minion1",
+        "minion2",
+    ]
+
+    # Removed minions are dropped from the index
+    cache.flush("minions/minion1")
+    salt.utils.minions.update_minion_data_index(
+        minion_data_index_opts, cache, "minion1"
+    )
+    ret = ckminions.check_minions("os:Gentoo", "grain", greedy=False)
+    assert ret["minions"] == ["minion2"]
+
+
+@pytest.mark.slow_test
+def test_minion_data_index_benchmark(minion_data_index_opts):
+    """
+    Compare grain targeting through the minion data index with the scan of
+    the minion data cache
+    """
+    _populate_minion_data(minion_data_index_opts, 2000)
+    scan = salt.utils.minions.CkMinions(
+        dict(minion_data_index_opts, minion_data_index=False)
+    )
+    indexed = salt.utils.minions.CkMinions(minion_data_index_opts)
+    # Build the index outside of the measurement
+    indexed.check_minions("os:Ubuntu", "grain", greedy=False)
+
+    timings = {}
+    for name, ckminions in (("scan", scan), ("index", indexed)):
+        start = time.perf_counter()
+        for expr in ("os:Ubuntu", "roles:db", "os:Cent*"):
+            ckminions.check_minions(expr, "grain", greedy=False)
+        ckminions.check_minions("os:(Ubuntu|Debian)", "grain_pcre", greedy=False)
+        timings[name] = time.perf_counter() - start
+    log.debug(
+        "Minion data targeting over 2000 minions, scan: %.4fs, index: %.4fs",
+        timings["scan"],
+        timings["index"],
+    )
+    assert timings["index"] * 10 < timings["scan"]
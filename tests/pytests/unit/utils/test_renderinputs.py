@@ -0,0 +1,77 @@
+import salt.utils.json
+import salt.utils.renderinputs
+import salt.utils.yaml
+
+
+def _sources(grains):
+    return {"grains": grains, "pillar": {}, "opts": {}, "salt": {"test.echo": None}}
+
+
+def _echo(name, args, kwargs):
+    assert name == "test.echo"
+    return args[0]
+
+
+def test_tracked_dict_keys():
+    inputs = salt.utils.renderinputs.RenderInputs()
+    context = {"grains": {"os": "Ubuntu", "kernel": "Linux", "id": "minion1"}}
+    inputs.wrap(context)
+    grains = context["grains"]
+    assert grains["os"] == "Ubuntu"
+    assert grains.get("osrelease") is None
+    assert "kernel" in grains
+    assert inputs.matches(_sources({"os": "Ubuntu", "kernel": "Linux"}), _echo)
+    assert not inputs.matches(_sources({"os": "Fedora", "kernel": "Linux"}), _echo)
+    assert not inputs.matches(
+        _sources({"os": "Ubuntu", "kernel": "Linux", "osrelease": "20.04"}), _echo
+    )
+
+
+def test_tracked_dict_whole():
+    for dump in (salt.utils.json.dumps, salt.utils.yaml.safe_dump, list, dict):
+        inputs = salt.utils.renderinputs.RenderInputs()
+        context = {"grains": {"os": "Ubuntu"}}
+        inputs.wrap(context)
+        dump(context["grains"])
+        assert inputs.matches(_sources({"os": "Ubuntu"}), _echo)
+        assert not inputs.matches(_sources({"os": "Ubuntu", "id": "x"}), _echo)
+
+
+def test_tracked_dict_changed():
+    inputs = salt.utils.renderinputs.RenderInputs()
+    grains = {"os": "Ubuntu"}
+    context = {"grains": grains}
+    inputs.wrap(context)
+    context["grains"]["role"] = "db"
+    assert grains["role"] == "db"
+    assert not inputs.matches(_sources(grains), _echo)
+
+
+def test_tracked_functions():
+    def echo(text):
+        return text
+
+    echo.echo = echo
+    inputs = salt.utils.renderinputs.RenderInputs()
+    context = {"salt": {"test.echo": echo, "test": echo}}
+    inputs.wrap(context)
+    assert context["salt"]["test.echo"]("hello") == "hello"
+    assert context["salt"]["test"].echo("world") == "world"
+    assert inputs.calls == [
+        ("test.echo", ("hello",), {}, "hello"),
+        ("test.echo", ("world",), {}, "world"),
+    ]
+    assert inputs.matches(_sources({}), _echo)
+    assert not inputs.matches(_sources({}), lambda *args: "changed")
+
+
+def test_record_file(tmp_path):
+    path = tmp_path / "include.jinja"
+    path.write_text("foo: bar")
+    with salt.utils.renderinputs.record() as inputs:
+        salt.utils.renderinputs.record_file(str(path), "foo: bar")
+    salt.utils.renderinputs.record_file(str(path), "ignored")
+    assert salt.utils.renderinputs.current() is None
+    assert inputs.matches(_sources({}), _echo)
+    path.write_text("foo: baz")
+    assert not inputs.matches(_sources({}), _echo)
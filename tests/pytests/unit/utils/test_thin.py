@@ -1,5 +1,10 @@
+import io
+import tarfile
+
 import pytest
+import salt.client.ssh.ssh_py_shim
 import salt.exceptions
+import salt.utils.hashutils
 import salt.utils.stringutils
 import salt.utils.thin
 from tests.support.mock import MagicMock, patch
@@ -76,3 +81,53 @@ def test_get_ext_tops(version):
     else:
         assert not [x for x in ret["namespace"]["dependencies"] if "distro" in x]
         assert [x for x in ret["namespace"]["dependencies"] if "msgpack" in x]
+
+
+def _make_tar(path, files):
+    with tarfile.open(str(path), "w:gz") as tfp:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tfp.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def test_gen_delta(tmp_path):
+    """
+    Test the delta of a thin holds the new and changed files, and unpacks
+    over the old thin into the files of the new one
+    """
+    cachedir = str(tmp_path / "cache")
+    old = _make_tar(
+        tmp_path / "old.tgz",
+        {"salt/a.py": b"a", "salt/b.py": b"b", "salt/c.py": b"c"},
+    )
+    new = _make_tar(
+        tmp_path / "new.tgz",
+        {"salt/a.py": b"a", "salt/b.py": b"B", "salt/d.py": b"d"},
+    )
+    assert salt.utils.thin.gen_delta(new, cachedir, "unknown") is None
+
+    old_key = salt.utils.thin.gen_manifest(old, cachedir)
+    assert old_key == salt.utils.hashutils.get_hash(old, "sha1")
+    delta = salt.utils.thin.gen_delta(new, cachedir, old_key)
+    with tarfile.open(delta) as tfp:
+        assert sorted(tfp.getnames()) == sorted(
+            ["salt/b.py", "salt/d.py", salt.utils.thin.DELTA_MANIFEST]
+        )
+    assert salt.utils.thin.gen_delta(new, cachedir, old_key) == delta
+
+    saltdir = tmp_path / "saltdir"
+    with tarfile.open(old) as tfp:
+        tfp.extractall(str(saltdir))
+    with tarfile.open(delta) as tfp:
+        tfp.extractall(str(saltdir))
+    checksum = salt.client.ssh.ssh_py_shim.apply_delta(str(saltdir))
+    assert checksum == salt.utils.hashutils.get_hash(new, "sha1")
+    assert sorted(p.name for p in (saltdir / "salt").iterdir()) == [
+        "a.py",
+        "b.py",
+        "d.py",
+    ]
+    assert (saltdir / "salt" / "b.py").read_bytes() == b"B"
+    assert not (saltdir / salt.utils.thin.DELTA_MANIFEST).exists()
@@ -14,8 +14,8 @@ from salt.utils.process import clean_proc
 
 
 @contextmanager
-def eventpublisher_process(sock_dir):
-    proc = salt.utils.event.EventPublisher({"sock_dir": sock_dir})
+def eventpublisher_process(sock_dir, **opts):
+    proc = salt.utils.event.EventPublisher(dict(opts, sock_dir=sock_dir))
     proc.start()
     try:
         if os.environ.get("TRAVIS_PYTHON_VERSION", None) is not None:
@@ -2,6 +2,8 @@
     :codeauthor: Nicole Thomas <nicole@saltstack.com>
 """
 
+import copy
+
 from salt.cli.batch import Batch
 from tests.support.mock import MagicMock, patch
 from tests.support.unit import TestCase
@@ -133,3 +135,62 @@ class BatchTestCase(TestCase):
             verbose=False,
             gather_job_timeout=5,
         )
+
+    def _stream_run(self, connected, ping_returns):
+        """
+        Run a streaming batch job on foo, bar and baz, with the given minions
+        connected to the master
+        """
+        self.batch.opts = {
+            "batch": "1",
+            "batch_stream": True,
+            "minion_data_cache": True,
+            "tgt": "*",
+            "tgt_type": "glob",
+            "timeout": 5,
+            "fun": "test.version",
+            "arg": [],
+            "gather_job_timeout": 5,
+        }
+        self.published = []
+
+        def cmd_iter_no_block(tgt, fun, *args, **kwargs):
+            self.published.append((fun, copy.copy(tgt)))
+            if fun == "test.ping":
+                return iter(ping_returns)
+            return iter([{tgt[0]: {"ret": "3005", "retcode": 0}}])
+
+        self.batch.local.cmd_iter_no_block = MagicMock(side_effect=cmd_iter_no_block)
+        ckminions = MagicMock()
+        ckminions.check_minions.return_value = {"minions": ["foo", "bar", "baz"]}
+        ckminions.connected_ids.return_value = set(connected)
+        with patch("salt.utils.minions.CkMinions", MagicMock(return_value=ckminions)):
+            ret = list(Batch.run(self.batch))
+        ckminions.connected_ids.assert_called_with(subset={"foo", "bar", "baz"})
+        return ret
+
+    def test_run_stream(self):
+        """
+        The connected minions are started right away, and the others as soon
+        as they return the discovery ping
+        """
+        ret = self._stream_run(["foo", "bar"], [None, {"baz": {"ret": True}}, None])
+        self.assertEqual(ret, [{"bar": "3005"}, {"foo": "3005"}, {"baz": "3005"}])
+        self.assertEqual(
+            self.published,
+            [
+                ("test.version", ["bar"]),
+                ("test.ping", "*"),
+                ("test.version", ["foo"]),
+                ("test.version", ["baz"]),
+            ],
+        )
+        self.batch.local.cmd_iter.assert_not_called()
+
+    def test_run_stream_all_connected(self):
+        """
+        No discovery ping is sent when all of the targeted minions are connected
+        """
+        ret = self._stream_run(["foo", "bar", "baz"], [])
+        self.assertEqual(len(ret), 3)
+        self.assertNotIn("test.ping", [fun for fun, _ in self.published])
@@ -12,6 +12,7 @@ import tempfile
 import time
 
 import pytest
+import salt.minion
 import salt.returners.local_cache as local_cache
 import salt.utils.files
 import salt.utils.jid
@@ -378,3 +379,63 @@ class Local_CacheTest(
         self._check_dir_files(
             "new_jid_dir was not removed", self.EMPTY_JID_DIR, status="removed"
         )
+
+    def test_returner_batch(self):
+        """
+        test that returner_batch stores every return of the batch
+        """
+        jid = "20160603132323715455"
+        loads = [
+            {"jid": jid, "return": True, "fun": "test.ping", "id": "minion{}".format(i)}
+            for i in range(5)
+        ]
+        with patch.dict(local_cache.__opts__, {"hash_type": "sha256"}):
+            local_cache.prep_jid(passed_jid=jid)
+            self.assertEqual(local_cache.returner_batch(loads), None)
+            self.assertEqual(
+                local_cache.get_jid(jid),
+                {"minion{}".format(i): {"return": True} for i in range(5)},
+            )
+
+    @pytest.mark.slow_test
+    def test_return_batcher_load(self):
+        """
+        store the same returns with store_job and with a ReturnBatcher and
+        report the returns per second of both
+        """
+        opts = self.get_temp_config("master")
+        opts["cachedir"] = self.TMP_CACHE_DIR
+        opts["job_cache_batch_size"] = 100
+        minions = ["minion{}".format(i) for i in range(500)]
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+
+        def _returns(jid):
+            for minion in minions:
+                yield {
+                    "jid": jid,
+                    "return": True,
+                    "retcode": 0,
+                    "fun": "test.ping",
+                    "id": minion,
+                }
+
+        start = time.time()
+        for load in _returns("20160603132323715453"):
+            salt.utils.job.store_job(opts, load, mminion=mminion)
+        unbatched = len(minions) / (time.time() - start)
+
+        batcher = salt.utils.job.ReturnBatcher(opts, mminion=mminion)
+        start = time.time()
+        for load in _returns("20160603132323715454"):
+            batcher.add(load)
+        batcher.flush()
+        batched = len(minions) / (time.time() - start)
+
+        log.info(
+            "Job cache returns per second: %.0f unbatched, %.0f batched",
+            unbatched,
+            batched,
+        )
+        with patch.dict(local_cache.__opts__, {"hash_type": opts["hash_type"]}):
+            for jid in ("20160603132323715453", "20160603132323715454"):
+                self.assertEqual(sorted(local_cache.get_jid(jid)), sorted(minions))
@@ -0,0 +1,122 @@
+"""
+tests.unit.returners.test_mysql_return
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Unit tests for the MySQL returner (mysql).
+"""
+
+import logging
+
+import salt.exceptions
+import salt.returners.mysql as mysql
+import salt.utils.json
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.mock import MagicMock, call, patch
+from tests.support.unit import TestCase
+
+log = logging.getLogger(__name__)
+
+
+class MySQLReturnerBatchTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for the mysql.returner_batch function.
+    """
+
+    def setup_loader_modules(self):
+        return {mysql: {"__opts__": {}, "__context__": {}}}
+
+    def _ret(self, minion, **kwargs):
+        ret = {
+            "fun": "test.ping",
+            "jid": "20220101000000000000",
+            "return": True,
+            "id": minion,
+            "success": True,
+        }
+        ret.update(kwargs)
+        return ret
+
+    def _row(self, ret):
+        return (
+            ret["fun"],
+            ret["jid"],
+            salt.utils.json.dumps(ret["return"]),
+            ret["id"],
+            ret["success"],
+            salt.utils.json.dumps(ret),
+        )
+
+    def test_returner_batch_executemany(self):
+        """
+        Tests that all returns are inserted by one executemany call inside a
+        committed transaction.
+        """
+        rets = [self._ret("minion1"), self._ret("minion2")]
+        cursor = MagicMock()
+        serv = MagicMock()
+        serv.return_value.__enter__.return_value = cursor
+        with patch.object(mysql, "_get_serv", serv):
+            mysql.returner_batch(rets)
+
+        serv.assert_called_once_with(rets[0], commit=True)
+        self.assertEqual(cursor.executemany.call_count, 1)
+        self.assertEqual(
+            cursor.executemany.call_args[0][1], [self._row(ret) for ret in rets]
+        )
+        cursor.execute.assert_not_called()
+
+    def test_returner_batch_ret_config(self):
+        """
+        Tests that returns using an alternative configuration get their own
+        transaction.
+        """
+        rets = [
+            self._ret("minion1"),
+            self._ret("minion2", ret_config="alternative"),
+            self._ret("minion3"),
+        ]
+        cursor = MagicMock()
+        serv = MagicMock()
+        serv.return_value.__enter__.return_value = cursor
+        with patch.object(mysql, "_get_serv", serv):
+            mysql.returner_batch(rets)
+
+        self.assertEqual(
+            serv.call_args_list,
+            [call(rets[0], commit=True), call(rets[1], commit=True)],
+        )
+        self.assertEqual(
+            [args[0][1] for args in cursor.executemany.call_args_list],
+            [[self._row(rets[0]), self._row(rets[2])], [self._row(rets[1])]],
+        )
+
+    def test_returner_batch_req_jid(self):
+        """
+        Tests that standalone returns get a jid before being inserted.
+        """
+        ret = self._ret("minion1", jid="req")
+        cursor = MagicMock()
+        serv = MagicMock()
+        serv.return_value.__enter__.return_value = cursor
+        save_load = MagicMock()
+        with patch.object(mysql, "_get_serv", serv), patch.object(
+            mysql, "prep_jid", MagicMock(return_value="20220101000000000001")
+        ), patch.object(mysql, "save_load", save_load):
+            mysql.returner_batch([ret])
+
+        self.assertEqual(ret["jid"], "20220101000000000001")
+        save_load.assert_called_once_with("20220101000000000001", ret)
+        self.assertEqual(cursor.executemany.call_args[0][1], [self._row(ret)])
+
+    def test_returner_batch_unavailable(self):
+        """
+        Tests that an unavailable server is logged instead of raised.
+        """
+        serv = MagicMock(
+            side_effect=salt.exceptions.SaltMasterError("could not connect")
+        )
+        with patch.object(mysql, "_get_serv", serv), patch.object(
+            mysql.log, "critical"
+        ) as critical:
+            self.assertIsNone(mysql.returner_batch([self._ret("minion1")]))
+        self.assertTrue(critical.called)
@@ -0,0 +1,123 @@
+"""
+tests.unit.returners.test_postgres_return
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Unit tests for the PostgreSQL returner (postgres).
+"""
+
+import logging
+
+import salt.exceptions
+import salt.returners.postgres as postgres
+import salt.utils.json
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.mock import MagicMock, call, patch
+from tests.support.unit import TestCase
+
+log = logging.getLogger(__name__)
+
+
+class PostgresReturnerBatchTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for the postgres.returner_batch function.
+    """
+
+    def setup_loader_modules(self):
+        return {postgres: {"__opts__": {}}}
+
+    def _ret(self, minion, **kwargs):
+        ret = {
+            "fun": "test.ping",
+            "jid": "20220101000000000000",
+            "return": True,
+            "id": minion,
+            "success": True,
+        }
+        ret.update(kwargs)
+        return ret
+
+    def _row(self, ret):
+        return (
+            ret["fun"],
+            ret["jid"],
+            salt.utils.json.dumps(ret["return"]),
+            ret["id"],
+            ret["success"],
+            salt.utils.json.dumps(ret),
+        )
+
+    def test_returner_batch_executemany(self):
+        """
+        Tests that all returns are inserted by one executemany call inside a
+        committed transaction.
+        """
+        rets = [self._ret("minion1"), self._ret("minion2")]
+        cursor = MagicMock()
+        serv = MagicMock()
+        serv.return_value.__enter__.return_value = cursor
+        with patch.object(postgres, "_get_serv", serv):
+            postgres.returner_batch(rets)
+
+        serv.assert_called_once_with(rets[0], commit=True)
+        self.assertEqual(cursor.executemany.call_count, 1)
+        self.assertEqual(
+            cursor.executemany.call_args[0][1], [self._row(ret) for ret in rets]
+        )
+
+    def test_returner_batch_ret_config(self):
+        """
+        Tests that returns using an alternative configuration get their own
+        transaction.
+        """
+        rets = [
+            self._ret("minion1", ret_config="alternative"),
+            self._ret("minion2"),
+        ]
+        cursor = MagicMock()
+        serv = MagicMock()
+        serv.return_value.__enter__.return_value = cursor
+        with patch.object(postgres, "_get_serv", serv):
+            postgres.returner_batch(rets)
+
+        self.assertEqual(
+            serv.call_args_list,
+            [call(rets[0], commit=True), call(rets[1], commit=True)],
+        )
+        self.assertEqual(
+            [args[0][1] for args in cursor.executemany.call_args_list],
+            [[self._row(rets[0])], [self._row(rets[1])]],
+        )
+
+    def test_returner_batch_transaction(self):
+        """
+        Tests that the batch is committed once on the connection after the
+        executemany call.
+        """
+        cursor = MagicMock()
+        psycopg2 = MagicMock()
+        psycopg2.DatabaseError = type("DatabaseError", (Exception,), {})
+        psycopg2.OperationalError = type("OperationalError", (Exception,), {})
+        psycopg2.connect.return_value.cursor.return_value = cursor
+        with patch.object(postgres, "psycopg2", psycopg2, create=True):
+            postgres.returner_batch([self._ret("minion1"), self._ret("minion2")])
+
+        psycopg2.connect.assert_called_once()
+        self.assertEqual(
+            [name for name, _, _ in cursor.method_calls],
+            ["executemany", "execute"],
+        )
+        cursor.execute.assert_called_once_with("COMMIT")
+        psycopg2.connect.return_value.close.assert_called_once_with()
+
+    def test_returner_batch_unavailable(self):
+        """
+        Tests that an unavailable server is logged instead of raised.
+        """
+        serv = MagicMock(
+            side_effect=salt.exceptions.SaltMasterError("could not connect")
+        )
+        with patch.object(postgres, "_get_serv", serv), patch.object(
+            postgres.log, "critical"
+        ) as critical:
+            self.assertIsNone(postgres.returner_batch([self._ret("minion1")]))
+        self.assertTrue(critical.called)
@@ -6,8 +6,8 @@ unit tests for the jobs runner
 import salt.minion
 import salt.runners.jobs as jobs
 from tests.support.mixins import LoaderModuleMockMixin
-from tests.support.mock import patch
-from tests.support.unit import TestCase
+from tests.support.mock import MagicMock, patch
+from tests.support.unit import TestCase, skipIf
 
 
 class JobsTest(TestCase, LoaderModuleMockMixin):
@@ -82,3 +82,41 @@ class JobsTest(TestCase, LoaderModuleMockMixin):
             self.assertEqual(
                 jobs.list_jobs(search_target="non-existant"), returns["non-existant"]
             )
+
+    @skipIf(not jobs.DATEUTIL_SUPPORT, "dateutil is not installed")
+    def test_list_jobs_with_time_range(self):
+        """
+        test jobs.list_jobs runner passes the time range to returners which
+        can look it up
+        """
+        job = {
+            "Arguments": [],
+            "Function": "test.ping",
+            "StartTime": "2016, May 24 03:55:03.086853",
+            "Target": "node-1-1.com",
+            "Target-type": "glob",
+            "User": "root",
+        }
+        get_jids_range = MagicMock(return_value={"20160524035503086853": job})
+
+        class MockMasterMinion:
+
+            returners = {
+                "local_cache.get_jids": MagicMock(),
+                "local_cache.get_jids_range": get_jids_range,
+            }
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, "MasterMinion", MockMasterMinion):
+            self.assertEqual(
+                jobs.list_jobs(
+                    start_time="2016, May 24 03:00", end_time="2016, May 24 04:00"
+                ),
+                {"20160524035503086853": job},
+            )
+        get_jids_range.assert_called_once_with(
+            "20160524030000000000", "20160524040000000000"
+        )
+        MockMasterMinion.returners["local_cache.get_jids"].assert_not_called()
@@ -8,6 +8,8 @@ import logging
 import os
 import shutil
 
+import salt.ext.tornado.gen
+import salt.fileserver
 import salt.utils.files
 from salt import fileclient
 from tests.support.mixins import (
@@ -96,6 +98,31 @@ def _get_file_roots(fs_root):
     return {x: [os.path.join(fs_root, x)] for x in SALTENVS}
 
 
+class _AsyncFSChan:
+    """
+    An async request channel serving from the local fileserver, which records
+    the commands it was sent and how many requests were in flight at once
+    """
+
+    def __init__(self, opts):
+        self.chan = salt.fileserver.FSChan(opts)
+        self.cmds = []
+        self.in_flight = 0
+        self.peak = 0
+
+    @salt.ext.tornado.gen.coroutine
+    def send(self, load, tries=3, timeout=60, raw=False):
+        self.cmds.append(load["cmd"])
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        yield salt.ext.tornado.gen.moment
+        self.in_flight -= 1
+        raise salt.ext.tornado.gen.Return(self.chan.send(dict(load)))
+
+    def close(self):
+        pass
+
+
 class FileClientTest(
     TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMixin
 ):
@@ -323,6 +350,49 @@ class FileclientCacheTest(
                     self.assertTrue(SUBDIR in content)
                     self.assertTrue(saltenv in content)
 
+    def test_cache_dir_pipelined(self):
+        """
+        Ensure the remote client fetches a directory with several requests in
+        flight and does not serve the files whose cached copy is current
+        """
+        patched_opts = {x: y for x, y in self.minion_opts.items()}
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts["fileclient_pipeline_depth"] = 2
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            chan = _AsyncFSChan(fileclient.__opts__)
+            with patch(
+                "salt.transport.client.ReqChannel.factory",
+                MagicMock(return_value=MagicMock(send=chan.chan.send)),
+            ), patch(
+                "salt.transport.client.AsyncReqChannel.factory",
+                MagicMock(return_value=chan),
+            ):
+                client = fileclient.RemoteClient(fileclient.__opts__)
+                ret = client.cache_dir("salt://{}".format(SUBDIR), "dev")
+                self.assertEqual(len(ret), len(SUBDIR_FILES))
+                for cache_loc in ret:
+                    with salt.utils.files.fopen(cache_loc) as fp_:
+                        content = fp_.read()
+                    self.assertTrue(os.path.basename(cache_loc) in content)
+                    self.assertTrue("dev" in content)
+                self.assertEqual(chan.peak, 2)
+                self.assertEqual(chan.cmds.count("_file_hash"), len(SUBDIR_FILES))
+                # One chunk of data and the empty chunk ending each file
+                self.assertEqual(chan.cmds.count("_serve_file"), 2 * len(SUBDIR_FILES))
+
+                # Only the file that changed is served again
+                with salt.utils.files.fopen(ret[0], "w") as fp_:
+                    fp_.write("stale")
+                chan.cmds = []
+                self.assertEqual(
+                    client.cache_dir("salt://{}".format(SUBDIR), "dev"), ret
+                )
+                self.assertEqual(chan.cmds.count("_file_hash"), len(SUBDIR_FILES))
+                self.assertEqual(chan.cmds.count("_serve_file"), 2)
+                with salt.utils.files.fopen(ret[0]) as fp_:
+                    self.assertTrue("dev" in fp_.read())
+
     def test_cache_file(self):
         """
         Ensure file is cached to correct location
@@ -16,6 +16,7 @@ import shutil
 import sys
 import tempfile
 import textwrap
+import time
 
 import pytest
 import salt.config
@@ -1754,3 +1755,212 @@ class LazyLoaderRefreshFileMappingTest(TestCase):
         loader = self.__init_loader()
         assert ".pyx" not in loader.suffix_map
         assert ".pyx" not in loader.suffix_order
+
+
+discovery_cache_module_template = """
+__virtualname__ = "{virtualname}"
+
+def __virtual__():
+    return __virtualname__
+
+def test():
+    return True
+"""
+
+
+class LazyLoaderDiscoveryCacheTest(TestCase):
+    """
+    Test the loader's discovery cache
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.opts = salt.config.minion_config(None)
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.opts
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.mod_dir = os.path.join(self.tmp_dir, "modules")
+        os.makedirs(self.mod_dir)
+        self.opts = copy.deepcopy(self.opts)
+        self.opts["cachedir"] = os.path.join(self.tmp_dir, "cache")
+        self.opts["loader_discovery_cache"] = True
+        self.add_module("discovered", "found")
+        patcher = patch("sys.dont_write_bytecode", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add_module(self, name, virtualname):
+        with salt.utils.files.fopen(
+            os.path.join(self.mod_dir, "{}.py".format(name)), "w"
+        ) as fh:
+            fh.write(discovery_cache_module_template.format(virtualname=virtualname))
+        # The cache is only written once the directory stopped changing
+        mtime = os.stat(self.mod_dir).st_mtime - 10
+        os.utime(self.mod_dir, (mtime, mtime))
+
+    def get_loader(self):
+        return salt.loader.LazyLoader(
+            [self.mod_dir], copy.deepcopy(self.opts), tag="module"
+        )
+
+    def test_discovery_cache(self):
+        loader = self.get_loader()
+        assert list(loader.file_mapping) == ["discovered"]
+        assert loader["found.test"]()
+        assert loader.virtual_names == {"discovered": "found"}
+        cache_files = os.listdir(os.path.join(self.opts["cachedir"], "loader"))
+        assert len(cache_files) == 1
+
+        # The module directory is not listed again while it is unchanged
+        with patch("os.listdir", MagicMock(side_effect=AssertionError)):
+            loader = self.get_loader()
+        assert list(loader.file_mapping) == ["discovered"]
+        assert loader.virtual_names == {"discovered": "found"}
+        assert loader["found.test"]()
+
+        # A new module invalidates the cache
+        self.add_module("added", "other")
+        loader = self.get_loader()
+        assert list(loader.file_mapping) == ["added", "discovered"]
+        assert loader["other.test"]()
+
+        # The cache is not used once it is disabled
+        self.opts["loader_discovery_cache"] = False
+        with patch("os.listdir", MagicMock(return_value=[])):
+            loader = self.get_loader()
+        assert not loader.file_mapping
+
+
+virtual_cache_module_template = """
+import salt.utils.decorators
+
+with open({imports!r}, "a") as fh:
+    fh.write("imported\\n")
+
+@salt.utils.decorators.cached_virtual(grains=["os_family"])
+def __virtual__():
+    if __grains__.get("os_family") == "Debian":
+        return True
+    return False, "Not a Debian system"
+
+def test():
+    return True
+"""
+
+
+class LazyLoaderVirtualCacheTest(TestCase):
+    """
+    Test the caching of the __virtual__ results
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.opts = salt.config.minion_config(None)
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.opts
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.mod_dir = os.path.join(self.tmp_dir, "modules")
+        os.makedirs(self.mod_dir)
+        self.imports = os.path.join(self.tmp_dir, "imports")
+        self.module_path = os.path.join(self.mod_dir, "virtcache.py")
+        self.write_module()
+        self.opts = copy.deepcopy(self.opts)
+        self.opts["cachedir"] = os.path.join(self.tmp_dir, "cache")
+        self.opts["loader_virtual_cache"] = True
+        patcher = patch("sys.dont_write_bytecode", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_module(self, extra=""):
+        with salt.utils.files.fopen(self.module_path, "w") as fh:
+            fh.write(virtual_cache_module_template.format(imports=self.imports))
+            fh.write(extra)
+
+    def imported(self):
+        try:
+            with salt.utils.files.fopen(self.imports) as fh:
+                return len(fh.readlines())
+        except FileNotFoundError:
+            return 0
+
+    def get_loader(self, os_family):
+        opts = copy.deepcopy(self.opts)
+        opts["grains"] = {"os_family": os_family}
+        return salt.loader.LazyLoader([self.mod_dir], opts, tag="module")
+
+    def test_virtual_cache(self):
+        loader = self.get_loader("RedHat")
+        assert "virtcache.test" not in loader
+        assert loader.missing_fun_string("virtcache.test") == (
+            "'virtcache' __virtual__ returned False: Not a Debian system"
+        )
+        assert self.imported() == 1
+
+        # The module is known to be unavailable and is not imported again
+        loader = self.get_loader("RedHat")
+        assert "virtcache.test" not in loader
+        assert loader.missing_fun_string("virtcache.test") == (
+            "'virtcache' __virtual__ returned False: Not a Debian system"
+        )
+        assert self.imported() == 1
+
+        # A change of the grains it depends on makes it load
+        loader = self.get_loader("Debian")
+        assert loader["virtcache.test"]()
+        assert self.imported() == 2
+
+        # So does a change of the module
+        loader = self.get_loader("RedHat")
+        assert "virtcache.test" not in loader
+        assert self.imported() == 3
+        self.write_module("\ndef other():\n    return True\n")
+        loader = self.get_loader("RedHat")
+        assert "virtcache.test" not in loader
+        assert self.imported() == 4
+
+        # Nothing is cached while the option is disabled
+        self.opts["loader_virtual_cache"] = False
+        loader = self.get_loader("RedHat")
+        assert "virtcache.test" not in loader
+        assert self.imported() == 5
+
+    @pytest.mark.slow_test
+    def test_virtual_cache_benchmark(self):
+        """
+        Compare the time it takes to load all of the minion_mods with and
+        without the cached __virtual__ results
+        """
+        opts = copy.deepcopy(self.opts)
+        opts["grains"] = salt.loader.grains(opts)
+        # Fill the cache, and warm up the imports of the libraries
+        salt.loader.minion_mods(opts)._load_all()
+        timings = {}
+        loaded = {}
+        for name, enabled in (("uncached", False), ("cached", True)):
+            opts["loader_virtual_cache"] = enabled
+            start = time.perf_counter()
+            funcs = salt.loader.minion_mods(opts)
+            funcs._load_all()
+            timings[name] = time.perf_counter() - start
+            loaded[name] = set(funcs)
+        log.debug(
+            "Loading all of the minion_mods, without cached __virtual__ results: "
+            "%.3fs, with them: %.3fs",
+            timings["uncached"],
+            timings["cached"],
+        )
+        assert loaded["uncached"] == loaded["cached"]
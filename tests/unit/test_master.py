@@ -2,7 +2,9 @@ import time
 
 import pytest
 import salt.config
+import salt.crypt
 import salt.master
+import salt.transport.server
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import MagicMock, patch
 from tests.support.unit import TestCase
@@ -73,6 +75,7 @@ class TransportMethodsTest(TestCase):
             "get_method",
             "run_func",
             "destroy",
+            "flush_returns",
         ]
         for name in dir(aes_funcs):
             if name in aes_funcs.expose_methods:
@@ -157,6 +160,49 @@ class ClearFuncsTestCase(TestCase):
         assert getattr(self.clear_funcs, "_send_pub", None) is not None
         assert self.clear_funcs.get_method("_send_pub") is None
 
+    def test_send_pub(self):
+        """
+        Asserts that _send_pub passes the matched minions to the publisher
+        channels and returns their publish timings
+        """
+        chan = MagicMock(publish_stats={"encrypt": 0.1, "serialize": 0.2})
+        load = {"jid": "20210316190000000000", "tgt": "*", "tgt_type": "glob"}
+        with patch(
+            "salt.transport.server.PubServerChannel.factory",
+            MagicMock(return_value=chan),
+        ):
+            ret = self.clear_funcs._send_pub(load, minions=["minion1"])
+        chan.publish.assert_called_once_with(load, minions=["minion1"])
+        self.assertEqual(ret, {"zeromq": {"encrypt": 0.1, "serialize": 0.2}})
+
+    def test_send_pub_crypticle(self):
+        """
+        Asserts that the publisher channels created by _send_pub share one
+        crypticle until the AES key is rotated
+        """
+        load = {"jid": "20210316190000000000", "tgt": "*", "tgt_type": "glob"}
+        keys = [salt.crypt.Crypticle.generate_key_string() for _ in range(2)]
+        secrets = {"aes": {"secret": MagicMock(value=keys[0])}}
+        crypticle = MagicMock(side_effect=salt.crypt.Crypticle)
+        with patch.dict(salt.master.SMaster.secrets, secrets), patch(
+            "salt.crypt.Crypticle", crypticle
+        ), patch.dict(
+            salt.transport.server.PubServerChannel._crypticles, clear=True
+        ), patch(
+            "salt.crypt.sign_message", MagicMock(return_value=b"sig")
+        ), patch(
+            "salt.transport.zeromq.ZeroMQPubServerChannel.pub_connect"
+        ), patch(
+            "salt.transport.zeromq.ZeroMQPubServerChannel.pub_sock", MagicMock()
+        ):
+            self.clear_funcs._send_pub(load)
+            self.clear_funcs._send_pub(load)
+            self.assertEqual(crypticle.call_count, 1)
+
+            secrets["aes"]["secret"].value = keys[1]
+            self.clear_funcs._send_pub(load)
+            self.assertEqual(crypticle.call_count, 2)
+
     # runner tests
 
     @pytest.mark.slow_test
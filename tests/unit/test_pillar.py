@@ -12,6 +12,7 @@ import os
 import shutil
 import tempfile
 import textwrap
+import time
 
 import salt.config
 import salt.exceptions
@@ -376,6 +377,85 @@ class PillarTestCase(TestCase):
         finally:
             shutil.rmtree(tempdir, ignore_errors=True)
 
+    def _ext_pillar_sources(self, concurrency):
+        opts = {
+            "optimization_order": [0, 1, 2],
+            "renderer": "yaml",
+            "renderer_blacklist": [],
+            "renderer_whitelist": [],
+            "state_top": "",
+            "pillar_roots": {"base": []},
+            "file_roots": {"base": []},
+            "extension_modules": "",
+            "ext_pillar": [
+                {"slow": "slow"},
+                {"fast": "fast"},
+                {"hung": "hung"},
+                {"stack": "stack"},
+                {"after": "after"},
+            ],
+            "ext_pillar_concurrency": concurrency,
+            "ext_pillar_timeout": {"hung": 0.2},
+        }
+
+        def _source(delay, data):
+            def ext_pillar(minion_id, pillar, *args):
+                time.sleep(delay)
+                return dict(data)
+
+            return ext_pillar
+
+        def _stack(minion_id, pillar, *args):
+            return {"stacked": pillar.get("shared")}
+
+        ext_pillars = {
+            "slow": _source(0.5, {"slow": True, "shared": "slow"}),
+            "fast": _source(0, {"fast": True, "shared": "fast"}),
+            "hung": _source(2, {"hung": True}),
+            "stack": _stack,
+            "after": _source(0.5, {"after": True}),
+        }
+        with patch("salt.loader.pillars", MagicMock(return_value=ext_pillars)):
+            return salt.pillar.Pillar(opts, {}, "mocked-minion", "base")
+
+    def test_ext_pillar_concurrent(self):
+        """
+        Test that the ext_pillar sources are called at once, merged in the
+        configured order and that a source which hangs times out
+        """
+        pillar = self._ext_pillar_sources(4)
+        start = time.time()
+        ret, errors = pillar.ext_pillar({})
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(
+            ret,
+            {
+                "slow": True,
+                "fast": True,
+                "shared": "fast",
+                "stacked": "fast",
+                "after": True,
+            },
+        )
+        self.assertEqual(errors, ["ext_pillar hung timed out after 0.2 seconds"])
+        self.assertEqual(
+            [entry["name"] for entry in pillar.ext_pillar_timing],
+            ["slow", "fast", "hung", "stack", "after"],
+        )
+
+    def test_ext_pillar_sequential_timing(self):
+        """
+        Test that calling the ext_pillar sources one at a time merges the same
+        data and records their timing
+        """
+        pillar = self._ext_pillar_sources(1)
+        pillar.ext_pillars["hung"] = pillar.ext_pillars["fast"]
+        ret, errors = pillar.ext_pillar({})
+        self.assertEqual(ret["shared"], "fast")
+        self.assertEqual(ret["stacked"], "fast")
+        self.assertEqual(errors, [])
+        self.assertGreaterEqual(pillar.ext_pillar_timing[0]["duration"], 500)
+
     def test_dynamic_pillarenv(self):
         opts = {
             "optimization_order": [0, 1, 2],
@@ -787,6 +867,81 @@ generic:
                 compiled_pillar["sub_init_dot"], "sub_with_init_dot_worked"
             )
 
+    @with_tempdir()
+    def test_render_cache(self, tempdir):
+        """
+        Test that the render of a pillar SLS file is reused for the minions
+        whose grains read by its template are the same
+        """
+        sls_file = os.path.join(tempdir, "generic.sls")
+        with fopen(sls_file, "w") as fp_:
+            fp_.write(
+                textwrap.dedent(
+                    """\
+                    os: {{ grains["os"] }}
+                    {%- if "kernel" in grains %}
+                    echo: {{ salt["test.echo"]("hello") }}
+                    {%- endif %}
+                    """
+                )
+            )
+        opts = {
+            "optimization_order": [0, 1, 2],
+            "renderer": "jinja|yaml",
+            "renderer_blacklist": [],
+            "renderer_whitelist": [],
+            "state_top": "",
+            "pillar_roots": {"base": [tempdir]},
+            "extension_modules": "",
+            "saltenv": "base",
+            "file_roots": {"base": [tempdir]},
+            "pillar_render_cache": True,
+        }
+        fc_mock = MockFileclient(
+            get_state={"generic": {"path": "", "dest": sls_file}},
+            list_states=["generic"],
+        )
+
+        def _render(minion_id, grains):
+            with patch.object(
+                salt.fileclient, "get_file_client", MagicMock(return_value=fc_mock)
+            ):
+                pillar = salt.pillar.Pillar(opts, grains, minion_id, "base")
+            with patch(
+                "salt.pillar.compile_template",
+                MagicMock(side_effect=salt.pillar.compile_template),
+            ) as compile_mock:
+                state, _, errors = pillar.render_pstate("generic", "base", {})
+            self.assertEqual(errors, [])
+            return state, compile_mock.call_count
+
+        with patch.dict(salt.pillar._RENDER_CACHE, clear=True):
+            ubuntu = {"os": "Ubuntu", "kernel": "Linux", "osrelease": "13.04"}
+            self.assertEqual(
+                _render("minion1", ubuntu), ({"os": "Ubuntu", "echo": "hello"}, 1)
+            )
+            # Grains the template did not read make no difference
+            self.assertEqual(
+                _render("minion2", dict(ubuntu, osrelease="14.04")),
+                ({"os": "Ubuntu", "echo": "hello"}, 0),
+            )
+            self.assertEqual(
+                _render("minion3", {"os": "Fedora", "kernel": "Linux"}),
+                ({"os": "Fedora", "echo": "hello"}, 1),
+            )
+            self.assertEqual(
+                _render("minion4", {"os": "Ubuntu"}), ({"os": "Ubuntu"}, 1)
+            )
+            self.assertEqual(
+                _render("minion5", ubuntu), ({"os": "Ubuntu", "echo": "hello"}, 0)
+            )
+            with fopen(sls_file, "a") as fp_:
+                fp_.write("changed: true\n")
+            self.assertEqual(
+                _render("minion6", ubuntu),
+                ({"os": "Ubuntu", "echo": "hello", "changed": True}, 1),
+            )
+
     def _setup_test_include_sls(self, tempdir):
         top_file = tempfile.NamedTemporaryFile(dir=tempdir, delete=False)
         top_file.write(
@@ -2,9 +2,14 @@
     :codeauthor: Nicole Thomas <nicole@saltstack.com>
 """
 
+import copy
+import fnmatch
+import gc
+import multiprocessing
 import os
 import shutil
 import tempfile
+import time
 
 import pytest  # pylint: disable=unused-import
 import salt.exceptions
@@ -802,6 +807,253 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
                 self.assertEqual(sub_state["__sls__"], "external")
 
 
+def _gen_chunks(count):
+    """
+    Generate a run of chunks which each require the previous chunk by ID, by
+    SLS and by a glob of its name
+    """
+    chunks = []
+    for idx in range(count):
+        chunk = {
+            "state": "test",
+            "fun": "succeed_without_changes",
+            "__id__": "id{}".format(idx),
+            "name": "name{}".format(idx),
+            "__sls__": "sls{}".format(idx // 10),
+            "__env__": "base",
+            "order": idx,
+        }
+        if idx:
+            chunk["require"] = [
+                {"test": "id{}".format(idx - 1)},
+                {"sls": "sls{}".format((idx - 1) // 10)},
+                "name{}*".format(idx - 1),
+            ]
+        chunks.append(chunk)
+    return chunks
+
+
+def _gen_high(count):
+    """
+    Generate high data whose states are each required and prerequired by the
+    previous state through its name
+    """
+    high = OrderedDict()
+    for idx in range(count):
+        args = [{"name": "name{}".format(idx)}, "succeed_without_changes"]
+        if idx + 1 < count:
+            args.append({"require_in": ["name{}".format(idx + 1)]})
+            args.append({"prereq": [{"test": "name{}".format(idx + 1)}]})
+        high["id{}".format(idx)] = OrderedDict(
+            [
+                ("test", args),
+                ("__sls__", "sls{}".format(idx // 10)),
+                ("__env__", "base"),
+            ]
+        )
+    return high
+
+
+class RequisiteIndexTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
+    """
+    TestCase for the indexes used to resolve requisites
+    """
+
+    def test_chunk_index_find(self):
+        """
+        Test that the chunk index finds the same chunks as matching every chunk
+        """
+        chunks = _gen_chunks(120)
+        chunks[5]["state"] = "file"
+        chunks[7]["name"] = "id3"
+        index = salt.state.ChunkIndex(chunks)
+        for req_key, req_val in (
+            ("id", "id3"),
+            ("test", "id3"),
+            ("file", "id5"),
+            ("test", "id5"),
+            ("id", "name1*"),
+            ("id", "id?"),
+            ("id", "id[12]0"),
+            ("id", "*"),
+            ("id", "missing"),
+            ("sls", "sls1"),
+            ("sls", "sls1*"),
+        ):
+            if req_key == "sls":
+                expected = [
+                    chunk
+                    for chunk in chunks
+                    if fnmatch.fnmatch(chunk["__sls__"], req_val)
+                ]
+            else:
+                expected = [
+                    chunk
+                    for chunk in chunks
+                    if (
+                        fnmatch.fnmatch(chunk["name"], req_val)
+                        or fnmatch.fnmatch(chunk["__id__"], req_val)
+                    )
+                    and (req_key == "id" or chunk["state"] == req_key)
+                ]
+            self.assertEqual(index.find(req_key, req_val), expected)
+        self.assertIs(index.first("id3"), chunks[3])
+        self.assertIs(index.first("name8"), chunks[8])
+        self.assertIsNone(index.first("missing"))
+        self.assertTrue(index.current(chunks))
+        self.assertFalse(index.current(chunks[:-1]))
+
+    def test_high_index(self):
+        """
+        Test that the high index finds the same IDs as scanning the high data
+        """
+        high = _gen_high(30)
+        high["id4"]["test"].append({"onlyif": "name7"})
+        index = salt.state.HighIndex(high)
+        for name in ("name7", "id7", "missing"):
+            self.assertEqual(
+                index.find_name(name, "test"), salt.state.find_name(name, "test", high)
+            )
+        self.assertEqual(
+            index.find_name("sls1", "sls"), salt.state.find_name("sls1", "sls", high)
+        )
+        self.assertEqual(
+            index.find_sls_ids("sls2"), salt.state.find_sls_ids("sls2", high)
+        )
+        self.assertEqual(index.find_state("name7"), {"test": "id7"})
+        self.assertIsNone(index.find_state("missing"))
+
+    @pytest.mark.slow_test
+    def test_requisite_scaling(self):
+        """
+        Benchmark resolving the requisites of generated state runs, the time
+        has to grow about linearly with the number of states
+        """
+        with patch("salt.state.State._gather_pillar"):
+            state_obj = salt.state.State(self.get_temp_config("minion"))
+
+        def _check_requisites(count):
+            chunks = _gen_chunks(count)
+            running = {
+                salt.state._gen_tag(chunk): {"result": True, "changes": {}}
+                for chunk in chunks
+            }
+            start = time.time()
+            for chunk in chunks:
+                self.assertEqual(
+                    state_obj.check_requisite(chunk, running, chunks)[0], "met"
+                )
+            return time.time() - start
+
+        def _requisite_in(count):
+            high = _gen_high(count)
+            start = time.time()
+            state_obj.requisite_in(high)
+            return time.time() - start
+
+        def _best(func, count):
+            # Keep the garbage collector from skewing the comparison
+            gc.disable()
+            try:
+                return min(func(count) for _ in range(3))
+            finally:
+                gc.enable()
+
+        for func in (_check_requisites, _requisite_in):
+            small = _best(func, 1000)
+            large = _best(func, 4000)
+            # Scanning all of the chunks for each requisite would take 16
+            # times longer for 4 times as many states
+            self.assertLess(large, small * 8)
+
+
+class ConcurrentStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
+    """
+    TestCase for calling independent chunks concurrently
+    """
+
+    def _call_high(self, high, concurrency):
+        opts = self.get_temp_config("minion", state_concurrency=concurrency)
+        with patch("salt.state.State._gather_pillar"):
+            state_obj = salt.state.State(opts)
+        return state_obj.call_high(copy.deepcopy(high))
+
+    def _high(self):
+        high = OrderedDict()
+        for idx in range(6):
+            args = [{"name": "name{}".format(idx)}, "succeed_with_changes"]
+            if idx % 2:
+                args.append({"require": [{"test": "id{}".format(idx - 1)}]})
+            high["id{}".format(idx)] = OrderedDict(
+                [("test", args), ("__sls__", "sls"), ("__env__", "base")]
+            )
+        high["watcher"] = OrderedDict(
+            [
+                (
+                    "test",
+                    ["succeed_without_changes", {"watch": [{"test": "id5"}]}],
+                ),
+                ("__sls__", "sls"),
+                ("__env__", "base"),
+            ]
+        )
+        high["last"] = OrderedDict(
+            [
+                ("test", ["succeed_without_changes", {"order": "last"}]),
+                ("__sls__", "sls"),
+                ("__env__", "base"),
+            ]
+        )
+        return high
+
+    @skipIf(
+        multiprocessing.get_start_method() != "fork",
+        "Concurrent states need the fork start method",
+    )
+    def test_concurrent_matches_sequential(self):
+        """
+        Test that calling the chunks concurrently returns what calling them in
+        order does, and that requisites still order the calls
+        """
+        high = self._high()
+        sequential = self._call_high(high, 1)
+        concurrent = self._call_high(high, 4)
+        self.assertEqual(set(concurrent), set(sequential))
+        for tag, ret in sequential.items():
+            for key in ("result", "changes", "comment"):
+                self.assertEqual(concurrent[tag][key], ret[key])
+        run_nums = sorted(ret["__run_num__"] for ret in concurrent.values())
+        self.assertEqual(run_nums, list(range(len(concurrent))))
+
+        def _run_num(state_id, name):
+            return concurrent[
+                "test_|-{0}_|-{1}_|-succeed_with_changes".format(state_id, name)
+            ]["__run_num__"]
+
+        for idx in (1, 3, 5):
+            self.assertGreater(
+                _run_num("id{}".format(idx), "name{}".format(idx)),
+                _run_num("id{}".format(idx - 1), "name{}".format(idx - 1)),
+            )
+        last = concurrent["test_|-last_|-last_|-succeed_without_changes"]
+        self.assertEqual(last["__run_num__"], len(concurrent) - 1)
+
+    @skipIf(
+        multiprocessing.get_start_method() != "fork",
+        "Concurrent states need the fork start method",
+    )
+    def test_concurrent_failhard(self):
+        """
+        Test that a failhard state stops the chunks which did not start yet
+        """
+        high = self._high()
+        high["id1"]["test"][1] = "fail_with_changes"
+        high["id1"]["test"].append({"failhard": True})
+        ret = self._call_high(high, 2)
+        self.assertFalse(ret["test_|-id1_|-name1_|-fail_with_changes"]["result"])
+        self.assertNotIn("test_|-last_|-last_|-succeed_without_changes", ret)
+
+
 class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def setUp(self):
         root_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
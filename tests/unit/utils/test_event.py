@@ -258,6 +258,37 @@ class TestSaltEvent(TestCase):
                 evt2 = me2.get_event(tag="evt1")
                 self.assertGotEvent(evt2, {"data": "foo1"})
 
+    @pytest.mark.slow_test
+    def test_event_filter_tags(self):
+        """Test the publisher only sends the events matching a listener's tags"""
+        with eventpublisher_process(self.sock_dir):
+            with salt.utils.event.MasterEvent(self.sock_dir, listen=False) as me:
+                me.filter_tags(prefixes=["salt/job/"], globs=["*/beacon/*"])
+                me.connect_pub()
+                # Give the publisher time to read the filter
+                me.get_event(wait=0.5, tag="none")
+                for tag in ("salt/auth", "salt/job/1/ret/a", "salt/beacon/a/b"):
+                    me.fire_event({"data": tag}, tag)
+                evt1 = me.get_event(tag="")
+                evt2 = me.get_event(tag="")
+                self.assertGotEvent(evt1, {"data": "salt/job/1/ret/a"})
+                self.assertGotEvent(evt2, {"data": "salt/beacon/a/b"})
+
+    @pytest.mark.slow_test
+    def test_event_replay(self):
+        """Test a listener gets the events fired before it connected"""
+        with eventpublisher_process(self.sock_dir, event_journal_size=65536):
+            start = time.time()
+            with salt.utils.event.MasterEvent(self.sock_dir, listen=False) as me:
+                me.fire_event({"data": "foo1"}, "evt1")
+                me.fire_event({"data": "foo2"}, "evt2")
+                me.replay(start)
+                me.connect_pub()
+                evt1 = me.get_event(tag="evt1")
+                evt2 = me.get_event(tag="evt2")
+                self.assertGotEvent(evt1, {"data": "foo1"})
+                self.assertGotEvent(evt2, {"data": "foo2"})
+
     @expectedFailure
     def test_event_nested_sub_all(self):
         """Test nested event subscriptions do not drop events, get event for all tags"""
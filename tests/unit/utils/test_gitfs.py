@@ -6,6 +6,8 @@ any remotes.
 
 import os
 import shutil
+import stat
+import threading
 from time import time
 
 import salt.fileserver.gitfs
@@ -108,6 +110,84 @@ class TestGitBase(TestCase, AdaptedConfigurationTestCaseMixin):
         self.assertTrue(self.main_class.remotes[0].fetched)
         self.assertFalse(self.main_class.remotes[1].fetched)
 
+    def test_fetch_concurrent(self):
+        slow, fast = self.main_class.remotes
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(10)
+            return True
+
+        slow.fetch = slow_fetch
+        opts = {
+            "gitfs_fetch_workers": 2,
+            "gitfs_fetch_timeout": 1,
+            "gitfs_fetch_backoff": 60,
+        }
+        self.addCleanup(salt.utils.gitfs._FETCH_BACKOFF.clear)
+        try:
+            with patch.dict(self.main_class.opts, opts):
+                start = time()
+                self.assertFalse(self.main_class.fetch_remotes())
+                self.assertLess(time() - start, 5)
+                self.assertTrue(fast.fetched)
+                # The remote which timed out is skipped until its next try
+                failures, retry_at = salt.utils.gitfs._FETCH_BACKOFF[("gitfs", slow.id)]
+                self.assertEqual(failures, 1)
+                self.assertGreater(retry_at, time() + 50)
+                fast.fetched = False
+                self.assertFalse(self.main_class.fetch_remotes())
+                self.assertTrue(fast.fetched)
+                self.assertNotIn(("gitfs", fast.id), salt.utils.gitfs._FETCH_BACKOFF)
+        finally:
+            release.set()
+            del slow.fetch
+
+    def test_tree_index(self):
+        repo = self.main_class.remotes[0]
+        trees = {"base": "tree1"}
+        walks = []
+
+        def walk_tree(tree):
+            walks.append(tree)
+            yield "top.sls", "a" * 40, 0o100644, None
+            yield "web", "b" * 40, stat.S_IFDIR, None
+            yield "web/init.sls", tree * 5, 0o100644, None
+            yield "web/link.sls", "c" * 40, 0o120000, "init.sls"
+
+        with patch.object(repo, "get_tree", trees.get, create=True), patch.object(
+            repo, "tree_id", lambda tree: tree, create=True
+        ), patch.object(repo, "walk_tree", walk_tree, create=True):
+            self.assertEqual(
+                repo.file_list("base"),
+                (
+                    {"top.sls", "web/init.sls", "web/link.sls"},
+                    {"web/link.sls": "init.sls"},
+                ),
+            )
+            self.assertEqual(repo.dir_list("base"), {"web"})
+            self.assertEqual(
+                repo.find_blob("web/link.sls", "base"), ("tree1" * 5, 0o100644)
+            )
+            self.assertEqual(repo.find_blob("web", "base"), (None, None))
+            self.assertEqual(repo.find_blob("missing.sls", "base"), (None, None))
+            with patch.object(repo, "root", lambda env: "web"), patch.object(
+                repo, "mountpoint", lambda env: "srv"
+            ):
+                self.assertEqual(
+                    repo.file_list("base"),
+                    ({"srv/init.sls", "srv/link.sls"}, {"srv/link.sls": "init.sls"}),
+                )
+                self.assertEqual(repo.dir_list("base"), {"srv"})
+            # The tree is only walked again once the environment moves to another
+            self.assertEqual(walks, ["tree1"])
+            trees["base"] = "tree2"
+            self.assertEqual(
+                repo.find_blob("web/init.sls", "base"), ("tree2" * 5, 0o100644)
+            )
+            self.assertEqual(walks, ["tree1", "tree2"])
+            self.assertEqual(list(repo._tree_indexes), ["tree2"])
+
 
 class TestGitFSProvider(TestCase):
     def setUp(self):
@@ -5,7 +5,7 @@ unit tests for salt.utils.job
 
 import salt.minion
 import salt.utils.job as job
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 from tests.support.unit import TestCase
 
 
@@ -58,3 +58,114 @@ class JobTest(TestCase):
                         "The specified 'foo' returner threw a stack trace",
                         logged.output[0],
                     )
+
+    def test_store_job_uses_returner_batch(self):
+        """
+        test that batched returns are written with returner_batch when the
+        job cache returner provides it
+        """
+        batches = []
+        returned = []
+        returners = {
+            "foo.returner_batch": batches.append,
+            "foo.returner": returned.append,
+        }
+        with patch.dict(MockMasterMinion.returners, returners):
+            loads = [
+                {
+                    "jid": "20190618090114890985",
+                    "return": True,
+                    "id": minion,
+                    "fun": "test.ping",
+                }
+                for minion in ("a", "b", "c")
+            ]
+            job._store_returns(
+                MockMasterMinion.opts,
+                [(load, None) for load in loads],
+                MockMasterMinion(),
+            )
+            self.assertEqual(batches, [loads])
+            self.assertEqual(returned, [])
+
+            # A single return is still passed to returner
+            job._store_returns(
+                MockMasterMinion.opts, [(loads[0], None)], MockMasterMinion()
+            )
+            self.assertEqual(len(batches), 1)
+            self.assertEqual(returned, [loads[0]])
+
+    def test_return_batcher(self):
+        """
+        test that ReturnBatcher fires the events immediately and writes the
+        returns once the batch is full
+        """
+        opts = dict(MockMasterMinion.opts, job_cache_batch_size=3)
+        event = MagicMock()
+        batches = []
+        prepped = []
+        returners = {
+            "foo.returner_batch": batches.append,
+            "foo.prep_jid": lambda *args, **kwargs: prepped.append(kwargs),
+        }
+        with patch.dict(MockMasterMinion.returners, returners), patch(
+            "salt.utils.verify.valid_id", return_value=True
+        ):
+            batcher = job.ReturnBatcher(opts, event=event, mminion=MockMasterMinion())
+            for minion in ("a", "b"):
+                batcher.add(
+                    {
+                        "jid": "20190618090114890985",
+                        "return": True,
+                        "id": minion,
+                        "fun": "test.ping",
+                    }
+                )
+            self.assertEqual(event.fire_ret_load.call_count, 2)
+            self.assertEqual(len(batcher), 2)
+            self.assertFalse(batcher.due)
+            self.assertEqual(batches, [])
+
+            batcher.add(
+                {
+                    "jid": "20190618090114890985",
+                    "return": {"fun": "test.ping"},
+                    "id": "c",
+                }
+            )
+            self.assertEqual(len(batcher), 0)
+            self.assertEqual([len(batch) for batch in batches], [3])
+            # The job was only prepared once for the whole batch
+            self.assertEqual(prepped, [{"passed_jid": "20190618090114890985"}])
+
+    def test_return_batcher_interval(self):
+        """
+        test that pending returns are due once the batch interval expired
+        """
+        opts = dict(
+            MockMasterMinion.opts,
+            job_cache_batch_size=100,
+            job_cache_batch_interval=5,
+        )
+        with patch("salt.utils.verify.valid_id", return_value=True):
+            batcher = job.ReturnBatcher(opts, mminion=MockMasterMinion())
+            self.assertFalse(batcher.due)
+            batcher.add({"jid": "20190618090114890985", "return": {}, "id": "a"})
+            self.assertFalse(batcher.due)
+            batcher.started -= 10
+            self.assertTrue(batcher.due)
+            batcher.flush()
+            self.assertEqual(len(batcher), 0)
+            self.assertFalse(batcher.due)
+
+    def test_return_batcher_nocache(self):
+        """
+        test that returns which are not cached are not queued
+        """
+        with patch("salt.utils.verify.valid_id", return_value=True):
+            batcher = job.ReturnBatcher(
+                dict(MockMasterMinion.opts, job_cache_batch_size=10),
+                mminion=MockMasterMinion(),
+            )
+            batcher.add({"jid": "nocache", "return": True, "id": "a"})
+            self.assertEqual(len(batcher), 0)
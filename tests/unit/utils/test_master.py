@@ -1,5 +1,7 @@
+import salt.payload
 import salt.utils.master
-from tests.support.mock import patch
+from salt.exceptions import SaltException
+from tests.support.mock import MagicMock, patch
 from tests.support.unit import TestCase
 
 
@@ -94,3 +96,137 @@ class MasterPillarUtilTestCase(TestCase):
         with patch_grain, patch_pillar, patch_tgt_list:
             ret = pillar.get_minion_pillar()
         assert minion in ret
+
+
+class PillarServerTestCase(TestCase):
+    """
+    TestCase for the coalescing of salt.utils.master.PillarServer
+    """
+
+    def setUp(self):
+        self.opts = {
+            "sock_dir": "/tmp",
+            "pillar_coalesce_by_grains": False,
+            "pillar_workers_timeout": 60,
+            "ext_pillar": [],
+        }
+        self.server = salt.utils.master.PillarServer(self.opts)
+        self.server.pool = MagicMock()
+        self.server.stream = MagicMock()
+        # Run the callbacks of the render processes right away
+        self.server.io_loop = MagicMock()
+        self.server.io_loop.add_callback.side_effect = lambda func, *args: func(*args)
+        self.serial = salt.payload.Serial(self.opts)
+
+    def _request(self, client, minion_id, **grains):
+        load = {"id": minion_id, "grains": dict(grains), "saltenv": "base"}
+        self.server.handle_request([client, b"", self.serial.dumps(load)])
+
+    def _finish(self, call, ret):
+        if isinstance(ret, Exception):
+            call[1]["error_callback"](ret)
+        else:
+            call[1]["callback"](ret)
+
+    def _replies(self):
+        return {
+            call[0][0][0]: self.serial.loads(call[0][0][-1])
+            for call in self.server.stream.send_multipart.call_args_list
+        }
+
+    def test_coalesce(self):
+        self._request(b"client1", "minion1", os="Linux")
+        self._request(b"client2", "minion1", os="Linux")
+        self._request(b"client3", "minion2", os="Linux")
+        calls = self.server.pool.apply_async.call_args_list
+        assert len(calls) == 2
+        assert calls[0][0][1][0]["grains"] == {"id": "minion1", "os": "Linux"}
+
+        self._finish(calls[0], {"foo": "minion1"})
+        assert self._replies() == {
+            b"client1": {"pillar": {"foo": "minion1"}},
+            b"client2": {"pillar": {"foo": "minion1"}},
+        }
+        self._finish(calls[1], SaltException("boom"))
+        assert self._replies()[b"client3"] == {"error": "boom"}
+        assert self.server.running == {}
+
+        # A new request after the compilation finished compiles again
+        self._request(b"client1", "minion1", os="Linux")
+        assert self.server.pool.apply_async.call_count == 3
+
+    def test_coalesce_by_grains(self):
+        self.opts["pillar_coalesce_by_grains"] = True
+        self._request(b"client1", "minion1", os="Linux")
+        self._request(b"client2", "minion2", os="Linux")
+        self._request(b"client3", "minion3", os="Linux")
+        self._request(b"client4", "minion4", os="Windows")
+        calls = self.server.pool.apply_async.call_args_list
+        assert [call[0][0] for call in calls] == [
+            salt.utils.master._pillar_top_matches
+        ] * 4
+        # minion3 matches other pillar SLS files in the top file
+        for call, matches in zip(
+            calls,
+            (
+                {"base": ["common"]},
+                {"base": ["common"]},
+                {"base": ["common", "minion3"]},
+                {"base": ["common"]},
+            ),
+        ):
+            self._finish(call, matches)
+        compiles = calls[4:]
+        assert [call[0][1][0]["id"] for call in compiles] == [
+            "minion1",
+            "minion3",
+            "minion4",
+        ]
+        self._finish(compiles[0], {"foo": "bar"})
+        assert self._replies() == {
+            b"client1": {"pillar": {"foo": "bar"}},
+            b"client2": {"pillar": {"foo": "bar"}},
+        }
+
+    def test_coalesce_by_grains_ext_pillar(self):
+        self.opts["pillar_coalesce_by_grains"] = True
+        self.opts["ext_pillar"] = [{"vault": "path=secret/salt"}]
+        self._request(b"client1", "minion1", os="Linux")
+        self._request(b"client2", "minion2", os="Linux")
+        calls = self.server.pool.apply_async.call_args_list
+        # The external pillar data of a minion is never shared
+        assert [call[0][0] for call in calls] == [salt.utils.master._pillar_compile] * 2
+
+    def test_expire(self):
+        with patch("time.time", return_value=1000):
+            self._request(b"client1", "minion1", os="Linux")
+            self._request(b"client2", "minion1", os="Linux")
+            self.server.expire()
+        assert self._replies() == {}
+        stale = self.server.pool.apply_async.call_args_list[0]
+
+        # The render process of the compilation died
+        with patch("time.time", return_value=1061):
+            self._request(b"client3", "minion1", os="Linux")
+        assert self._replies() == {
+            b"client1": {"error": "pillar compilation timed out"},
+            b"client2": {"error": "pillar compilation timed out"},
+        }
+        # The request did not wait for the expired compilation
+        assert self.server.pool.apply_async.call_count == 2
+        self._finish(stale, {"foo": "stale"})
+        assert b"client3" not in self._replies()
+        self._finish(self.server.pool.apply_async.call_args_list[1], {"foo": "bar"})
+        assert self._replies()[b"client3"] == {"pillar": {"foo": "bar"}}
+
+        with patch("time.time", return_value=2000):
+            self._request(b"client4", "minion1", os="Linux")
+        with patch("time.time", return_value=2061):
+            self.server.expire()
+        assert self._replies()[b"client4"] == {"error": "pillar compilation timed out"}
+        assert self.server.running == {}
+
+    def test_bad_request(self):
+        self.server.handle_request([b"client1", b"", b"\xc1"])
+        self.server.pool.apply_async.assert_not_called()
+        assert self._replies() == {b"client1": {"error": "bad pillar request"}}
@@ -138,6 +138,50 @@ class TestProcessManager(TestCase):
                 process_manager.stop_restarting()
                 process_manager.kill_children()
 
+    @spin
+    def test_terminate_process(self):
+        process_manager = salt.utils.process.ProcessManager()
+        process = process_manager.add_process(
+            self.spin_terminate_process, name="spinner-1"
+        )
+        process_manager.add_process(self.spin_terminate_process, name="spinner-2")
+        try:
+            process_manager.terminate_process("spinner-1")
+            assert not process.is_alive()
+            assert [
+                mapping["Process"].name
+                for mapping in process_manager._process_map.values()
+            ] == ["spinner-2"]
+        finally:
+            process_manager.stop_restarting()
+            process_manager.kill_children()
+            time.sleep(0.5)
+            # Are there child processes still running?
+            if process_manager._process_map.keys():
+                process_manager.send_signal_to_processes(signal.SIGKILL)
+                process_manager.stop_restarting()
+                process_manager.kill_children()
+
+    @spin
+    def test_run_callback(self):
+        process_manager = salt.utils.process.ProcessManager()
+        process_manager.add_process(self.spin_run_callback, name="spinner")
+        calls = []
+
+        def callback():
+            calls.append(time.time())
+            if len(calls) == 3:
+                process_manager.terminate_process("spinner")
+
+        try:
+            with patch("signal.signal"):
+                process_manager.run(interval=0.01, callback=callback)
+            # The manager stops once it has no process left
+            assert len(calls) == 3
+        finally:
+            process_manager.stop_restarting()
+            process_manager.kill_children()
+
     @die
     def test_restarting(self):
         """